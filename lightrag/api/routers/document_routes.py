@@ -425,6 +425,10 @@ class DocStatusResponse(BaseModel):
         default=None, description="Additional metadata about the document"
     )
     file_path: str = Field(description="Path to the document file")
+    completion_percent: Optional[float] = Field(
+        default=None,
+        description="Percentage of chunks whose entity extraction is done (100 once processed); a retry only extracts the rest",
+    )
 
     class Config:
         json_schema_extra = {
@@ -440,6 +444,7 @@ class DocStatusResponse(BaseModel):
                 "error": None,
                 "metadata": {"author": "John Doe", "year": 2025},
                 "file_path": "research_paper.pdf",
+                "completion_percent": 100.0,
             }
         }
 
@@ -710,6 +715,19 @@ class PipelineStatusResponse(BaseModel):
         batchs: Number of batches for processing documents
         cur_batch: Current processing batch
         request_pending: Flag for pending request for processing
+        vdb_upserts_skipped: Entity/relation vector upserts skipped because the merged content was unchanged
+        extract_calls_saved: Extraction LLM calls saved by packing small chunks into shared requests
+        extract_tokens_saved: Estimated prompt tokens saved by chunk packing
+        gleaning_calls: Gleaning LLM calls made
+        gleaning_skipped: Gleaning calls skipped by the adaptive gleaning policy
+        gleaning_new_entities: Entities found only by the gleaning pass
+        gleaning_new_relations: Relations found only by the gleaning pass
+        batch_merge_vdb_upserts_saved: Entity/relation vector upserts saved by merging documents in batches
+        batch_merge_summary_calls_saved: Description summary LLM calls saved by merging documents in batches
+        summary_llm_calls: Description summary LLM calls made by merges
+        summary_tokens: Estimated prompt + completion tokens of those summary calls
+        summary_folds: Merges that folded new descriptions into the stored summary (incremental summary mode)
+        stages: Per-stage (chunking/extraction/merging) queue depth, in-flight documents and throughput
         latest_message: Latest message from pipeline processing
         history_messages: List of history messages
         update_status: Status of update flags for all namespaces
@@ -723,6 +741,19 @@ class PipelineStatusResponse(BaseModel):
     batchs: int = 0
     cur_batch: int = 0
     request_pending: bool = False
+    vdb_upserts_skipped: int = 0
+    extract_calls_saved: int = 0
+    extract_tokens_saved: int = 0
+    gleaning_calls: int = 0
+    gleaning_skipped: int = 0
+    gleaning_new_entities: int = 0
+    gleaning_new_relations: int = 0
+    batch_merge_vdb_upserts_saved: int = 0
+    batch_merge_summary_calls_saved: int = 0
+    summary_llm_calls: int = 0
+    summary_tokens: int = 0
+    summary_folds: int = 0
+    stages: Optional[dict] = None
     latest_message: str = ""
     history_messages: Optional[List[str]] = None
     update_status: Optional[dict] = None
@@ -2378,6 +2409,15 @@ def create_document_routes(
                     docs_list.append((doc_id, doc_status))
                 status_documents.append((status, docs_list))
 
+            listed_docs = {
+                doc_id: doc_status
+                for _, docs_list in status_documents
+                for doc_id, doc_status in docs_list
+            }
+            completion = await rag.aget_docs_completion(
+                list(listed_docs), statuses=listed_docs
+            )
+
             # Fair distribution: round-robin across statuses
             status_indices = [0] * len(
                 status_documents
@@ -2418,6 +2458,7 @@ def create_document_routes(
                             error_msg=doc_status.error_msg,
                             metadata=doc_status.metadata,
                             file_path=doc_status.file_path,
+                            completion_percent=completion.get(doc_id),
                         )
                     )
 
@@ -2652,6 +2693,9 @@ def create_document_routes(
 
             # Get documents by track_id
             docs_by_track_id = await rag.aget_docs_by_track_id(track_id)
+            completion = await rag.aget_docs_completion(
+                list(docs_by_track_id), statuses=docs_by_track_id
+            )
 
             # Convert to response format
             documents = []
@@ -2671,6 +2715,7 @@ def create_document_routes(
                         error_msg=doc_status.error_msg,
                         metadata=doc_status.metadata,
                         file_path=doc_status.file_path,
+                        completion_percent=completion.get(doc_id),
                     )
                 )
 
@@ -2736,6 +2781,11 @@ def create_document_routes(
                 docs_task, status_counts_task
             )
 
+            completion = await rag.aget_docs_completion(
+                [doc_id for doc_id, _ in documents_with_ids],
+                statuses=dict(documents_with_ids),
+            )
+
             # Convert documents to response format
             doc_responses = []
             for doc_id, doc in documents_with_ids:
@@ -2752,6 +2802,7 @@ def create_document_routes(
                         error_msg=doc.error_msg,
                         metadata=doc.metadata,
                         file_path=doc.file_path,
+                        completion_percent=completion.get(doc_id),
                     )
                 )
 
@@ -13,6 +13,19 @@ DEFAULT_MAX_GRAPH_NODES = 1000
 # Default values for extraction settings
 DEFAULT_SUMMARY_LANGUAGE = "English"  # Default language for document processing
 DEFAULT_MAX_GLEANING = 1
+# Gleaning policy: "always" gleans every chunk, "adaptive" only chunks with truncated
+# output, parse anomalies or an entity density below the threshold (entities per
+# 1000 chunk tokens)
+DEFAULT_ENTITY_EXTRACT_GLEANING_POLICY = "always"
+DEFAULT_ENTITY_EXTRACT_GLEAN_MIN_DENSITY = 5.0
+# Extraction prompt layout: "default" embeds the chunk text in the system prompt,
+# "prefix_cache" keeps the system prompt identical across chunks (provider caching)
+DEFAULT_ENTITY_EXTRACT_PROMPT_LAYOUT = "default"
+# Multi-chunk packing: small consecutive chunks share one extraction request
+DEFAULT_ENTITY_EXTRACT_PACK_CHUNKS = False
+# Chunk text token budget per packed request
+DEFAULT_ENTITY_EXTRACT_PACK_MAX_TOKENS = 1200
+DEFAULT_ENTITY_EXTRACT_PACK_MAX_CHUNKS = 8
 DEFAULT_ENTITY_NAME_MAX_LENGTH = 256
 
 # Number of description fragments to trigger LLM summary
@@ -23,6 +36,11 @@ DEFAULT_SUMMARY_MAX_TOKENS = 1200
 DEFAULT_SUMMARY_LENGTH_RECOMMENDED = 600
 # Maximum token size sent to LLM for summary
 DEFAULT_SUMMARY_CONTEXT_SIZE = 12000
+# Summary mode on merge: "full" (map-reduce over all fragments) or "incremental"
+# (fold new fragments into the stored summary)
+DEFAULT_SUMMARY_MODE = "full"
+# Incremental folds of a summary before the next LLM summary is a full one again
+DEFAULT_SUMMARY_REBUILD_INTERVAL = 8
 # Default entities to extract if ENTITY_TYPES is not specified in .env
 DEFAULT_ENTITY_TYPES = [
     "Person",
@@ -86,10 +104,38 @@ DEFAULT_TEMPERATURE = 1.0
 # Async configuration defaults
 DEFAULT_MAX_ASYNC = 4  # Default maximum async operations
 DEFAULT_MAX_PARALLEL_INSERT = 2  # Default maximum parallel insert operations
+DEFAULT_MAX_PARALLEL_MERGE = 2  # Documents merged concurrently in the merging stage
+# Documents merged together in one merge pass (1 = no batching), and seconds to
+# wait for more documents to fill a merge batch
+DEFAULT_MERGE_BATCH_SIZE = 1
+DEFAULT_MERGE_BATCH_WINDOW = 2.0
+# Adaptive (AIMD) concurrency: limit floats between MIN and max_async * MAX_FACTOR
+DEFAULT_ADAPTIVE_CONCURRENCY = False
+DEFAULT_ADAPTIVE_CONCURRENCY_MIN = 1
+DEFAULT_ADAPTIVE_CONCURRENCY_MAX_FACTOR = 4.0
+# Per-provider request/token rate limits (0 disables the bucket)
+DEFAULT_RPM_LIMIT = 0
+DEFAULT_TPM_LIMIT = 0
+# Expected completion size charged up front against the TPM budget (reconciled later)
+DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE = 512
 
 # Embedding configuration defaults
 DEFAULT_EMBEDDING_FUNC_MAX_ASYNC = 8  # Default max async for embedding functions
 DEFAULT_EMBEDDING_BATCH_NUM = 10  # Default batch size for embedding computations
+# Micro-batching window for coalescing concurrent embedding calls (0 disables)
+DEFAULT_EMBEDDING_MICRO_BATCH_WAIT_MS = 5
+# Token budget per coalesced embedding request (0: only EMBEDDING_BATCH_NUM applies)
+DEFAULT_EMBEDDING_MICRO_BATCH_MAX_TOKENS = 0
+
+# Characters per chunk when a cached answer is replayed as a stream (0: single chunk)
+DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE = 64
+
+# Content-addressed embedding cache (model, dim, sha256(text)) in KV storage
+DEFAULT_ENABLE_EMBEDDING_CACHE = False
+DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES = 50000  # LRU eviction beyond this many vectors
+
+# Per-chunk extraction checkpoint, so retried documents only extract missing chunks
+DEFAULT_ENABLE_EXTRACTION_CHECKPOINT = True
 
 # Gunicorn worker timeout
 DEFAULT_TIMEOUT = 300
@@ -98,6 +144,11 @@ DEFAULT_TIMEOUT = 300
 DEFAULT_LLM_TIMEOUT = 180
 DEFAULT_EMBEDDING_TIMEOUT = 30
 
+# Pooled LLM/embedding client connection limits (shared across calls)
+DEFAULT_LLM_CLIENT_MAX_CONNECTIONS = 100
+DEFAULT_LLM_CLIENT_MAX_KEEPALIVE = 20
+DEFAULT_LLM_CLIENT_KEEPALIVE_EXPIRY = 60  # seconds
+
 # Logging configuration defaults
 DEFAULT_LOG_MAX_BYTES = 10485760  # Default 10MB
 DEFAULT_LOG_BACKUP_COUNT = 5  # Default 5 backups
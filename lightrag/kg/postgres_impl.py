@@ -1714,7 +1714,10 @@ class PGKVStorage(BaseKVStorage):
         params = {"workspace": self.workspace, "id": id}
         response = await self.db.query(sql, list(params.values()))
 
-        if response and is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
+        if response and is_namespace(
+            self.namespace,
+            (NameSpace.KV_STORE_TEXT_CHUNKS, NameSpace.KV_STORE_CHUNK_EXTRACTIONS),
+        ):
             # Parse llm_cache_list JSON string back to list
             llm_cache_list = response.get("llm_cache_list", [])
             if isinstance(llm_cache_list, str):
@@ -1847,7 +1850,10 @@ class PGKVStorage(BaseKVStorage):
                 ordered.append(id_map.get(str(requested_id)))
             return ordered
 
-        if results and is_namespace(self.namespace, NameSpace.KV_STORE_TEXT_CHUNKS):
+        if results and is_namespace(
+            self.namespace,
+            (NameSpace.KV_STORE_TEXT_CHUNKS, NameSpace.KV_STORE_CHUNK_EXTRACTIONS),
+        ):
             # Parse llm_cache_list JSON string back to list for each result
             for result in results:
                 llm_cache_list = result.get("llm_cache_list", [])
@@ -2087,6 +2093,39 @@ class PGKVStorage(BaseKVStorage):
                     "update_time": current_time,
                 }
                 await self.db.execute(upsert_sql, _data)
+        elif is_namespace(self.namespace, NameSpace.KV_STORE_EMBEDDING_CACHE):
+            # Get current UTC time and convert to naive datetime for database storage
+            current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            for k, v in data.items():
+                upsert_sql = SQL_TEMPLATES["upsert_embedding_cache"]
+                _data = {
+                    "workspace": self.workspace,
+                    "id": k,
+                    "model": v["model"],
+                    "dim": v["dim"],
+                    "embedding": v["embedding"],
+                    "create_time": current_time,
+                    "update_time": current_time,
+                }
+                await self.db.execute(upsert_sql, _data)
+        elif is_namespace(self.namespace, NameSpace.KV_STORE_CHUNK_EXTRACTIONS):
+            # Get current UTC time and convert to naive datetime for database storage
+            current_time = datetime.datetime.now(timezone.utc).replace(tzinfo=None)
+            for k, v in data.items():
+                upsert_sql = SQL_TEMPLATES["upsert_chunk_extraction"]
+                _data = {
+                    "workspace": self.workspace,
+                    "id": k,
+                    "full_doc_id": v.get("full_doc_id"),
+                    "status": v["status"],
+                    "signature": v.get("signature"),
+                    "result": v.get("result"),
+                    "llm_cache_list": json.dumps(v.get("llm_cache_list", [])),
+                    "error_msg": v.get("error_msg"),
+                    "create_time": current_time,
+                    "update_time": current_time,
+                }
+                await self.db.execute(upsert_sql, _data)
 
     async def index_done_callback(self) -> None:
         # PG handles persistence automatically
@@ -4741,6 +4780,8 @@ NAMESPACE_TABLE_MAP = {
     NameSpace.KV_STORE_ENTITY_CHUNKS: "LIGHTRAG_ENTITY_CHUNKS",
     NameSpace.KV_STORE_RELATION_CHUNKS: "LIGHTRAG_RELATION_CHUNKS",
     NameSpace.KV_STORE_LLM_RESPONSE_CACHE: "LIGHTRAG_LLM_CACHE",
+    NameSpace.KV_STORE_EMBEDDING_CACHE: "LIGHTRAG_EMBEDDING_CACHE",
+    NameSpace.KV_STORE_CHUNK_EXTRACTIONS: "LIGHTRAG_CHUNK_EXTRACTIONS",
     NameSpace.VECTOR_STORE_CHUNKS: "LIGHTRAG_VDB_CHUNKS",
     NameSpace.VECTOR_STORE_ENTITIES: "LIGHTRAG_VDB_ENTITY",
     NameSpace.VECTOR_STORE_RELATIONSHIPS: "LIGHTRAG_VDB_RELATION",
@@ -4902,6 +4943,33 @@ TABLES = {
                     CONSTRAINT LIGHTRAG_RELATION_CHUNKS_PK PRIMARY KEY (workspace, id)
                     )"""
     },
+    "LIGHTRAG_EMBEDDING_CACHE": {
+        "ddl": """CREATE TABLE LIGHTRAG_EMBEDDING_CACHE (
+                    id VARCHAR(512),
+                    workspace VARCHAR(255),
+                    model VARCHAR(255),
+                    dim INTEGER,
+                    embedding TEXT,
+                    create_time TIMESTAMP(0) DEFAULT CURRENT_TIMESTAMP,
+                    update_time TIMESTAMP(0) DEFAULT CURRENT_TIMESTAMP,
+                    CONSTRAINT LIGHTRAG_EMBEDDING_CACHE_PK PRIMARY KEY (workspace, id)
+                    )"""
+    },
+    "LIGHTRAG_CHUNK_EXTRACTIONS": {
+        "ddl": """CREATE TABLE LIGHTRAG_CHUNK_EXTRACTIONS (
+                    id VARCHAR(255),
+                    workspace VARCHAR(255),
+                    full_doc_id VARCHAR(256),
+                    status VARCHAR(32),
+                    signature VARCHAR(64),
+                    result TEXT NULL,
+                    llm_cache_list JSONB NULL DEFAULT '[]'::jsonb,
+                    error_msg TEXT NULL,
+                    create_time TIMESTAMP(0) DEFAULT CURRENT_TIMESTAMP,
+                    update_time TIMESTAMP(0) DEFAULT CURRENT_TIMESTAMP,
+                    CONSTRAINT LIGHTRAG_CHUNK_EXTRACTIONS_PK PRIMARY KEY (workspace, id)
+                    )"""
+    },
 }
 
 
@@ -4979,6 +5047,28 @@ SQL_TEMPLATES = {
                                  EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
                                  FROM LIGHTRAG_RELATION_CHUNKS WHERE workspace=$1 AND id = ANY($2)
                                 """,
+    "get_by_id_embedding_cache": """SELECT id, model, dim, embedding,
+                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
+                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
+                                FROM LIGHTRAG_EMBEDDING_CACHE WHERE workspace=$1 AND id=$2
+                               """,
+    "get_by_ids_embedding_cache": """SELECT id, model, dim, embedding,
+                                 EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
+                                 EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
+                                 FROM LIGHTRAG_EMBEDDING_CACHE WHERE workspace=$1 AND id = ANY($2)
+                                """,
+    "get_by_id_chunk_extractions": """SELECT id, full_doc_id, status, signature, result,
+                                llm_cache_list, error_msg,
+                                EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
+                                EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
+                                FROM LIGHTRAG_CHUNK_EXTRACTIONS WHERE workspace=$1 AND id=$2
+                               """,
+    "get_by_ids_chunk_extractions": """SELECT id, full_doc_id, status, signature, result,
+                                 llm_cache_list, error_msg,
+                                 EXTRACT(EPOCH FROM create_time)::BIGINT as create_time,
+                                 EXTRACT(EPOCH FROM update_time)::BIGINT as update_time
+                                 FROM LIGHTRAG_CHUNK_EXTRACTIONS WHERE workspace=$1 AND id = ANY($2)
+                                """,
     "filter_keys": "SELECT id FROM {table_name} WHERE workspace=$1 AND id IN ({ids})",
     "upsert_doc_full": """INSERT INTO LIGHTRAG_DOC_FULL (id, content, doc_name, workspace)
                         VALUES ($1, $2, $3, $4)
@@ -5042,6 +5132,28 @@ SQL_TEMPLATES = {
                       count=EXCLUDED.count,
                       update_time = EXCLUDED.update_time
                      """,
+    "upsert_embedding_cache": """INSERT INTO LIGHTRAG_EMBEDDING_CACHE (workspace, id, model, dim,
+                      embedding, create_time, update_time)
+                      VALUES ($1, $2, $3, $4, $5, $6, $7)
+                      ON CONFLICT (workspace,id) DO UPDATE
+                      SET model=EXCLUDED.model,
+                      dim=EXCLUDED.dim,
+                      embedding=EXCLUDED.embedding,
+                      update_time = EXCLUDED.update_time
+                     """,
+    "upsert_chunk_extraction": """INSERT INTO LIGHTRAG_CHUNK_EXTRACTIONS (workspace, id,
+                      full_doc_id, status, signature, result, llm_cache_list, error_msg,
+                      create_time, update_time)
+                      VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
+                      ON CONFLICT (workspace,id) DO UPDATE
+                      SET full_doc_id=EXCLUDED.full_doc_id,
+                      status=EXCLUDED.status,
+                      signature=EXCLUDED.signature,
+                      result=EXCLUDED.result,
+                      llm_cache_list=EXCLUDED.llm_cache_list,
+                      error_msg=EXCLUDED.error_msg,
+                      update_time = EXCLUDED.update_time
+                     """,
     # SQL for VectorStorage
     "upsert_chunk": """INSERT INTO LIGHTRAG_VDB_CHUNKS (workspace, id, tokens,
                       chunk_order_index, full_doc_id, content, content_vector, file_path,
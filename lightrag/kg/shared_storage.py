@@ -1294,6 +1294,24 @@ async def initialize_pipeline_status():
                 "batchs": 0,  # Number of batches for processing documents
                 "cur_batch": 0,  # Current processing batch
                 "request_pending": False,  # Flag for pending request for processing
+                # Unchanged entity/relation vectors not re-upserted
+                "vdb_upserts_skipped": 0,
+                "extract_calls_saved": 0,  # Extraction LLM calls saved by chunk packing
+                # Estimated prompt tokens saved by chunk packing
+                "extract_tokens_saved": 0,
+                "gleaning_calls": 0,  # Gleaning LLM calls made
+                "gleaning_skipped": 0,  # Gleaning calls skipped by the adaptive policy
+                "gleaning_new_entities": 0,  # Entities found only by gleaning
+                "gleaning_new_relations": 0,  # Relations found only by gleaning
+                # Vector upserts saved by merge batching
+                "batch_merge_vdb_upserts_saved": 0,
+                # Summary LLM calls saved by merge batching
+                "batch_merge_summary_calls_saved": 0,
+                "summary_llm_calls": 0,  # Description summary LLM calls
+                "summary_tokens": 0,  # Estimated summary prompt + completion tokens
+                "summary_folds": 0,  # Merges that folded into the stored summary
+                # Per-stage (chunking/extraction/merging) queue depth and throughput
+                "stages": {},
                 "latest_message": "",  # Latest message from pipeline processing
                 "history_messages": history_messages,  # 使用共享列表对象
             }
@@ -6,7 +6,7 @@ import configparser
 import os
 import time
 import warnings
-from dataclasses import asdict, dataclass, field
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime, timezone
 from functools import partial
 from typing import (
@@ -25,6 +25,12 @@ from lightrag.prompt import PROMPTS
 from lightrag.exceptions import PipelineCancelledException
 from lightrag.constants import (
     DEFAULT_MAX_GLEANING,
+    DEFAULT_ENTITY_EXTRACT_PROMPT_LAYOUT,
+    DEFAULT_ENTITY_EXTRACT_GLEANING_POLICY,
+    DEFAULT_ENTITY_EXTRACT_GLEAN_MIN_DENSITY,
+    DEFAULT_ENTITY_EXTRACT_PACK_CHUNKS,
+    DEFAULT_ENTITY_EXTRACT_PACK_MAX_TOKENS,
+    DEFAULT_ENTITY_EXTRACT_PACK_MAX_CHUNKS,
     DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE,
     DEFAULT_TOP_K,
     DEFAULT_CHUNK_TOP_K,
@@ -40,6 +46,21 @@ from lightrag.constants import (
     DEFAULT_SUMMARY_LENGTH_RECOMMENDED,
     DEFAULT_MAX_ASYNC,
     DEFAULT_MAX_PARALLEL_INSERT,
+    DEFAULT_MAX_PARALLEL_MERGE,
+    DEFAULT_MERGE_BATCH_SIZE,
+    DEFAULT_MERGE_BATCH_WINDOW,
+    DEFAULT_ENABLE_EXTRACTION_CHECKPOINT,
+    DEFAULT_SUMMARY_MODE,
+    DEFAULT_SUMMARY_REBUILD_INTERVAL,
+    DEFAULT_ADAPTIVE_CONCURRENCY,
+    DEFAULT_ADAPTIVE_CONCURRENCY_MIN,
+    DEFAULT_ADAPTIVE_CONCURRENCY_MAX_FACTOR,
+    DEFAULT_RPM_LIMIT,
+    DEFAULT_TPM_LIMIT,
+    DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE,
+    DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE,
+    DEFAULT_ENABLE_EMBEDDING_CACHE,
+    DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES,
     DEFAULT_MAX_GRAPH_NODES,
     DEFAULT_MAX_SOURCE_IDS_PER_ENTITY,
     DEFAULT_MAX_SOURCE_IDS_PER_RELATION,
@@ -47,6 +68,8 @@ from lightrag.constants import (
     DEFAULT_SUMMARY_LANGUAGE,
     DEFAULT_LLM_TIMEOUT,
     DEFAULT_EMBEDDING_TIMEOUT,
+    DEFAULT_EMBEDDING_MICRO_BATCH_WAIT_MS,
+    DEFAULT_EMBEDDING_MICRO_BATCH_MAX_TOKENS,
     DEFAULT_SOURCE_IDS_LIMIT_METHOD,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
@@ -84,6 +107,7 @@ from lightrag.namespace import NameSpace
 from lightrag.operate import (
     chunking_by_token_size,
     extract_entities,
+    extraction_checkpoint_signature,
     merge_nodes_and_edges,
     kg_query,
     naive_query,
@@ -98,6 +122,12 @@ from lightrag.utils import (
     compute_mdhash_id,
     lazy_external_import,
     priority_limit_async_func_call,
+    get_rate_limiter,
+    batch_scope_aware,
+    EmbeddingBatcher,
+    EmbeddingCache,
+    PipelineStageMetrics,
+    embedding_batch_scope,
     get_content_summary,
     sanitize_text_for_encoding,
     check_storage_env_vars,
@@ -106,9 +136,11 @@ from lightrag.utils import (
     logger,
     subtract_source_ids,
     make_relation_chunk_key,
+    make_extraction_checkpoint_key,
     normalize_source_ids_limit_method,
 )
 from lightrag.types import KnowledgeGraph
+from lightrag.llm.client_pool import hold_shared_clients, release_shared_clients
 from dotenv import load_dotenv
 
 # use the .env that is inside the current folder
@@ -207,6 +239,61 @@ class LightRAG:
     )
     """Maximum number of entity extraction attempts for ambiguous content."""
 
+    entity_extract_gleaning_policy: str = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_GLEANING_POLICY",
+            DEFAULT_ENTITY_EXTRACT_GLEANING_POLICY,
+            str,
+        )
+    )
+    """Gleaning policy when entity_extract_max_gleaning > 0: 'always' re-prompts every chunk, 'adaptive' only
+    chunks whose first pass was truncated, had parse anomalies or found few entities for its size."""
+
+    entity_extract_glean_min_density: float = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_GLEAN_MIN_DENSITY",
+            DEFAULT_ENTITY_EXTRACT_GLEAN_MIN_DENSITY,
+            float,
+        )
+    )
+    """Adaptive gleaning: chunks with fewer entities per 1000 tokens than this are gleaned."""
+
+    entity_extract_prompt_layout: str = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_PROMPT_LAYOUT", DEFAULT_ENTITY_EXTRACT_PROMPT_LAYOUT, str
+        )
+    )
+    """Extraction prompt layout: 'default' or 'prefix_cache'. 'prefix_cache' keeps the system prompt
+    (instructions + examples) byte-identical across chunks and sends the chunk text in the user message,
+    so providers with automatic prompt caching can reuse the shared prefix. Switching it changes the
+    extraction LLM cache keys."""
+
+    entity_extract_pack_chunks: bool = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_PACK_CHUNKS", DEFAULT_ENTITY_EXTRACT_PACK_CHUNKS, bool
+        )
+    )
+    """Pack small consecutive chunks of a document into one extraction request (plus one gleaning request).
+    Extracted entities and relations are attributed back to their own chunk via per-chunk headers."""
+
+    entity_extract_pack_max_tokens: int = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_PACK_MAX_TOKENS",
+            DEFAULT_ENTITY_EXTRACT_PACK_MAX_TOKENS,
+            int,
+        )
+    )
+    """Maximum total chunk tokens per packed extraction request. Larger chunks are extracted alone."""
+
+    entity_extract_pack_max_chunks: int = field(
+        default=get_env_value(
+            "ENTITY_EXTRACT_PACK_MAX_CHUNKS",
+            DEFAULT_ENTITY_EXTRACT_PACK_MAX_CHUNKS,
+            int,
+        )
+    )
+    """Maximum number of chunks per packed extraction request."""
+
     force_llm_summary_on_merge: int = field(
         default=get_env_value(
             "FORCE_LLM_SUMMARY_ON_MERGE", DEFAULT_FORCE_LLM_SUMMARY_ON_MERGE, int
@@ -278,6 +365,40 @@ class LightRAG:
     )
     """Maximum number of concurrent embedding function calls."""
 
+    embedding_micro_batch_wait_ms: float = field(
+        default=get_env_value(
+            "EMBEDDING_MICRO_BATCH_WAIT_MS",
+            DEFAULT_EMBEDDING_MICRO_BATCH_WAIT_MS,
+            float,
+        )
+    )
+    """Window (ms) during which concurrent embedding calls are coalesced into one
+    request of up to embedding_batch_num texts. Set to 0 to disable micro-batching."""
+
+    embedding_micro_batch_max_tokens: int = field(
+        default=get_env_value(
+            "EMBEDDING_MICRO_BATCH_MAX_TOKENS",
+            DEFAULT_EMBEDDING_MICRO_BATCH_MAX_TOKENS,
+            int,
+        )
+    )
+    """Token budget of a coalesced embedding request (0: only embedding_batch_num applies)."""
+
+    embedding_rpm_limit: int = field(
+        default=get_env_value("EMBEDDING_RPM_LIMIT", DEFAULT_RPM_LIMIT, int)
+    )
+    """Embedding requests per minute allowed by the provider (0: unlimited)."""
+
+    embedding_tpm_limit: int = field(
+        default=get_env_value("EMBEDDING_TPM_LIMIT", DEFAULT_TPM_LIMIT, int)
+    )
+    """Embedding input tokens per minute allowed by the provider (0: unlimited)."""
+
+    embedding_rate_limit_key: str = field(
+        default=get_env_value("EMBEDDING_RATE_LIMIT_KEY", "embedding")
+    )
+    """Provider key of the embedding rate budget; instances with the same key share it."""
+
     embedding_cache_config: dict[str, Any] = field(
         default_factory=lambda: {
             "enabled": False,
@@ -291,6 +412,21 @@ class LightRAG:
     - use_llm_check: If True, validates cached embeddings using an LLM.
     """
 
+    enable_embedding_cache: bool = field(
+        default=get_env_value(
+            "ENABLE_EMBEDDING_CACHE", DEFAULT_ENABLE_EMBEDDING_CACHE, bool
+        )
+    )
+    """Cache vectors by (model, dim, sha256(text)) in KV storage so identical text
+    (re-ingested documents, rebuilt entities, unchanged descriptions) is embedded once."""
+
+    embedding_cache_max_entries: int = field(
+        default=get_env_value(
+            "EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_EMBEDDING_CACHE_MAX_ENTRIES, int
+        )
+    )
+    """Maximum number of cached vectors; least recently used ones are evicted (0: unbounded)."""
+
     default_embedding_timeout: int = field(
         default=int(os.getenv("EMBEDDING_TIMEOUT", DEFAULT_EMBEDDING_TIMEOUT))
     )
@@ -321,11 +457,70 @@ class LightRAG:
     )
     """Recommended length of LLM summary output."""
 
+    summary_mode: str = field(
+        default=get_env_value("SUMMARY_MODE", DEFAULT_SUMMARY_MODE, str)
+    )
+    """How merges re-summarize descriptions: "full" runs map-reduce over all description
+    fragments, "incremental" folds only the new fragments into the stored LLM summary."""
+
+    summary_rebuild_interval: int = field(
+        default=get_env_value(
+            "SUMMARY_REBUILD_INTERVAL", DEFAULT_SUMMARY_REBUILD_INTERVAL, int
+        )
+    )
+    """In incremental mode, number of folds after which the next LLM summary is a full one.
+    A full summary is also done when the folded summary outgrows summary_max_tokens."""
+
     llm_model_max_async: int = field(
         default=int(os.getenv("MAX_ASYNC", DEFAULT_MAX_ASYNC))
     )
     """Maximum number of concurrent LLM calls."""
 
+    adaptive_concurrency: bool = field(
+        default=get_env_value(
+            "ADAPTIVE_CONCURRENCY", DEFAULT_ADAPTIVE_CONCURRENCY, bool
+        )
+    )
+    """Adapt LLM and embedding concurrency (AIMD): start at the *_max_async value, grow
+    while calls are fast and healthy, halve on 429/5xx/timeouts."""
+
+    adaptive_concurrency_min: int = field(
+        default=get_env_value(
+            "ADAPTIVE_CONCURRENCY_MIN", DEFAULT_ADAPTIVE_CONCURRENCY_MIN, int
+        )
+    )
+    """Lower bound of the adaptive concurrency limit."""
+
+    adaptive_concurrency_max_factor: float = field(
+        default=get_env_value(
+            "ADAPTIVE_CONCURRENCY_MAX_FACTOR",
+            DEFAULT_ADAPTIVE_CONCURRENCY_MAX_FACTOR,
+            float,
+        )
+    )
+    """Upper bound of the adaptive limit as a multiple of the *_max_async value."""
+
+    llm_rpm_limit: int = field(
+        default=get_env_value("LLM_RPM_LIMIT", DEFAULT_RPM_LIMIT, int)
+    )
+    """LLM requests per minute allowed by the provider (0: unlimited)."""
+
+    llm_tpm_limit: int = field(
+        default=get_env_value("LLM_TPM_LIMIT", DEFAULT_TPM_LIMIT, int)
+    )
+    """LLM input+output tokens per minute allowed by the provider (0: unlimited)."""
+
+    llm_rate_limit_key: str = field(default=get_env_value("LLM_RATE_LIMIT_KEY", ""))
+    """Provider key of the LLM rate budget (defaults to llm_model_name); instances
+    with the same key share it."""
+
+    llm_output_tokens_estimate: int = field(
+        default=get_env_value(
+            "LLM_OUTPUT_TOKENS_ESTIMATE", DEFAULT_LLM_OUTPUT_TOKENS_ESTIMATE, int
+        )
+    )
+    """Completion tokens reserved per LLM call before the actual size is known."""
+
     llm_model_kwargs: dict[str, Any] = field(default_factory=dict)
     """Additional keyword arguments passed to the LLM model function."""
 
@@ -356,13 +551,49 @@ class LightRAG:
     enable_llm_cache_for_entity_extract: bool = field(default=True)
     """If True, enables caching for entity extraction steps to reduce LLM costs."""
 
+    stream_cache_replay_chunk_size: int = field(
+        default=get_env_value(
+            "STREAM_CACHE_REPLAY_CHUNK_SIZE",
+            DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE,
+            int,
+        )
+    )
+    """Characters per chunk when a cached answer is replayed to a streaming query
+    (0: one chunk). Streamed answers are cached once the stream completes."""
+
     # Extensions
     # ---
 
     max_parallel_insert: int = field(
         default=int(os.getenv("MAX_PARALLEL_INSERT", DEFAULT_MAX_PARALLEL_INSERT))
     )
-    """Maximum number of parallel insert operations."""
+    """Maximum number of parallel insert operations (documents in the chunking and extraction stages each)."""
+
+    max_parallel_merge: int = field(
+        default=get_env_value("MAX_PARALLEL_MERGE", DEFAULT_MAX_PARALLEL_MERGE, int)
+    )
+    """Maximum number of documents merged into the graph concurrently. Merging runs in its own
+    pipeline stage, so extraction of later documents continues while earlier ones merge."""
+
+    merge_batch_size: int = field(
+        default=get_env_value("MERGE_BATCH_SIZE", DEFAULT_MERGE_BATCH_SIZE, int)
+    )
+    """Maximum number of extracted documents merged together in one merge pass. Entities and
+    relations shared by the batch are summarized and written to the graph and vector storage
+    once instead of once per document. 1 disables batching."""
+
+    merge_batch_window: float = field(
+        default=get_env_value("MERGE_BATCH_WINDOW", DEFAULT_MERGE_BATCH_WINDOW, float)
+    )
+    """Seconds a merge worker waits for more extracted documents before merging a partial batch."""
+
+    enable_extraction_checkpoint: bool = field(
+        default=get_env_value(
+            "ENABLE_EXTRACTION_CHECKPOINT", DEFAULT_ENABLE_EXTRACTION_CHECKPOINT, bool
+        )
+    )
+    """Persist each chunk's extraction result as soon as it is done, so a failed document
+    is resumed on retry by extracting only its missing chunks."""
 
     max_graph_nodes: int = field(
         default=get_env_value("MAX_GRAPH_NODES", DEFAULT_MAX_GRAPH_NODES, int)
@@ -505,6 +736,19 @@ class LightRAG:
             logger.warning(
                 f"max_total_tokens({self.summary_max_tokens}) should greater than summary_length_recommended({self.summary_length_recommended})"
             )
+        if self.summary_mode not in ("full", "incremental"):
+            logger.warning(f"Unknown summary_mode '{self.summary_mode}', using 'full'")
+            self.summary_mode = "full"
+        if self.entity_extract_gleaning_policy not in ("always", "adaptive"):
+            logger.warning(
+                f"Unknown entity_extract_gleaning_policy '{self.entity_extract_gleaning_policy}', using 'always'"
+            )
+            self.entity_extract_gleaning_policy = "always"
+        if self.entity_extract_prompt_layout not in ("default", "prefix_cache"):
+            logger.warning(
+                f"Unknown entity_extract_prompt_layout '{self.entity_extract_prompt_layout}', using 'default'"
+            )
+            self.entity_extract_prompt_layout = "default"
 
         # Fix global_config now
         global_config = asdict(self)
@@ -513,11 +757,49 @@ class LightRAG:
         logger.debug(f"LightRAG init with param:\n  {_print_config}\n")
 
         # Init Embedding
+        embedding_model = getattr(self.embedding_func, "model_name", None) or getattr(
+            getattr(self.embedding_func, "func", None), "__name__", "default"
+        )
         self.embedding_func = priority_limit_async_func_call(
             self.embedding_func_max_async,
             llm_timeout=self.default_embedding_timeout,
             queue_name="Embedding func",
+            adaptive=self.adaptive_concurrency,
+            adaptive_min_size=self.adaptive_concurrency_min,
+            adaptive_max_size=int(
+                self.embedding_func_max_async * self.adaptive_concurrency_max_factor
+            ),
+            rate_limiter=get_rate_limiter(
+                self.embedding_rate_limit_key,
+                rpm=self.embedding_rpm_limit,
+                tpm=self.embedding_tpm_limit,
+            ),
+            token_estimator=self._estimate_embedding_call_tokens,
         )(self.embedding_func)
+        self._embedding_concurrency_metrics = self.embedding_func.metrics
+        # Serve already-embedded text from the KV-backed cache (storage attached below)
+        self._embedding_cache_layer = None
+        if self.enable_embedding_cache:
+            self._embedding_cache_layer = EmbeddingCache(
+                embedding_model,
+                self.embedding_func.embedding_dim,
+                max_entries=self.embedding_cache_max_entries,
+            )
+            self.embedding_func = self._embedding_cache_layer.wrap(self.embedding_func)
+        # Coalesce concurrent embedding calls (e.g. single-record vdb upserts during
+        # merge) into batched requests; aquery_batch adds its own scoped batcher
+        self._embedding_batcher = None
+        if self.embedding_micro_batch_wait_ms > 0:
+            self._embedding_batcher = EmbeddingBatcher(
+                self.embedding_func,
+                max_batch_size=self.embedding_batch_num,
+                max_wait=self.embedding_micro_batch_wait_ms / 1000,
+                max_tokens=self.embedding_micro_batch_max_tokens,
+                token_counter=lambda text: len(self.tokenizer.encode(text)),
+            )
+        self.embedding_func = batch_scope_aware(
+            self.embedding_func, self._embedding_batcher
+        )
 
         # Initialize all storages
         self.key_string_value_json_storage_cls: type[BaseKVStorage] = (
@@ -549,6 +831,25 @@ class LightRAG:
             embedding_func=self.embedding_func,
         )
 
+        self.embedding_cache: BaseKVStorage | None = None
+        if self._embedding_cache_layer is not None:
+            self.embedding_cache = self.key_string_value_json_storage_cls(  # type: ignore
+                namespace=NameSpace.KV_STORE_EMBEDDING_CACHE,
+                workspace=self.workspace,
+                global_config=global_config,
+                embedding_func=None,
+            )
+            self._embedding_cache_layer.storage = self.embedding_cache
+
+        self.chunk_extractions: BaseKVStorage | None = None
+        if self.enable_extraction_checkpoint:
+            self.chunk_extractions = self.key_string_value_json_storage_cls(  # type: ignore
+                namespace=NameSpace.KV_STORE_CHUNK_EXTRACTIONS,
+                workspace=self.workspace,
+                global_config=global_config,
+                embedding_func=None,
+            )
+
         self.text_chunks: BaseKVStorage = self.key_string_value_json_storage_cls(  # type: ignore
             namespace=NameSpace.KV_STORE_TEXT_CHUNKS,
             workspace=self.workspace,
@@ -626,6 +927,18 @@ class LightRAG:
             self.llm_model_max_async,
             llm_timeout=self.default_llm_timeout,
             queue_name="LLM func",
+            adaptive=self.adaptive_concurrency,
+            adaptive_min_size=self.adaptive_concurrency_min,
+            adaptive_max_size=int(
+                self.llm_model_max_async * self.adaptive_concurrency_max_factor
+            ),
+            rate_limiter=get_rate_limiter(
+                self.llm_rate_limit_key or self.llm_model_name,
+                rpm=self.llm_rpm_limit,
+                tpm=self.llm_tpm_limit,
+            ),
+            token_estimator=self._estimate_llm_call_tokens,
+            result_token_counter=self._count_result_tokens,
         )(
             partial(
                 self.llm_model_func,  # type: ignore
@@ -651,18 +964,27 @@ class LightRAG:
                 self.chunks_vdb,
                 self.chunk_entity_relation_graph,
                 self.llm_response_cache,
+                self.embedding_cache,
+                self.chunk_extractions,
                 self.doc_status,
             ):
                 if storage:
                     # logger.debug(f"Initializing storage: {storage}")
                     await storage.initialize()
+            if self._embedding_cache_layer is not None:
+                await self._embedding_cache_layer.load_index()
 
+            # Pooled LLM/embedding clients stay open while any instance on this
+            # loop is initialized
+            hold_shared_clients()
             self._storages_status = StoragesStatus.INITIALIZED
             logger.debug("All storage types initialized")
 
     async def finalize_storages(self):
         """Asynchronously finalize the storages with improved error handling"""
         if self._storages_status == StoragesStatus.INITIALIZED:
+            if self._embedding_cache_layer is not None:
+                await self._embedding_cache_layer.save_index()
             storages = [
                 ("full_docs", self.full_docs),
                 ("text_chunks", self.text_chunks),
@@ -675,6 +997,8 @@ class LightRAG:
                 ("chunks_vdb", self.chunks_vdb),
                 ("chunk_entity_relation_graph", self.chunk_entity_relation_graph),
                 ("llm_response_cache", self.llm_response_cache),
+                ("embedding_cache", self.embedding_cache),
+                ("chunk_extractions", self.chunk_extractions),
                 ("doc_status", self.doc_status),
             ]
 
@@ -708,6 +1032,60 @@ class LightRAG:
 
             self._storages_status = StoragesStatus.FINALIZED
 
+            # Release pooled LLM/embedding clients; they close once no other
+            # instance holds them
+            try:
+                await release_shared_clients()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled LLM/embedding clients: {e}")
+
+    def _estimate_llm_call_tokens(self, args: tuple, kwargs: dict) -> tuple[int, int]:
+        """(prompt tokens, expected completion tokens) of an LLM call for rate limiting"""
+        parts = [args[0] if args else kwargs.get("prompt")]
+        parts.append(kwargs.get("system_prompt"))
+        for message in kwargs.get("history_messages") or []:
+            parts.append(
+                message.get("content") if isinstance(message, dict) else message
+            )
+        input_tokens = sum(
+            len(self.tokenizer.encode(part))
+            for part in parts
+            if isinstance(part, str) and part
+        )
+        max_tokens = kwargs.get("max_tokens") or self.llm_model_kwargs.get("max_tokens")
+        expected_output = self.llm_output_tokens_estimate
+        if isinstance(max_tokens, int) and max_tokens > 0:
+            expected_output = min(expected_output, max_tokens)
+        return input_tokens, expected_output
+
+    def _estimate_embedding_call_tokens(
+        self, args: tuple, kwargs: dict
+    ) -> tuple[int, int]:
+        texts = args[0] if args else kwargs.get("texts") or []
+        if isinstance(texts, str):
+            texts = [texts]
+        return sum(len(self.tokenizer.encode(text)) for text in texts), 0
+
+    def _count_result_tokens(self, result: Any) -> int | None:
+        # Streaming responses are not counted; their reservation stands
+        if isinstance(result, str):
+            return len(self.tokenizer.encode(result))
+        return None
+
+    def embedding_cache_stats(self) -> dict[str, Any]:
+        """Size, hit rate and eviction counters of the embedding cache."""
+        if self._embedding_cache_layer is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._embedding_cache_layer.stats()}
+
+    def concurrency_stats(self) -> dict[str, Any]:
+        """Concurrency limit, queue depth, in-flight count, latency percentiles and
+        rate-limit throttling of the LLM and embedding call queues."""
+        return {
+            "llm": self.llm_model_func.metrics(),
+            "embedding": self._embedding_concurrency_metrics(),
+        }
+
     async def check_and_migrate_data(self):
         """Check if data migration is needed and perform migration if necessary"""
         async with get_data_init_lock():
@@ -1605,6 +1983,27 @@ class LightRAG:
                         "cur_batch": 0,  # Number of files already processed
                         "request_pending": False,  # Clear any previous request
                         "cancellation_requested": False,  # Initialize cancellation flag
+                        # Unchanged entities/relations not re-embedded
+                        "vdb_upserts_skipped": 0,
+                        # Extraction LLM calls saved by chunk packing
+                        "extract_calls_saved": 0,
+                        # Estimated prompt tokens saved by chunk packing
+                        "extract_tokens_saved": 0,
+                        "gleaning_calls": 0,  # Gleaning LLM calls made
+                        # Gleaning calls skipped by the adaptive policy
+                        "gleaning_skipped": 0,
+                        "gleaning_new_entities": 0,  # Entities found only by gleaning
+                        "gleaning_new_relations": 0,  # Relations found only by gleaning
+                        # Vector upserts saved by merge batching
+                        "batch_merge_vdb_upserts_saved": 0,
+                        # Summary LLM calls saved by merge batching
+                        "batch_merge_summary_calls_saved": 0,
+                        "summary_llm_calls": 0,  # Description summary LLM calls
+                        # Estimated summary prompt + completion tokens
+                        "summary_tokens": 0,
+                        # Merges that folded into the stored summary
+                        "summary_folds": 0,
+                        "stages": {},  # Per-stage queue depth and throughput
                         "latest_message": "",
                     }
                 )
@@ -1686,379 +2085,497 @@ class LightRAG:
 
                 # Create a counter to track the number of processed files
                 processed_count = 0
-                # Create a semaphore to limit the number of concurrent file processing
-                semaphore = asyncio.Semaphore(self.max_parallel_insert)
-
-                async def process_document(
-                    doc_id: str,
-                    status_doc: DocProcessingStatus,
-                    split_by_character: str | None,
-                    split_by_character_only: bool,
-                    pipeline_status: dict,
-                    pipeline_status_lock: asyncio.Lock,
-                    semaphore: asyncio.Semaphore,
-                ) -> None:
-                    """Process single document"""
-                    # Initialize variables at the start to prevent UnboundLocalError in error handling
-                    file_path = "unknown_source"
-                    current_file_number = 0
-                    file_extraction_stage_ok = False
-                    processing_start_time = int(time.time())
-                    first_stage_tasks = []
-                    entity_relation_task = None
-
-                    async with semaphore:
-                        nonlocal processed_count
-                        # Initialize to prevent UnboundLocalError in error handling
-                        first_stage_tasks = []
-                        entity_relation_task = None
-                        try:
-                            # Check for cancellation before starting document processing
-                            async with pipeline_status_lock:
-                                if pipeline_status.get("cancellation_requested", False):
-                                    raise PipelineCancelledException("User cancelled")
-
-                            # Get file path from status document
-                            file_path = getattr(
-                                status_doc, "file_path", "unknown_source"
-                            )
 
-                            async with pipeline_status_lock:
-                                # Update processed file count and save current file number
-                                processed_count += 1
-                                current_file_number = (
-                                    processed_count  # Save the current file number
-                                )
-                                pipeline_status["cur_batch"] = processed_count
-
-                                log_message = f"Extracting stage {current_file_number}/{total_files}: {file_path}"
-                                logger.info(log_message)
-                                pipeline_status["history_messages"].append(log_message)
-                                log_message = f"Processing d-id: {doc_id}"
-                                logger.info(log_message)
-                                pipeline_status["latest_message"] = log_message
-                                pipeline_status["history_messages"].append(log_message)
-
-                                # Prevent memory growth: keep only latest 5000 messages when exceeding 10000
-                                if len(pipeline_status["history_messages"]) > 10000:
-                                    logger.info(
-                                        f"Trimming pipeline history from {len(pipeline_status['history_messages'])} to 5000 messages"
-                                    )
-                                    pipeline_status["history_messages"] = (
-                                        pipeline_status["history_messages"][-5000:]
-                                    )
+                # Documents flow through three stages connected by bounded queues:
+                # chunking -> extraction -> merging. Extraction of later documents keeps
+                # the LLM busy while earlier documents are merged (and vice versa).
+                stage_metrics = PipelineStageMetrics(
+                    ("chunking", "extraction", "merging")
+                )
+                chunk_queue: asyncio.Queue = asyncio.Queue()
+                extract_queue: asyncio.Queue = asyncio.Queue(
+                    maxsize=self.max_parallel_insert
+                )
+                merge_queue: asyncio.Queue = asyncio.Queue(
+                    maxsize=self.max_parallel_insert
+                )
 
-                            # Get document content from full_docs
-                            content_data = await self.full_docs.get_by_id(doc_id)
-                            if not content_data:
-                                raise Exception(
-                                    f"Document content not found in full_docs for doc_id: {doc_id}"
-                                )
-                            content = content_data["content"]
-
-                            # Generate chunks from document
-                            chunks: dict[str, Any] = {
-                                compute_mdhash_id(dp["content"], prefix="chunk-"): {
-                                    **dp,
-                                    "full_doc_id": doc_id,
-                                    "file_path": file_path,  # Add file path to each chunk
-                                    "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
-                                }
-                                for dp in self.chunking_func(
-                                    self.tokenizer,
-                                    content,
-                                    split_by_character,
-                                    split_by_character_only,
-                                    self.chunk_overlap_token_size,
-                                    self.chunk_token_size,
-                                )
-                            }
+                async def publish_stage_metrics() -> None:
+                    async with pipeline_status_lock:
+                        pipeline_status["stages"] = stage_metrics.snapshot()
 
-                            if not chunks:
-                                logger.warning("No document chunks to process")
-
-                            # Record processing start time
-                            processing_start_time = int(time.time())
-
-                            # Check for cancellation before entity extraction
-                            async with pipeline_status_lock:
-                                if pipeline_status.get("cancellation_requested", False):
-                                    raise PipelineCancelledException("User cancelled")
-
-                            # Process document in two stages
-                            # Stage 1: Process text chunks and docs (parallel execution)
-                            doc_status_task = asyncio.create_task(
-                                self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.PROCESSING,
-                                            "chunks_count": len(chunks),
-                                            "chunks_list": list(
-                                                chunks.keys()
-                                            ),  # Save chunks list
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now(
-                                                timezone.utc
-                                            ).isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time
-                                            },
-                                        }
-                                    }
-                                )
+                async def fail_document(
+                    doc: dict[str, Any], e: Exception, merging: bool
+                ) -> None:
+                    """Log a stage failure and mark the document FAILED"""
+                    current_file_number = doc["current_file_number"]
+                    file_path = doc["file_path"]
+                    status_doc = doc["status_doc"]
+                    stage_label = "during merge " if merging else ""
+                    if isinstance(e, PipelineCancelledException):
+                        # User cancellation - log brief message only, no traceback
+                        error_msg = f"User cancelled {stage_label}{current_file_number}/{total_files}: {file_path}"
+                        logger.warning(error_msg)
+                        async with pipeline_status_lock:
+                            pipeline_status["latest_message"] = error_msg
+                            pipeline_status["history_messages"].append(error_msg)
+                    else:
+                        # Other exceptions - log with traceback
+                        logger.error(traceback.format_exc())
+                        if merging:
+                            error_msg = f"Merging stage failed in document {current_file_number}/{total_files}: {file_path}"
+                        else:
+                            error_msg = f"Failed to extract document {current_file_number}/{total_files}: {file_path}"
+                        logger.error(error_msg)
+                        async with pipeline_status_lock:
+                            pipeline_status["latest_message"] = error_msg
+                            pipeline_status["history_messages"].append(
+                                traceback.format_exc()
                             )
-                            chunks_vdb_task = asyncio.create_task(
-                                self.chunks_vdb.upsert(chunks)
+                            pipeline_status["history_messages"].append(error_msg)
+
+                    # Cancel tasks that are not yet completed
+                    for task in doc["tasks"]:
+                        if task and not task.done():
+                            task.cancel()
+
+                    # Persistent llm cache with error handling
+                    if self.llm_response_cache:
+                        try:
+                            await self.llm_response_cache.index_done_callback()
+                        except Exception as persist_error:
+                            logger.error(
+                                f"Failed to persist LLM cache: {persist_error}"
                             )
-                            text_chunks_task = asyncio.create_task(
-                                self.text_chunks.upsert(chunks)
+
+                    # Persist extraction checkpoints so a retry resumes after the last
+                    # finished chunk
+                    if self.chunk_extractions:
+                        try:
+                            await self.chunk_extractions.index_done_callback()
+                        except Exception as persist_error:
+                            logger.error(
+                                f"Failed to persist extraction checkpoint: {persist_error}"
                             )
 
-                            # First stage tasks (parallel execution)
-                            first_stage_tasks = [
-                                doc_status_task,
-                                chunks_vdb_task,
-                                text_chunks_task,
-                            ]
-                            entity_relation_task = None
+                    # Record processing end time for failed case
+                    processing_end_time = int(time.time())
 
-                            # Execute first stage tasks
-                            await asyncio.gather(*first_stage_tasks)
+                    failed_status = {
+                        "status": DocStatus.FAILED,
+                        "error_msg": str(e),
+                        "content_summary": status_doc.content_summary,
+                        "content_length": status_doc.content_length,
+                        "created_at": status_doc.created_at,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                        "file_path": file_path,
+                        "track_id": status_doc.track_id,  # Preserve existing track_id
+                        "metadata": {
+                            "processing_start_time": doc["processing_start_time"],
+                            "processing_end_time": processing_end_time,
+                        },
+                    }
+                    # Keep the chunk list and checkpointed chunk count so completion
+                    # can be reported
+                    if doc.get("chunks"):
+                        failed_status["chunks_count"] = len(doc["chunks"])
+                        failed_status["chunks_list"] = list(doc["chunks"].keys())
+                        failed_status["metadata"].update(
+                            extracted_chunks=doc.get("extracted_chunks", 0),
+                            extraction_signature=self._extraction_signature(),
+                        )
 
-                            # Stage 2: Process entity relation graph (after text_chunks are saved)
-                            entity_relation_task = asyncio.create_task(
-                                self._process_extract_entities(
-                                    chunks, pipeline_status, pipeline_status_lock
-                                )
-                            )
-                            chunk_results = await entity_relation_task
-                            file_extraction_stage_ok = True
+                    # Update document status to failed
+                    await self.doc_status.upsert({doc["doc_id"]: failed_status})
 
-                        except Exception as e:
-                            # Check if this is a user cancellation
-                            if isinstance(e, PipelineCancelledException):
-                                # User cancellation - log brief message only, no traceback
-                                error_msg = f"User cancelled {current_file_number}/{total_files}: {file_path}"
-                                logger.warning(error_msg)
-                                async with pipeline_status_lock:
-                                    pipeline_status["latest_message"] = error_msg
-                                    pipeline_status["history_messages"].append(
-                                        error_msg
-                                    )
-                            else:
-                                # Other exceptions - log with traceback
-                                logger.error(traceback.format_exc())
-                                error_msg = f"Failed to extract document {current_file_number}/{total_files}: {file_path}"
-                                logger.error(error_msg)
-                                async with pipeline_status_lock:
-                                    pipeline_status["latest_message"] = error_msg
-                                    pipeline_status["history_messages"].append(
-                                        traceback.format_exc()
-                                    )
-                                    pipeline_status["history_messages"].append(
-                                        error_msg
-                                    )
+                async def chunk_document(doc: dict[str, Any]) -> bool:
+                    """Stage 1: split the document and store its chunks"""
+                    nonlocal processed_count
+                    doc_id = doc["doc_id"]
+                    status_doc = doc["status_doc"]
+
+                    # Check for cancellation before starting document processing
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException("User cancelled")
+
+                    # Get file path from status document
+                    file_path = getattr(status_doc, "file_path", "unknown_source")
+                    doc["file_path"] = file_path
+
+                    async with pipeline_status_lock:
+                        # Update processed file count and save current file number
+                        processed_count += 1
+                        doc["current_file_number"] = processed_count
+                        pipeline_status["cur_batch"] = processed_count
+
+                        log_message = f"Extracting stage {processed_count}/{total_files}: {file_path}"
+                        logger.info(log_message)
+                        pipeline_status["history_messages"].append(log_message)
+                        log_message = f"Processing d-id: {doc_id}"
+                        logger.info(log_message)
+                        pipeline_status["latest_message"] = log_message
+                        pipeline_status["history_messages"].append(log_message)
 
-                            # Cancel tasks that are not yet completed
-                            all_tasks = first_stage_tasks + (
-                                [entity_relation_task] if entity_relation_task else []
+                        # Prevent memory growth: keep only latest 5000 messages when exceeding 10000
+                        if len(pipeline_status["history_messages"]) > 10000:
+                            logger.info(
+                                f"Trimming pipeline history from {len(pipeline_status['history_messages'])} to 5000 messages"
                             )
-                            for task in all_tasks:
-                                if task and not task.done():
-                                    task.cancel()
+                            pipeline_status["history_messages"] = pipeline_status[
+                                "history_messages"
+                            ][-5000:]
 
-                            # Persistent llm cache with error handling
-                            if self.llm_response_cache:
-                                try:
-                                    await self.llm_response_cache.index_done_callback()
-                                except Exception as persist_error:
-                                    logger.error(
-                                        f"Failed to persist LLM cache: {persist_error}"
-                                    )
+                    # Get document content from full_docs
+                    content_data = await self.full_docs.get_by_id(doc_id)
+                    if not content_data:
+                        raise Exception(
+                            f"Document content not found in full_docs for doc_id: {doc_id}"
+                        )
+                    content = content_data["content"]
+
+                    # Generate chunks from document
+                    chunks: dict[str, Any] = {
+                        compute_mdhash_id(dp["content"], prefix="chunk-"): {
+                            **dp,
+                            "full_doc_id": doc_id,
+                            "file_path": file_path,  # Add file path to each chunk
+                            "llm_cache_list": [],  # Initialize empty LLM cache list for each chunk
+                        }
+                        for dp in self.chunking_func(
+                            self.tokenizer,
+                            content,
+                            split_by_character,
+                            split_by_character_only,
+                            self.chunk_overlap_token_size,
+                            self.chunk_token_size,
+                        )
+                    }
+                    doc["chunks"] = chunks
+
+                    if not chunks:
+                        logger.warning("No document chunks to process")
+
+                    # Record processing start time
+                    processing_start_time = int(time.time())
+                    doc["processing_start_time"] = processing_start_time
+
+                    # Check for cancellation before entity extraction
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException("User cancelled")
+
+                    # Process text chunks and docs (parallel execution)
+                    doc["processing_status"] = {
+                        "status": DocStatus.PROCESSING,
+                        "chunks_count": len(chunks),
+                        "chunks_list": list(chunks.keys()),  # Save chunks list
+                        "content_summary": status_doc.content_summary,
+                        "content_length": status_doc.content_length,
+                        "created_at": status_doc.created_at,
+                        "updated_at": datetime.now(timezone.utc).isoformat(),
+                        "file_path": file_path,
+                        "track_id": status_doc.track_id,  # Preserve existing track_id
+                        "metadata": {"processing_start_time": processing_start_time},
+                    }
+                    doc_status_task = asyncio.create_task(
+                        self.doc_status.upsert({doc_id: doc["processing_status"]})
+                    )
+                    chunks_vdb_task = asyncio.create_task(
+                        self.chunks_vdb.upsert(chunks)
+                    )
+                    text_chunks_task = asyncio.create_task(
+                        self.text_chunks.upsert(chunks)
+                    )
+                    doc["tasks"] = [doc_status_task, chunks_vdb_task, text_chunks_task]
+                    await asyncio.gather(*doc["tasks"])
+                    return True
 
-                            # Record processing end time for failed case
-                            processing_end_time = int(time.time())
+                async def extract_document(doc: dict[str, Any]) -> bool:
+                    """Stage 2: extract entities and relations (after text_chunks are saved)"""
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException("User cancelled")
 
-                            # Update document status to failed
+                    async def record_extraction_progress(extracted_chunks: int) -> None:
+                        """Keep the checkpointed chunk count in doc_status for completion reporting"""
+                        doc["extracted_chunks"] = max(
+                            doc.get("extracted_chunks", 0), extracted_chunks
+                        )
+                        processing_status = doc["processing_status"]
+                        try:
                             await self.doc_status.upsert(
                                 {
-                                    doc_id: {
-                                        "status": DocStatus.FAILED,
-                                        "error_msg": str(e),
-                                        "content_summary": status_doc.content_summary,
-                                        "content_length": status_doc.content_length,
-                                        "created_at": status_doc.created_at,
+                                    doc["doc_id"]: {
+                                        **processing_status,
                                         "updated_at": datetime.now(
                                             timezone.utc
                                         ).isoformat(),
-                                        "file_path": file_path,
-                                        "track_id": status_doc.track_id,  # Preserve existing track_id
                                         "metadata": {
-                                            "processing_start_time": processing_start_time,
-                                            "processing_end_time": processing_end_time,
+                                            **processing_status["metadata"],
+                                            "extracted_chunks": doc["extracted_chunks"],
+                                            "extraction_signature": self._extraction_signature(),
                                         },
                                     }
                                 }
                             )
+                        except Exception as e:
+                            logger.warning(
+                                f"Failed to record extraction progress of {doc['doc_id']}: {e}"
+                            )
 
-                        # Concurrency is controlled by keyed lock for individual entities and relationships
-                        if file_extraction_stage_ok:
-                            try:
-                                # Check for cancellation before merge
-                                async with pipeline_status_lock:
-                                    if pipeline_status.get(
-                                        "cancellation_requested", False
-                                    ):
-                                        raise PipelineCancelledException(
-                                            "User cancelled"
-                                        )
+                    entity_relation_task = asyncio.create_task(
+                        self._process_extract_entities(
+                            doc["chunks"],
+                            pipeline_status,
+                            pipeline_status_lock,
+                            checkpoint_progress=record_extraction_progress,
+                        )
+                    )
+                    doc["tasks"].append(entity_relation_task)
+                    doc["chunk_results"] = await entity_relation_task
+                    return True
 
-                                # Use chunk_results from entity_relation_task
-                                await merge_nodes_and_edges(
-                                    chunk_results=chunk_results,  # result collected from entity_relation_task
-                                    knowledge_graph_inst=self.chunk_entity_relation_graph,
-                                    entity_vdb=self.entities_vdb,
-                                    relationships_vdb=self.relationships_vdb,
-                                    global_config=asdict(self),
-                                    full_entities_storage=self.full_entities,
-                                    full_relations_storage=self.full_relations,
-                                    doc_id=doc_id,
-                                    pipeline_status=pipeline_status,
-                                    pipeline_status_lock=pipeline_status_lock,
-                                    llm_response_cache=self.llm_response_cache,
-                                    entity_chunks_storage=self.entity_chunks,
-                                    relation_chunks_storage=self.relation_chunks,
-                                    current_file_number=current_file_number,
-                                    total_files=total_files,
-                                    file_path=file_path,
-                                )
+                async def merge_documents(batch: list[dict[str, Any]]) -> bool:
+                    """Stage 3: merge extracted entities and relations into the graph
 
-                                # Record processing end time
-                                processing_end_time = int(time.time())
-
-                                await self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.PROCESSED,
-                                            "chunks_count": len(chunks),
-                                            "chunks_list": list(chunks.keys()),
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now(
-                                                timezone.utc
-                                            ).isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time,
-                                                "processing_end_time": processing_end_time,
-                                            },
-                                        }
-                                    }
-                                )
+                    Several documents are merged together (one merge per entity/relation)
+                    when merge batching is enabled.
+                    """
+                    # Check for cancellation before merge
+                    async with pipeline_status_lock:
+                        if pipeline_status.get("cancellation_requested", False):
+                            raise PipelineCancelledException("User cancelled")
 
-                                # Call _insert_done after processing each file
-                                await self._insert_done()
+                    first = batch[0]
+                    # Concurrency is controlled by keyed lock for individual entities and relationships
+                    await merge_nodes_and_edges(
+                        chunk_results=first["chunk_results"],
+                        knowledge_graph_inst=self.chunk_entity_relation_graph,
+                        entity_vdb=self.entities_vdb,
+                        relationships_vdb=self.relationships_vdb,
+                        global_config=asdict(self),
+                        full_entities_storage=self.full_entities,
+                        full_relations_storage=self.full_relations,
+                        doc_id=first["doc_id"],
+                        pipeline_status=pipeline_status,
+                        pipeline_status_lock=pipeline_status_lock,
+                        llm_response_cache=self.llm_response_cache,
+                        entity_chunks_storage=self.entity_chunks,
+                        relation_chunks_storage=self.relation_chunks,
+                        current_file_number=first["current_file_number"],
+                        total_files=total_files,
+                        file_path=first["file_path"]
+                        if len(batch) == 1
+                        else f"{first['file_path']} (+{len(batch) - 1} batched)",
+                        doc_chunk_results={
+                            doc["doc_id"]: doc["chunk_results"] for doc in batch
+                        }
+                        if len(batch) > 1
+                        else None,
+                    )
 
-                                async with pipeline_status_lock:
-                                    log_message = f"Completed processing file {current_file_number}/{total_files}: {file_path}"
-                                    logger.info(log_message)
-                                    pipeline_status["latest_message"] = log_message
-                                    pipeline_status["history_messages"].append(
-                                        log_message
-                                    )
+                    # Record processing end time
+                    processing_end_time = int(time.time())
+
+                    for doc in batch:
+                        status_doc = doc["status_doc"]
+                        await self.doc_status.upsert(
+                            {
+                                doc["doc_id"]: {
+                                    "status": DocStatus.PROCESSED,
+                                    "chunks_count": len(doc["chunks"]),
+                                    "chunks_list": list(doc["chunks"].keys()),
+                                    "content_summary": status_doc.content_summary,
+                                    "content_length": status_doc.content_length,
+                                    "created_at": status_doc.created_at,
+                                    "updated_at": datetime.now(
+                                        timezone.utc
+                                    ).isoformat(),
+                                    "file_path": doc["file_path"],
+                                    "track_id": status_doc.track_id,  # Preserve existing track_id
+                                    "metadata": {
+                                        "processing_start_time": doc[
+                                            "processing_start_time"
+                                        ],
+                                        "processing_end_time": processing_end_time,
+                                    },
+                                }
+                            }
+                        )
 
-                            except Exception as e:
-                                # Check if this is a user cancellation
-                                if isinstance(e, PipelineCancelledException):
-                                    # User cancellation - log brief message only, no traceback
-                                    error_msg = f"User cancelled during merge {current_file_number}/{total_files}: {file_path}"
-                                    logger.warning(error_msg)
-                                    async with pipeline_status_lock:
-                                        pipeline_status["latest_message"] = error_msg
-                                        pipeline_status["history_messages"].append(
-                                            error_msg
-                                        )
-                                else:
-                                    # Other exceptions - log with traceback
-                                    logger.error(traceback.format_exc())
-                                    error_msg = f"Merging stage failed in document {current_file_number}/{total_files}: {file_path}"
-                                    logger.error(error_msg)
-                                    async with pipeline_status_lock:
-                                        pipeline_status["latest_message"] = error_msg
-                                        pipeline_status["history_messages"].append(
-                                            traceback.format_exc()
-                                        )
-                                        pipeline_status["history_messages"].append(
-                                            error_msg
-                                        )
+                    # Extraction results are in the graph now and checkpoints only
+                    # serve retries
+                    if self.chunk_extractions is not None:
+                        await self.chunk_extractions.delete(
+                            [
+                                make_extraction_checkpoint_key(doc["doc_id"], chunk_id)
+                                for doc in batch
+                                for chunk_id in doc["chunks"]
+                            ]
+                        )
 
-                                # Persistent llm cache with error handling
-                                if self.llm_response_cache:
-                                    try:
-                                        await self.llm_response_cache.index_done_callback()
-                                    except Exception as persist_error:
-                                        logger.error(
-                                            f"Failed to persist LLM cache: {persist_error}"
-                                        )
+                    # Call _insert_done after processing each file (batch)
+                    await self._insert_done()
 
-                                # Record processing end time for failed case
-                                processing_end_time = int(time.time())
-
-                                # Update document status to failed
-                                await self.doc_status.upsert(
-                                    {
-                                        doc_id: {
-                                            "status": DocStatus.FAILED,
-                                            "error_msg": str(e),
-                                            "content_summary": status_doc.content_summary,
-                                            "content_length": status_doc.content_length,
-                                            "created_at": status_doc.created_at,
-                                            "updated_at": datetime.now().isoformat(),
-                                            "file_path": file_path,
-                                            "track_id": status_doc.track_id,  # Preserve existing track_id
-                                            "metadata": {
-                                                "processing_start_time": processing_start_time,
-                                                "processing_end_time": processing_end_time,
-                                            },
-                                        }
-                                    }
-                                )
+                    async with pipeline_status_lock:
+                        for doc in batch:
+                            log_message = f"Completed processing file {doc['current_file_number']}/{total_files}: {doc['file_path']}"
+                            logger.info(log_message)
+                            pipeline_status["latest_message"] = log_message
+                            pipeline_status["history_messages"].append(log_message)
+                    return True
+
+                async def stage_worker(
+                    stage: str,
+                    handler,
+                    in_queue: asyncio.Queue,
+                    out_queue: asyncio.Queue | None,
+                    out_stage: str | None,
+                    batch_size: int = 1,
+                    batch_window: float = 0.0,
+                ) -> None:
+                    """Take documents from in_queue until the None sentinel, hand successes to out_queue
+
+                    Up to batch_size documents arriving within batch_window seconds of the
+                    first one are handed to the handler together.
+                    """
+                    loop = asyncio.get_running_loop()
+                    finished = False
+                    while not finished:
+                        doc = await in_queue.get()
+                        if doc is None:
+                            return
+                        batch = [doc]
+                        deadline = loop.time() + batch_window
+                        while len(batch) < batch_size:
+                            remaining = deadline - loop.time()
+                            if remaining <= 0:
+                                break
+                            try:
+                                doc = await asyncio.wait_for(in_queue.get(), remaining)
+                            except asyncio.TimeoutError:
+                                break
+                            if doc is None:
+                                finished = True
+                                break
+                            batch.append(doc)
+
+                        started_at = [stage_metrics.started(stage) for _ in batch]
+                        await publish_stage_metrics()
+                        ok = False
+                        try:
+                            ok = await handler(batch)
+                        except Exception as e:
+                            for doc in batch:
+                                try:
+                                    await fail_document(
+                                        doc, e, merging=stage == "merging"
+                                    )
+                                except Exception as status_error:
+                                    logger.error(
+                                        f"Failed to record failure of document {doc['doc_id']}: {status_error}"
+                                    )
+                        for doc, doc_started_at in zip(batch, started_at):
+                            stage_metrics.finished(stage, doc_started_at, ok)
+                            if ok and out_queue is not None:
+                                stage_metrics.enqueued(out_stage)
+                                await out_queue.put(doc)
+                        await publish_stage_metrics()
 
-                # Create processing tasks for all documents
-                doc_tasks = []
                 for doc_id, status_doc in to_process_docs.items():
-                    doc_tasks.append(
-                        process_document(
-                            doc_id,
-                            status_doc,
-                            split_by_character,
-                            split_by_character_only,
-                            pipeline_status,
-                            pipeline_status_lock,
-                            semaphore,
-                        )
+                    chunk_queue.put_nowait(
+                        {
+                            "doc_id": doc_id,
+                            "status_doc": status_doc,
+                            "file_path": "unknown_source",
+                            "current_file_number": 0,
+                            "processing_start_time": int(time.time()),
+                            "tasks": [],
+                        }
                     )
-
-                # Wait for all document processing to complete
+                    stage_metrics.enqueued("chunking")
+
+                async def chunk_batch(batch: list[dict[str, Any]]) -> bool:
+                    return await chunk_document(batch[0])
+
+                async def extract_batch(batch: list[dict[str, Any]]) -> bool:
+                    return await extract_document(batch[0])
+
+                # (stage, handler, input queue, output queue, next stage, workers,
+                #  batch size, batch window)
+                stages = [
+                    (
+                        "chunking",
+                        chunk_batch,
+                        chunk_queue,
+                        extract_queue,
+                        "extraction",
+                        self.max_parallel_insert,
+                        1,
+                        0.0,
+                    ),
+                    (
+                        "extraction",
+                        extract_batch,
+                        extract_queue,
+                        merge_queue,
+                        "merging",
+                        self.max_parallel_insert,
+                        1,
+                        0.0,
+                    ),
+                    (
+                        "merging",
+                        merge_documents,
+                        merge_queue,
+                        None,
+                        None,
+                        self.max_parallel_merge,
+                        max(1, self.merge_batch_size),
+                        self.merge_batch_window,
+                    ),
+                ]
+                stage_workers = [
+                    [
+                        asyncio.create_task(
+                            stage_worker(
+                                stage,
+                                handler,
+                                in_queue,
+                                out_queue,
+                                out_stage,
+                                batch_size,
+                                batch_window,
+                            )
+                        )
+                        for _ in range(max(1, workers))
+                    ]
+                    for (
+                        stage,
+                        handler,
+                        in_queue,
+                        out_queue,
+                        out_stage,
+                        workers,
+                        batch_size,
+                        batch_window,
+                    ) in stages
+                ]
+
+                # Shut stages down in order: once a stage's workers are done, nothing
+                # more can enter the next queue, so it receives one sentinel per worker
                 try:
-                    await asyncio.gather(*doc_tasks)
-                except PipelineCancelledException:
-                    # Cancel all remaining tasks
-                    for task in doc_tasks:
-                        if not task.done():
-                            task.cancel()
-
-                    # Wait for all tasks to complete cancellation
-                    await asyncio.wait(doc_tasks, return_when=asyncio.ALL_COMPLETED)
-
-                    # Exit directly (document statuses already updated in process_document)
-                    return
+                    for (_, _, in_queue, *_), workers in zip(stages, stage_workers):
+                        for _ in workers:
+                            await in_queue.put(None)
+                        await asyncio.gather(*workers)
+                finally:
+                    for workers in stage_workers:
+                        for task in workers:
+                            if not task.done():
+                                task.cancel()
+                await publish_stage_metrics()
 
                 # Check if there's a pending request to process more documents (with lock)
                 has_pending_request = False
@@ -2101,7 +2618,11 @@ class LightRAG:
                 pipeline_status["history_messages"].append(log_message)
 
     async def _process_extract_entities(
-        self, chunk: dict[str, Any], pipeline_status=None, pipeline_status_lock=None
+        self,
+        chunk: dict[str, Any],
+        pipeline_status=None,
+        pipeline_status_lock=None,
+        checkpoint_progress=None,
     ) -> list:
         try:
             chunk_results = await extract_entities(
@@ -2111,6 +2632,8 @@ class LightRAG:
                 pipeline_status_lock=pipeline_status_lock,
                 llm_response_cache=self.llm_response_cache,
                 text_chunks_storage=self.text_chunks,
+                checkpoint_storage=self.chunk_extractions,
+                checkpoint_progress=checkpoint_progress,
             )
             return chunk_results
         except Exception as e:
@@ -2124,6 +2647,8 @@ class LightRAG:
     async def _insert_done(
         self, pipeline_status=None, pipeline_status_lock=None
     ) -> None:
+        if self._embedding_cache_layer is not None:
+            await self._embedding_cache_layer.save_index()
         tasks = [
             cast(StorageNameSpace, storage_inst).index_done_callback()
             for storage_inst in [  # type: ignore
@@ -2135,6 +2660,8 @@ class LightRAG:
                 self.entity_chunks,
                 self.relation_chunks,
                 self.llm_response_cache,
+                self.embedding_cache,
+                self.chunk_extractions,
                 self.entities_vdb,
                 self.relationships_vdb,
                 self.chunks_vdb,
@@ -2388,6 +2915,99 @@ class LightRAG:
         else:
             return llm_response.get("content", "")
 
+    async def aquery_batch(
+        self,
+        queries: list[str],
+        param: QueryParam = QueryParam(),
+        system_prompt: str | None = None,
+        max_concurrency: int | None = None,
+        stats: dict[str, int] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Run many queries concurrently and yield each result as soon as it completes.
+
+        Identical queries (after stripping whitespace) are executed once and their
+        result is yielded for every position they appear at. At most
+        ``max_concurrency`` queries (default: llm_model_max_async) run at a time.
+        All distinct queries are embedded up front in batches of
+        embedding_batch_num texts, and keyword embeddings issued by concurrently
+        running queries wait up to embedding_micro_batch_wait_ms (at least 10 ms)
+        so they are coalesced into shared embedding_func calls.
+
+        Args:
+            queries: Query strings to execute.
+            param: Query parameters shared by all queries (streaming is disabled).
+            system_prompt: Optional custom system prompt, as in aquery.
+            max_concurrency: Maximum number of queries executed simultaneously.
+            stats: Optional dict filled, once the batch ends, with the number of
+                ``queries``, ``unique_queries``, ``embedding_calls``,
+                ``embedding_texts_requested`` and ``embedding_texts_embedded``.
+
+        Yields:
+            dict: ``{"index", "query", "status", "response"}`` on success, or
+            ``{"index", "query", "status": "failure", "error"}`` when a query
+            fails. Results arrive in completion order, not input order.
+        """
+        param = replace(param, stream=False)
+        positions: dict[str, list[int]] = {}
+        for index, query in enumerate(queries):
+            positions.setdefault(query.strip(), []).append(index)
+        if not positions:
+            return
+
+        semaphore = asyncio.Semaphore(max_concurrency or self.llm_model_max_async)
+        # Keyword embeddings of concurrent queries must wait for each other
+        # instead of being flushed as urgent query-time calls
+        batcher = EmbeddingBatcher(
+            self.embedding_func,
+            max_batch_size=self.embedding_batch_num,
+            max_wait=max(self.embedding_micro_batch_wait_ms, 10) / 1000,
+            urgent_below=0,
+            memoize=True,
+        )
+
+        async def _run_one(query: str) -> tuple[str, dict[str, Any]]:
+            async with semaphore:
+                try:
+                    result = await self.aquery_llm(query, param, system_prompt)
+                    return query, {
+                        "status": "success",
+                        "response": result.get("llm_response", {}).get("content", ""),
+                    }
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"[aquery_batch] Query failed: {e}")
+                    return query, {"status": "failure", "error": str(e)}
+
+        with embedding_batch_scope(batcher):
+            # Embed every distinct query up front; per-query calls then hit the memo
+            try:
+                await batcher(list(positions), _priority=5)
+            except Exception as e:
+                logger.warning(f"[aquery_batch] Query embedding prefetch failed: {e}")
+            tasks = [asyncio.create_task(_run_one(q)) for q in positions]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                query, outcome = await next_done
+                for index in positions[query]:
+                    yield {"index": index, "query": queries[index], **outcome}
+        finally:
+            for task in tasks:
+                task.cancel()
+            if stats is not None:
+                stats.update(
+                    queries=len(queries),
+                    unique_queries=len(positions),
+                    embedding_calls=batcher.calls,
+                    embedding_texts_requested=batcher.texts_requested,
+                    embedding_texts_embedded=batcher.texts_embedded,
+                )
+            logger.info(
+                f"[aquery_batch] {len(queries)} queries ({len(positions)} unique), "
+                f"{batcher.texts_requested} embedding texts in {batcher.calls} calls"
+            )
+
     def query_data(
         self,
         query: str,
@@ -2616,6 +3236,100 @@ class LightRAG:
         await self._query_done()
         return final_data
 
+    def search_chunks(
+        self,
+        queries: str | list[str],
+        top_k: int | None = None,
+    ) -> list[dict[str, Any]] | list[list[dict[str, Any]]]:
+        """Synchronous version of asearch_chunks."""
+        loop = always_get_an_event_loop()
+        return loop.run_until_complete(self.asearch_chunks(queries, top_k))
+
+    async def asearch_chunks(
+        self,
+        queries: str | list[str],
+        top_k: int | None = None,
+    ) -> list[dict[str, Any]] | list[list[dict[str, Any]]]:
+        """
+        Lean vector-only retrieval: nearest text chunks for one or more queries.
+
+        Unlike aquery_data in naive mode, this skips keyword extraction, reranking,
+        token truncation and reference generation. All queries are embedded with a
+        single embedding request, chunks_vdb is searched directly, and the chunk
+        records of all hits are fetched from text_chunks in one get_by_ids call.
+
+        Args:
+            queries: A query string, or a list of query strings.
+            top_k: Number of chunks per query (defaults to QueryParam.chunk_top_k).
+
+        Returns:
+            For a single query string, a list of chunk dicts ordered by similarity;
+            for a list of queries, one such list per query (same order). Each chunk
+            dict contains chunk_id, content, file_path, full_doc_id,
+            chunk_order_index, distance and created_at.
+        """
+        single = isinstance(queries, str)
+        query_list = [queries] if single else list(queries)
+        if not query_list:
+            return []
+        top_k = top_k or QueryParam().chunk_top_k
+
+        # Embed each distinct query once, all in one request
+        unique_queries = list(dict.fromkeys(q.strip() for q in query_list))
+        embeddings = await self.embedding_func(unique_queries, _priority=5)
+        embedding_map = dict(zip(unique_queries, embeddings))
+
+        hits_per_query = await asyncio.gather(
+            *[
+                self.chunks_vdb.query(q, top_k=top_k, query_embedding=embedding_map[q])
+                for q in unique_queries
+            ]
+        )
+
+        chunk_ids = list(
+            dict.fromkeys(
+                hit["id"] for hits in hits_per_query for hit in hits if hit.get("id")
+            )
+        )
+        chunk_records = (
+            await self.text_chunks.get_by_ids(chunk_ids) if chunk_ids else []
+        )
+        chunk_map = {
+            cid: record
+            for cid, record in zip(chunk_ids, chunk_records)
+            if record is not None
+        }
+
+        results_map: dict[str, list[dict[str, Any]]] = {}
+        for q, hits in zip(unique_queries, hits_per_query):
+            chunks = []
+            for hit in hits:
+                chunk_id = hit.get("id")
+                record = chunk_map.get(chunk_id, {})
+                content = record.get("content") or hit.get("content")
+                if not content:
+                    continue
+                chunks.append(
+                    {
+                        "chunk_id": chunk_id,
+                        "content": content,
+                        "file_path": record.get("file_path")
+                        or hit.get("file_path", "unknown_source"),
+                        "full_doc_id": record.get("full_doc_id")
+                        or hit.get("full_doc_id"),
+                        "chunk_order_index": record.get("chunk_order_index"),
+                        "distance": hit.get("distance"),
+                        "created_at": hit.get("created_at"),
+                    }
+                )
+            results_map[q] = chunks
+
+        logger.debug(
+            f"[asearch_chunks] {len(query_list)} queries, {len(chunk_ids)} distinct chunks (top_k:{top_k})"
+        )
+        results = [results_map[q.strip()] for q in query_list]
+        return results[0] if single else results
+
     async def aquery_llm(
         self,
         query: str,
@@ -2884,6 +3598,58 @@ class LightRAG:
         # Return the dictionary containing statuses only for the found document IDs
         return found_statuses
 
+    async def aget_docs_completion(
+        self,
+        ids: str | list[str],
+        statuses: dict[str, DocProcessingStatus] | None = None,
+    ) -> dict[str, float]:
+        """Retrieves the completion percentage of one or more documents by their IDs.
+
+        Processed documents are 100% complete. For other documents the percentage is the
+        share of their chunks checkpointed as extracted under the current extraction
+        settings, i.e. the part a retry of a failed document will not extract again. The
+        count is kept in the document's status metadata, so no extraction records are read;
+        a count recorded under other settings is ignored.
+
+        Args:
+            ids: A single document ID (string) or a list of document IDs (list of strings).
+            statuses: Statuses of these documents already loaded by the caller, if any.
+
+        Returns:
+            A dictionary mapping document IDs to a percentage between 0 and 100. IDs that
+            are not found in the storage are omitted.
+        """
+        if statuses is None:
+            statuses = await self.aget_docs_by_ids(ids)
+        completion: dict[str, float] = {}
+        signature = self._extraction_signature()
+        for doc_id, status_obj in statuses.items():
+            status_fields = (
+                status_obj if isinstance(status_obj, dict) else vars(status_obj)
+            )
+            if status_fields.get("status") == DocStatus.PROCESSED:
+                completion[doc_id] = 100.0
+                continue
+            chunks_count = status_fields.get("chunks_count") or len(
+                status_fields.get("chunks_list") or []
+            )
+            metadata = status_fields.get("metadata") or {}
+            extracted = (
+                metadata.get("extracted_chunks", 0)
+                if metadata.get("extraction_signature") == signature
+                else 0
+            )
+            completion[doc_id] = (
+                round(100.0 * min(extracted, chunks_count) / chunks_count, 1)
+                if chunks_count and self.chunk_extractions is not None
+                else 0.0
+            )
+        return completion
+
+    def _extraction_signature(self) -> str:
+        """Signature under which extraction checkpoints of this instance are reused"""
+        return extraction_checkpoint_signature(vars(self))
+
     async def adelete_by_doc_id(
         self, doc_id: str, delete_llm_cache: bool = False
     ) -> DeletionResult:
@@ -3275,6 +4041,13 @@ class LightRAG:
                     try:
                         await self.chunks_vdb.delete(chunk_ids)
                         await self.text_chunks.delete(chunk_ids)
+                        if self.chunk_extractions is not None:
+                            await self.chunk_extractions.delete(
+                                [
+                                    make_extraction_checkpoint_key(doc_id, chunk_id)
+                                    for chunk_id in chunk_ids
+                                ]
+                            )
 
                         async with pipeline_status_lock:
                             log_message = f"Successfully deleted {len(chunk_ids)} chunks from storage"
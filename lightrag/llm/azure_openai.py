@@ -26,9 +26,43 @@ from lightrag.utils import (
     safe_unicode_decode,
     logger,
 )
+from lightrag.llm.client_pool import get_shared_client, httpx_pool_limits
 
 import numpy as np
 
+try:
+    from openai import DefaultAsyncHttpxClient
+except ImportError:  # openai < 1.17
+    from httpx import AsyncClient as DefaultAsyncHttpxClient
+
+
+def _get_azure_async_client(
+    base_url: str | None,
+    deployment: str | None,
+    api_key: str | None,
+    api_version: str | None,
+    timeout: float | None = None,
+) -> AsyncAzureOpenAI:
+    """Return a pooled AsyncAzureOpenAI client shared by calls with the same settings."""
+    return get_shared_client(
+        "azure_openai",
+        lambda: AsyncAzureOpenAI(
+            azure_endpoint=base_url,
+            azure_deployment=deployment,
+            api_key=api_key,
+            api_version=api_version,
+            timeout=timeout,
+            http_client=DefaultAsyncHttpxClient(limits=httpx_pool_limits()),
+        ),
+        base_url=base_url,
+        api_key=api_key,
+        config={
+            "deployment": deployment,
+            "api_version": api_version,
+            "timeout": timeout,
+        },
+    )
+
 
 @retry(
     stop=stop_after_attempt(3),
@@ -69,12 +103,8 @@ async def azure_openai_complete_if_cache(
     kwargs.pop("keyword_extraction", None)
     timeout = kwargs.pop("timeout", None)
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=base_url,
-        azure_deployment=deployment,
-        api_key=api_key,
-        api_version=api_version,
-        timeout=timeout,
+    openai_async_client = _get_azure_async_client(
+        base_url, deployment, api_key, api_version, timeout
     )
     messages = []
     if system_prompt:
@@ -164,11 +194,8 @@ async def azure_openai_embed(
         or os.getenv("OPENAI_API_VERSION")
     )
 
-    openai_async_client = AsyncAzureOpenAI(
-        azure_endpoint=base_url,
-        azure_deployment=deployment,
-        api_key=api_key,
-        api_version=api_version,
+    openai_async_client = _get_azure_async_client(
+        base_url, deployment, api_key, api_version
     )
 
     response = await openai_async_client.embeddings.create(
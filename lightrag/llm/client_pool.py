@@ -0,0 +1,216 @@
+"""
+Process-wide registry of long-lived async clients for LLM and embedding bindings.
+
+Creating a client per call means a fresh connection pool (and TLS handshake)
+for every LLM/embedding request. Bindings instead ask this registry for a
+client keyed by (binding, base_url, api_key hash, client config); the same
+client is returned for identical settings and reused across calls.
+
+Async clients are bound to the event loop they were created on, so clients
+are kept per loop. Several LightRAG instances (e.g. one per workspace) share
+them, so each instance holds the pool of its loop from ``initialize_storages``
+(``hold_shared_clients``) to ``finalize_storages`` (``release_shared_clients``);
+the clients are closed when the last holder releases them.
+``close_shared_clients`` closes them unconditionally (scripts, shutdown).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import inspect
+import json
+import weakref
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from lightrag.constants import (
+    DEFAULT_LLM_CLIENT_KEEPALIVE_EXPIRY,
+    DEFAULT_LLM_CLIENT_MAX_CONNECTIONS,
+    DEFAULT_LLM_CLIENT_MAX_KEEPALIVE,
+)
+from lightrag.utils import get_env_value, logger
+
+
+@dataclass
+class _PooledClient:
+    client: Any
+    closer: Callable[[Any], Any] | None
+    uses: int = 0
+
+
+class ClientPool:
+    """Registry of reusable clients, one set per event loop."""
+
+    def __init__(self) -> None:
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[tuple, _PooledClient]
+        ] = weakref.WeakKeyDictionary()
+        self._holders: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, int] = (
+            weakref.WeakKeyDictionary()
+        )
+        self.created = 0
+        self.reused = 0
+
+    @staticmethod
+    def make_key(
+        binding: str,
+        base_url: str | None,
+        api_key: str | None,
+        config: dict[str, Any] | None = None,
+    ) -> tuple:
+        key_hash = (
+            hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16] if api_key else ""
+        )
+        config_repr = json.dumps(config or {}, sort_keys=True, default=repr)
+        return (binding, base_url or "", key_hash, config_repr)
+
+    def get(
+        self,
+        binding: str,
+        factory: Callable[[], Any],
+        *,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        config: dict[str, Any] | None = None,
+        closer: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        """Return the pooled client for these settings, creating it with ``factory`` once.
+
+        Args:
+            binding: Binding name, e.g. "openai" or "ollama".
+            factory: Zero-argument callable building a new client.
+            base_url: Endpoint the client talks to.
+            api_key: Credential (only its hash is kept in the key).
+            config: Any further client settings that make clients differ.
+            closer: Callable releasing the client; defaults to ``close()``/``aclose()``.
+        """
+        loop = asyncio.get_running_loop()
+        clients = self._clients.setdefault(loop, {})
+        key = self.make_key(binding, base_url, api_key, config)
+        entry = clients.get(key)
+        if entry is None:
+            entry = _PooledClient(client=factory(), closer=closer)
+            clients[key] = entry
+            self.created += 1
+            logger.debug(f"Created pooled {binding} client for {base_url or 'default'}")
+        else:
+            self.reused += 1
+        entry.uses += 1
+        return entry.client
+
+    def hold(self) -> None:
+        """Register a user of the running loop's clients (see ``release``)."""
+        loop = asyncio.get_running_loop()
+        self._holders[loop] = self._holders.get(loop, 0) + 1
+
+    async def release(self) -> None:
+        """Drop one user of the running loop's clients; the last one closes them."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        holders = self._holders.get(loop, 0) - 1
+        if holders > 0:
+            self._holders[loop] = holders
+            return
+        self._holders.pop(loop, None)
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close every client created on the running event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._holders.pop(loop, None)
+        clients = self._clients.pop(loop, {})
+        for (binding, base_url, _, _), entry in clients.items():
+            try:
+                await _close_client(entry.client, entry.closer)
+            except Exception as e:
+                logger.warning(
+                    f"Failed to close pooled {binding} client ({base_url}): {e}"
+                )
+        if clients:
+            logger.debug(f"Closed {len(clients)} pooled LLM/embedding clients")
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": sum(len(c) for c in self._clients.values()),
+            "holders": sum(self._holders.values()),
+            "created": self.created,
+            "reused": self.reused,
+        }
+
+
+async def _close_client(client: Any, closer: Callable[[Any], Any] | None) -> None:
+    if closer is not None:
+        result = closer(client)
+    elif hasattr(client, "close"):
+        result = client.close()
+    elif hasattr(client, "aclose"):
+        result = client.aclose()
+    else:
+        return
+    if inspect.isawaitable(result):
+        await result
+
+
+def httpx_pool_limits():
+    """Connection limits for pooled HTTP clients (overridable through env)."""
+    import httpx
+
+    return httpx.Limits(
+        max_connections=get_env_value(
+            "LLM_CLIENT_MAX_CONNECTIONS", DEFAULT_LLM_CLIENT_MAX_CONNECTIONS, int
+        ),
+        max_keepalive_connections=get_env_value(
+            "LLM_CLIENT_MAX_KEEPALIVE", DEFAULT_LLM_CLIENT_MAX_KEEPALIVE, int
+        ),
+        keepalive_expiry=get_env_value(
+            "LLM_CLIENT_KEEPALIVE_EXPIRY", DEFAULT_LLM_CLIENT_KEEPALIVE_EXPIRY, float
+        ),
+    )
+
+
+_pool = ClientPool()
+
+
+def get_shared_client(
+    binding: str,
+    factory: Callable[[], Any],
+    *,
+    base_url: str | None = None,
+    api_key: str | None = None,
+    config: dict[str, Any] | None = None,
+    closer: Callable[[Any], Any] | None = None,
+) -> Any:
+    """Return a reusable client from the process-wide pool (see ClientPool.get)."""
+    return _pool.get(
+        binding,
+        factory,
+        base_url=base_url,
+        api_key=api_key,
+        config=config,
+        closer=closer,
+    )
+
+
+def hold_shared_clients() -> None:
+    """Keep the running loop's pooled clients open until a matching release."""
+    _pool.hold()
+
+
+async def release_shared_clients() -> None:
+    """Release a hold; pooled clients of the running loop close with the last one."""
+    await _pool.release()
+
+
+async def close_shared_clients() -> None:
+    """Close all pooled clients of the running event loop, regardless of holders."""
+    await _pool.aclose()
+
+
+def shared_client_stats() -> dict[str, Any]:
+    return _pool.stats()
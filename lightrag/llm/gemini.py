@@ -378,6 +378,10 @@ async def gemini_complete_if_cache(
                                 usage, "candidates_token_count", 0
                             ),
                             "total_tokens": getattr(usage, "total_token_count", 0),
+                            "cached_tokens": getattr(
+                                usage, "cached_content_token_count", 0
+                            )
+                            or 0,
                         }
                     )
 
@@ -420,6 +424,7 @@ async def gemini_complete_if_cache(
                 "prompt_tokens": getattr(usage, "prompt_token_count", 0),
                 "completion_tokens": getattr(usage, "candidates_token_count", 0),
                 "total_tokens": getattr(usage, "total_token_count", 0),
+                "cached_tokens": getattr(usage, "cached_content_token_count", 0) or 0,
             }
         )
 
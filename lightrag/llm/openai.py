@@ -15,6 +15,11 @@ from openai import (
     RateLimitError,
     APITimeoutError,
 )
+
+try:
+    from openai import DefaultAsyncHttpxClient
+except ImportError:  # openai < 1.17
+    from httpx import AsyncClient as DefaultAsyncHttpxClient
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -29,6 +34,7 @@ from lightrag.utils import (
 
 from lightrag.types import GPTKeywordExtractionFormat
 from lightrag.api import __api_version__
+from lightrag.llm.client_pool import get_shared_client, httpx_pool_limits
 
 import numpy as np
 import base64
@@ -74,6 +80,24 @@ class InvalidResponseError(Exception):
     pass
 
 
+def _cached_prompt_tokens(usage: Any) -> int:
+    """Prompt tokens served from the provider's prefix cache, 0 when not reported.
+
+    OpenAI-compatible APIs report it as ``usage.prompt_tokens_details.cached_tokens``;
+    DeepSeek uses ``usage.prompt_cache_hit_tokens``.
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    if details is not None:
+        cached = (
+            details.get("cached_tokens")
+            if isinstance(details, dict)
+            else getattr(details, "cached_tokens", None)
+        )
+        if cached:
+            return int(cached)
+    return int(getattr(usage, "prompt_cache_hit_tokens", 0) or 0)
+
+
 def create_openai_async_client(
     api_key: str | None = None,
     base_url: str | None = None,
@@ -119,6 +143,43 @@ def create_openai_async_client(
     return AsyncOpenAI(**merged_configs)
 
 
+def get_openai_async_client(
+    api_key: str | None = None,
+    base_url: str | None = None,
+    client_configs: dict[str, Any] | None = None,
+) -> AsyncOpenAI:
+    """Return a pooled AsyncOpenAI client shared by all calls with the same settings.
+
+    The client keeps its connections alive between calls and must not be closed
+    by callers; pooled clients are closed when the last LightRAG instance on the
+    loop is finalized (see ``lightrag.llm.client_pool``). Unless ``client_configs``
+    provides its own ``http_client``, connection limits come from
+    LLM_CLIENT_MAX_CONNECTIONS, LLM_CLIENT_MAX_KEEPALIVE and LLM_CLIENT_KEEPALIVE_EXPIRY.
+    """
+    api_key = api_key or os.environ["OPENAI_API_KEY"]
+    base_url = base_url or os.environ.get(
+        "OPENAI_API_BASE", "https://api.openai.com/v1"
+    )
+    client_configs = client_configs or {}
+
+    def _factory() -> AsyncOpenAI:
+        configs = dict(client_configs)
+        configs.setdefault(
+            "http_client", DefaultAsyncHttpxClient(limits=httpx_pool_limits())
+        )
+        return create_openai_async_client(
+            api_key=api_key, base_url=base_url, client_configs=configs
+        )
+
+    return get_shared_client(
+        "openai",
+        _factory,
+        base_url=base_url,
+        api_key=api_key,
+        config=client_configs,
+    )
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -203,8 +264,8 @@ async def openai_complete_if_cache(
     # Extract client configuration options
     client_configs = kwargs.pop("openai_client_configs", {})
 
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Reuse the pooled OpenAI client for these settings
+    openai_async_client = get_openai_async_client(
         api_key=api_key,
         base_url=base_url,
         client_configs=client_configs,
@@ -246,21 +307,17 @@ async def openai_complete_if_cache(
             )
     except APIConnectionError as e:
         logger.error(f"OpenAI API Connection Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except RateLimitError as e:
         logger.error(f"OpenAI API Rate Limit Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except APITimeoutError as e:
         logger.error(f"OpenAI API Timeout Error: {e}")
-        await openai_async_client.close()  # Ensure client is closed
         raise
     except Exception as e:
         logger.error(
             f"OpenAI API Call Failed,\nModel: {model},\nParams: {kwargs}, Got: {e}"
         )
-        await openai_async_client.close()  # Ensure client is closed
         raise
 
     if hasattr(response, "__aiter__"):
@@ -367,7 +424,10 @@ async def openai_complete_if_cache(
 
                             # Process reasoning content if COT is active
                             if cot_active:
-                                if isinstance(reasoning_content, str) and r"\u" in reasoning_content:
+                                if (
+                                    isinstance(reasoning_content, str)
+                                    and r"\u" in reasoning_content
+                                ):
                                     reasoning_content = safe_unicode_decode(
                                         reasoning_content.encode("utf-8")
                                     )
@@ -380,7 +440,9 @@ async def openai_complete_if_cache(
                             yield content
 
                     # If neither content nor reasoning_content, continue to next chunk
-                    if (content is None or content == "") and (reasoning_content is None or reasoning_content == ""):
+                    if (content is None or content == "") and (
+                        reasoning_content is None or reasoning_content == ""
+                    ):
                         continue
 
                 # Ensure COT is properly closed if still active after stream ends
@@ -397,6 +459,7 @@ async def openai_complete_if_cache(
                             final_chunk_usage, "completion_tokens", 0
                         ),
                         "total_tokens": getattr(final_chunk_usage, "total_tokens", 0),
+                        "cached_tokens": _cached_prompt_tokens(final_chunk_usage),
                     }
                     token_tracker.add_usage(token_counts)
                     logger.debug(f"Streaming token usage (from API): {token_counts}")
@@ -427,8 +490,6 @@ async def openai_complete_if_cache(
                         logger.warning(
                             f"Failed to close stream response: {close_error}"
                         )
-                # Ensure client is closed in case of exception
-                await openai_async_client.close()
                 raise
             finally:
                 # Final safety check for unclosed COT tags
@@ -460,131 +521,114 @@ async def openai_complete_if_cache(
                                 f"Unexpected error during stream response cleanup: {close_error}"
                             )
 
-                # This prevents resource leaks since the caller doesn't handle closing
-                try:
-                    await openai_async_client.close()
-                    logger.debug(
-                        "Successfully closed OpenAI client for streaming response"
-                    )
-                except Exception as client_close_error:
-                    logger.warning(
-                        f"Failed to close OpenAI client in streaming finally block: {client_close_error}"
-                    )
-
         return inner()
 
     else:
-        try:
-            if (
-                not response
-                or not response.choices
-                or not hasattr(response.choices[0], "message")
-            ):
-                logger.error("Invalid response from OpenAI API")
-                await openai_async_client.close()  # Ensure client is closed
-                raise InvalidResponseError("Invalid response from OpenAI API")
-
-            message = response.choices[0].message
-            # Normalize content to plain string to guard against multimodal payloads
-            def _normalize_to_text(val: Any) -> str:
-                # Common multimodal response: list of parts with text/images
-                if isinstance(val, list):
-                    parts: list[str] = []
-                    for p in val:
-                        text_part = None
-                        if isinstance(p, dict):
-                            text_part = (
-                                p.get("text")
-                                or p.get("content")
-                                or p.get("input_text")
-                                or p.get("value")
-                            )
-                        else:
-                            text_part = (
-                                getattr(p, "text", None)
-                                or getattr(p, "content", None)
-                                or getattr(p, "input_text", None)
-                                or getattr(p, "value", None)
-                            )
-                        if text_part:
-                            parts.append(str(text_part))
-                    return "\n".join(parts).strip()
-                # Bytes-like payloads
-                if isinstance(val, (bytes, bytearray)):
-                    try:
-                        return bytes(val).decode("utf-8", errors="ignore").strip()
-                    except Exception:
-                        return str(val)
-                # Native string or None
-                if val is None:
-                    return ""
-                if isinstance(val, str):
-                    return val
-                # Fallback to string representation
-                return str(val)
+        if (
+            not response
+            or not response.choices
+            or not hasattr(response.choices[0], "message")
+        ):
+            logger.error("Invalid response from OpenAI API")
+            raise InvalidResponseError("Invalid response from OpenAI API")
+
+        message = response.choices[0].message
+
+        # Normalize content to plain string to guard against multimodal payloads
+        def _normalize_to_text(val: Any) -> str:
+            # Common multimodal response: list of parts with text/images
+            if isinstance(val, list):
+                parts: list[str] = []
+                for p in val:
+                    text_part = None
+                    if isinstance(p, dict):
+                        text_part = (
+                            p.get("text")
+                            or p.get("content")
+                            or p.get("input_text")
+                            or p.get("value")
+                        )
+                    else:
+                        text_part = (
+                            getattr(p, "text", None)
+                            or getattr(p, "content", None)
+                            or getattr(p, "input_text", None)
+                            or getattr(p, "value", None)
+                        )
+                    if text_part:
+                        parts.append(str(text_part))
+                return "\n".join(parts).strip()
+            # Bytes-like payloads
+            if isinstance(val, (bytes, bytearray)):
+                try:
+                    return bytes(val).decode("utf-8", errors="ignore").strip()
+                except Exception:
+                    return str(val)
+            # Native string or None
+            if val is None:
+                return ""
+            if isinstance(val, str):
+                return val
+            # Fallback to string representation
+            return str(val)
+
+        content = _normalize_to_text(getattr(message, "content", None))
+        reasoning_content = _normalize_to_text(
+            getattr(message, "reasoning_content", "")
+        )
 
-            content = _normalize_to_text(getattr(message, "content", None))
-            reasoning_content = _normalize_to_text(
-                getattr(message, "reasoning_content", "")
-            )
+        # Handle COT logic for non-streaming responses (only if enabled)
+        final_content = ""
 
-            # Handle COT logic for non-streaming responses (only if enabled)
-            final_content = ""
-
-            if enable_cot:
-                # Check if we should include reasoning content
-                should_include_reasoning = False
-                if reasoning_content and reasoning_content.strip():
-                    if not content or content.strip() == "":
-                        # Case 1: Only reasoning content, should include COT
-                        should_include_reasoning = True
-                        final_content = content or ""
-                    else:
-                        # Case 3: Both content and reasoning_content present, ignore reasoning
-                        should_include_reasoning = False
-                        final_content = content
-                else:
-                    # No reasoning content, use regular content
+        if enable_cot:
+            # Check if we should include reasoning content
+            should_include_reasoning = False
+            if reasoning_content and reasoning_content.strip():
+                if not content or content.strip() == "":
+                    # Case 1: Only reasoning content, should include COT
+                    should_include_reasoning = True
                     final_content = content or ""
-
-                # Apply COT wrapping if needed
-                if should_include_reasoning:
-                    if r"\u" in reasoning_content:
-                        reasoning_content = safe_unicode_decode(
-                            reasoning_content.encode("utf-8")
-                        )
-                    final_content = f"<think>{reasoning_content}</think>{final_content}"
+                else:
+                    # Case 3: Both content and reasoning_content present, ignore reasoning
+                    should_include_reasoning = False
+                    final_content = content
             else:
-                # COT disabled, only use regular content
+                # No reasoning content, use regular content
                 final_content = content or ""
 
-            # Validate final content
-            if not final_content or final_content.strip() == "":
-                logger.error("Received empty content from OpenAI API")
-                await openai_async_client.close()  # Ensure client is closed
-                raise InvalidResponseError("Received empty content from OpenAI API")
+            # Apply COT wrapping if needed
+            if should_include_reasoning:
+                if r"\u" in reasoning_content:
+                    reasoning_content = safe_unicode_decode(
+                        reasoning_content.encode("utf-8")
+                    )
+                final_content = f"<think>{reasoning_content}</think>{final_content}"
+        else:
+            # COT disabled, only use regular content
+            final_content = content or ""
 
-            # Apply Unicode decoding to final content if needed
-            if r"\u" in final_content:
-                final_content = safe_unicode_decode(final_content.encode("utf-8"))
+        # Validate final content
+        if not final_content or final_content.strip() == "":
+            logger.error("Received empty content from OpenAI API")
+            raise InvalidResponseError("Received empty content from OpenAI API")
 
-            if token_tracker and hasattr(response, "usage"):
-                token_counts = {
-                    "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
-                    "completion_tokens": getattr(
-                        response.usage, "completion_tokens", 0
-                    ),
-                    "total_tokens": getattr(response.usage, "total_tokens", 0),
-                }
-                token_tracker.add_usage(token_counts)
+        # Apply Unicode decoding to final content if needed
+        if r"\u" in final_content:
+            final_content = safe_unicode_decode(final_content.encode("utf-8"))
 
-            logger.debug(f"Response content len: {len(final_content)}")
-            verbose_debug(f"Response: {response}")
+        if token_tracker and hasattr(response, "usage"):
+            token_counts = {
+                "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
+                "completion_tokens": getattr(response.usage, "completion_tokens", 0),
+                "total_tokens": getattr(response.usage, "total_tokens", 0),
+                "cached_tokens": _cached_prompt_tokens(response.usage),
+            }
+            token_tracker.add_usage(token_counts)
 
-            return final_content
-        finally:
-            # Ensure client is closed in all cases for non-streaming responses
-            await openai_async_client.close()
+        logger.debug(f"Response content len: {len(final_content)}")
+        verbose_debug(f"Response: {response}")
+
+        return final_content
 
 
 async def openai_complete(
@@ -723,38 +767,37 @@ async def openai_embed(
         RateLimitError: If the OpenAI API rate limit is exceeded.
         APITimeoutError: If the OpenAI API request times out.
     """
-    # Create the OpenAI client
-    openai_async_client = create_openai_async_client(
+    # Reuse the pooled OpenAI client for these settings
+    openai_async_client = get_openai_async_client(
         api_key=api_key, base_url=base_url, client_configs=client_configs
     )
 
-    async with openai_async_client:
-        # Prepare API call parameters
-        api_params = {
-            "model": model,
-            "input": texts,
-            "encoding_format": "base64",
-        }
-
-        # Add dimensions parameter only if embedding_dim is provided
-        if embedding_dim is not None:
-            api_params["dimensions"] = embedding_dim
+    # Prepare API call parameters
+    api_params = {
+        "model": model,
+        "input": texts,
+        "encoding_format": "base64",
+    }
 
-        # Make API call
-        response = await openai_async_client.embeddings.create(**api_params)
+    # Add dimensions parameter only if embedding_dim is provided
+    if embedding_dim is not None:
+        api_params["dimensions"] = embedding_dim
 
-        if token_tracker and hasattr(response, "usage"):
-            token_counts = {
-                "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
-                "total_tokens": getattr(response.usage, "total_tokens", 0),
-            }
-            token_tracker.add_usage(token_counts)
+    # Make API call
+    response = await openai_async_client.embeddings.create(**api_params)
 
-        return np.array(
-            [
-                np.array(dp.embedding, dtype=np.float32)
-                if isinstance(dp.embedding, list)
-                else np.frombuffer(base64.b64decode(dp.embedding), dtype=np.float32)
-                for dp in response.data
-            ]
-        )
+    if token_tracker and hasattr(response, "usage"):
+        token_counts = {
+            "prompt_tokens": getattr(response.usage, "prompt_tokens", 0),
+            "total_tokens": getattr(response.usage, "total_tokens", 0),
+        }
+        token_tracker.add_usage(token_counts)
+
+    return np.array(
+        [
+            np.array(dp.embedding, dtype=np.float32)
+            if isinstance(dp.embedding, list)
+            else np.frombuffer(base64.b64decode(dp.embedding), dtype=np.float32)
+            for dp in response.data
+        ]
+    )
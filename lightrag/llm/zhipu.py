@@ -31,11 +31,28 @@ from lightrag.utils import (
 )
 
 from lightrag.types import GPTKeywordExtractionFormat
+from lightrag.llm.client_pool import get_shared_client
 
+import os
 import numpy as np
 from typing import Union, List, Optional, Dict
 
 
+def _get_zhipu_client(api_key: Optional[str] = None):
+    """Return a pooled ZhipuAI client; without api_key, ZHIPUAI_API_KEY is used."""
+    # dynamically load ZhipuAI
+    try:
+        from zhipuai import ZhipuAI
+    except ImportError:
+        raise ImportError("Please install zhipuai before initialize zhipuai backend.")
+
+    return get_shared_client(
+        "zhipu",
+        lambda: ZhipuAI(api_key=api_key) if api_key else ZhipuAI(),
+        api_key=api_key or os.environ.get("ZHIPUAI_API_KEY"),
+    )
+
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=1, min=4, max=10),
@@ -56,18 +73,7 @@ async def zhipu_complete_if_cache(
         logger.debug(
             "enable_cot=True is not supported for ZhipuAI and will be ignored."
         )
-    # dynamically load ZhipuAI
-    try:
-        from zhipuai import ZhipuAI
-    except ImportError:
-        raise ImportError("Please install zhipuai before initialize zhipuai backend.")
-
-    if api_key:
-        client = ZhipuAI(api_key=api_key)
-    else:
-        # please set ZHIPUAI_API_KEY in your environment
-        # os.environ["ZHIPUAI_API_KEY"]
-        client = ZhipuAI()
+    client = _get_zhipu_client(api_key)
 
     messages = []
 
@@ -190,17 +196,7 @@ async def zhipu_complete(
 async def zhipu_embedding(
     texts: list[str], model: str = "embedding-3", api_key: str = None, **kwargs
 ) -> np.ndarray:
-    # dynamically load ZhipuAI
-    try:
-        from zhipuai import ZhipuAI
-    except ImportError:
-        raise ImportError("Please install zhipuai before initialize zhipuai backend.")
-    if api_key:
-        client = ZhipuAI(api_key=api_key)
-    else:
-        # please set ZHIPUAI_API_KEY in your environment
-        # os.environ["ZHIPUAI_API_KEY"]
-        client = ZhipuAI()
+    client = _get_zhipu_client(api_key)
 
     # Convert single text to list if needed
     if isinstance(texts, str):
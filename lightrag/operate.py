@@ -4,8 +4,9 @@ from pathlib import Path
 
 import asyncio
 import json
+import re
 import json_repair
-from typing import Any, AsyncIterator, overload, Literal
+from typing import Any, AsyncIterator, Awaitable, Callable, overload, Literal
 from collections import Counter, defaultdict
 
 from lightrag.exceptions import PipelineCancelledException
@@ -19,8 +20,11 @@ from lightrag.utils import (
     split_string_by_multi_markers,
     truncate_list_by_token_size,
     compute_args_hash,
+    generate_cache_key,
     handle_cache,
     save_to_cache,
+    cache_stream_response,
+    replay_cached_stream,
     CacheData,
     use_llm_func_with_cache,
     update_chunk_cache_list,
@@ -36,6 +40,7 @@ from lightrag.utils import (
     apply_source_ids_limit,
     merge_source_ids,
     make_relation_chunk_key,
+    make_extraction_checkpoint_key,
 )
 from lightrag.base import (
     BaseGraphStorage,
@@ -61,6 +66,12 @@ from lightrag.constants import (
     DEFAULT_FILE_PATH_MORE_PLACEHOLDER,
     DEFAULT_MAX_FILE_PATHS,
     DEFAULT_ENTITY_NAME_MAX_LENGTH,
+    DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE,
+    DEFAULT_ENTITY_EXTRACT_PACK_MAX_TOKENS,
+    DEFAULT_ENTITY_EXTRACT_PACK_MAX_CHUNKS,
+    DEFAULT_ENTITY_EXTRACT_GLEANING_POLICY,
+    DEFAULT_ENTITY_EXTRACT_GLEAN_MIN_DENSITY,
+    DEFAULT_SUMMARY_REBUILD_INTERVAL,
 )
 from lightrag.kg.shared_storage import get_storage_keyed_lock
 import time
@@ -148,6 +159,115 @@ def chunking_by_token_size(
     return results
 
 
+def _summary_memo_hash(
+    description_type: str,
+    entity_or_relation_name: str,
+    description_list: list[str],
+    seperator: str,
+    global_config: dict,
+    fold: bool = False,
+) -> str:
+    """Hash a description set together with every setting that shapes its summary.
+
+    Descriptions are deduplicated and sorted, so the same set collected in a different
+    order (e.g. by a rebuild after deletions) maps to the same summary. A fold into a
+    stored summary (the first description) is keyed apart from a full summary.
+    """
+    settings = {
+        "language": global_config["addon_params"].get(
+            "language", DEFAULT_SUMMARY_LANGUAGE
+        ),
+        "model": global_config.get("llm_model_name"),
+        "summary_context_size": global_config["summary_context_size"],
+        "summary_max_tokens": global_config["summary_max_tokens"],
+        "summary_length_recommended": global_config["summary_length_recommended"],
+        "force_llm_summary_on_merge": global_config["force_llm_summary_on_merge"],
+    }
+    return compute_args_hash(
+        description_type,
+        entity_or_relation_name,
+        seperator,
+        json.dumps(settings, sort_keys=True),
+        *(["fold", description_list[0]] if fold else []),
+        *sorted(set(description_list)),
+    )
+
+
+def _summary_state(summary: str, folds: int) -> str:
+    """Encode the provenance of a stored LLM summary as "<folds since full summary>:<summary hash>" """
+    return f"{folds}:{compute_args_hash(summary)}"
+
+
+def _stored_summary_folds(record: dict | None, first_description: str) -> int | None:
+    """Return the folds recorded for a stored node/edge summary.
+
+    None when first_description is not the LLM summary the record's summary_state refers
+    to, e.g. the description was never summarized or was rewritten by a rebuild.
+    """
+    if not record:
+        return None
+    folds, _, summary_hash = str(record.get("summary_state") or "").partition(":")
+    if not folds.isdigit() or summary_hash != compute_args_hash(first_description):
+        return None
+    return int(folds)
+
+
+def _next_summary_state(
+    global_config: dict,
+    usage: dict,
+    description: str,
+    summary_folds: int | None,
+    record: dict | None,
+) -> str | None:
+    """Summary state to store with a merged description, None when there is nothing to store"""
+    if global_config.get("summary_mode") != "incremental":
+        return None
+    if usage.get("mode") == "fold":
+        return _summary_state(description, summary_folds + 1)
+    if usage.get("mode") == "full":
+        return _summary_state(description, 0)
+    # Joined without LLM: the stored summary is still the first fragment
+    return record["summary_state"] if summary_folds is not None else None
+
+
+def _add_summary_usage(
+    usage: dict | None, tokenizer: Tokenizer, prompt: str, summary: str
+) -> None:
+    """Add one summary LLM request to a per-merge usage dict (tokenizer-estimated tokens)"""
+    if usage is None:
+        return
+    usage["llm_calls"] = usage.get("llm_calls", 0) + 1
+    usage["tokens"] = (
+        usage.get("tokens", 0)
+        + len(tokenizer.encode(prompt))
+        + len(tokenizer.encode(summary))
+    )
+
+
+async def _count_summary_usage(
+    usage: dict, pipeline_status: dict | None, pipeline_status_lock
+) -> None:
+    """Add one merge's summary usage to the pipeline counters"""
+    if not usage or pipeline_status is None or pipeline_status_lock is None:
+        return
+    async with pipeline_status_lock:
+        for name, value in (
+            ("summary_llm_calls", usage.get("llm_calls", 0)),
+            ("summary_tokens", usage.get("tokens", 0)),
+            ("summary_folds", 1 if usage.get("mode") == "fold" else 0),
+        ):
+            pipeline_status[name] = pipeline_status.get(name, 0) + value
+
+
+def _summary_usage_message(usage: dict) -> str:
+    """Describe one merge's summary usage for its status message"""
+    if not usage.get("mode"):
+        return ""
+    if not usage.get("llm_calls"):
+        return f" [{usage['mode']}, memo]"
+    return f" [{usage['mode']}, {usage['llm_calls']} calls, ~{usage['tokens']} tok]"
+
+
 async def _handle_entity_relation_summary(
     description_type: str,
     entity_or_relation_name: str,
@@ -155,6 +275,8 @@ async def _handle_entity_relation_summary(
     seperator: str,
     global_config: dict,
     llm_response_cache: BaseKVStorage | None = None,
+    summary_folds: int | None = None,
+    usage: dict | None = None,
 ) -> tuple[str, bool]:
     """Handle entity relation description summary using map-reduce approach.
 
@@ -165,11 +287,22 @@ async def _handle_entity_relation_summary(
     4. Summarize each chunk, then recursively process the summaries
     5. Continue until we get a final summary within token limits or num of descriptions is less than force_llm_summary_on_merge
 
+    LLM summaries are memoized in the LLM cache (cache_type `summary_memo`) by the hash of the
+    sorted description set and summary settings, so repeated merges and rebuilds of the same
+    descriptions skip both token counting and the LLM.
+
+    In `incremental` summary_mode, when description_list[0] is the stored LLM summary
+    (summary_folds is not None), the new descriptions are folded into it instead of
+    summarizing the whole list. After summary_rebuild_interval folds, or once the stored
+    summary outgrows summary_max_tokens, a full summary is done again.
+
     Args:
         entity_or_relation_name: Name of the entity or relation being summarized
         description_list: List of description strings to summarize
         global_config: Global configuration containing tokenizer and limits
         llm_response_cache: Optional cache for LLM responses
+        summary_folds: Folds since the last full summary of description_list[0], None if it is not an LLM summary
+        usage: Optional dict receiving the summary mode ("full"/"fold"), LLM calls and estimated tokens
 
     Returns:
         Tuple of (final_summarized_description_string, llm_was_used_boolean)
@@ -188,6 +321,53 @@ async def _handle_entity_relation_summary(
     summary_max_tokens = global_config["summary_max_tokens"]
     force_llm_summary_on_merge = global_config["force_llm_summary_on_merge"]
 
+    fold = (
+        global_config.get("summary_mode") == "incremental"
+        and summary_folds is not None
+        and summary_folds
+        < global_config.get(
+            "summary_rebuild_interval", DEFAULT_SUMMARY_REBUILD_INTERVAL
+        )
+        and len(tokenizer.encode(description_list[0])) <= summary_max_tokens
+    )
+
+    memo_hash = None
+    if llm_response_cache is not None and llm_response_cache.global_config.get(
+        "enable_llm_cache_for_entity_extract"
+    ):
+        memo_hash = _summary_memo_hash(
+            description_type,
+            entity_or_relation_name,
+            description_list,
+            seperator,
+            global_config,
+            fold=fold,
+        )
+        cached = await handle_cache(
+            llm_response_cache, memo_hash, None, "default", cache_type="summary_memo"
+        )
+        if cached:
+            logger.debug(f"Summary memo hit for {entity_or_relation_name}")
+            if usage is not None:
+                usage["mode"] = "fold" if fold else "full"
+            return cached[0], True
+
+    async def _remember(summary: str, mode: str = "full") -> str:
+        """Memoize an LLM summary of description_list"""
+        if usage is not None:
+            usage["mode"] = mode
+        if memo_hash is not None:
+            await save_to_cache(
+                llm_response_cache,
+                CacheData(
+                    args_hash=memo_hash,
+                    content=summary,
+                    prompt=f"[summary memo] {description_type}: {entity_or_relation_name}",
+                    cache_type="summary_memo",
+                ),
+            )
+        return summary
+
     current_list = description_list[:]  # Copy the list to avoid modifying original
     llm_was_used = False  # Track whether LLM was used during the entire process
 
@@ -196,6 +376,22 @@ async def _handle_entity_relation_summary(
         # Calculate total tokens in current list
         total_tokens = sum(len(tokenizer.encode(desc)) for desc in current_list)
 
+        # Incremental mode: fold the new descriptions into the stored summary
+        if fold and not (
+            len(current_list) < force_llm_summary_on_merge
+            and total_tokens < summary_max_tokens
+        ):
+            summary = await _fold_into_summary(
+                description_type,
+                entity_or_relation_name,
+                current_list[0],
+                current_list[1:],
+                global_config,
+                llm_response_cache,
+                usage,
+            )
+            return await _remember(summary, "fold"), True
+
         # If total length is within limits, perform final summarization
         if total_tokens <= summary_context_size or len(current_list) <= 2:
             if (
@@ -204,6 +400,8 @@ async def _handle_entity_relation_summary(
             ):
                 # no LLM needed, just join the descriptions
                 final_description = seperator.join(current_list)
+                if llm_was_used and final_description:
+                    await _remember(final_description)
                 return final_description if final_description else "", llm_was_used
             else:
                 if total_tokens > summary_context_size and len(current_list) <= 2:
@@ -217,7 +415,9 @@ async def _handle_entity_relation_summary(
                     current_list,
                     global_config,
                     llm_response_cache,
+                    usage,
                 )
+                await _remember(final_summary)
                 return final_summary, True  # LLM was used for final summarization
 
         # Need to split into chunks - Map phase
@@ -272,6 +472,7 @@ async def _handle_entity_relation_summary(
                     chunk,
                     global_config,
                     llm_response_cache,
+                    usage,
                 )
                 new_summaries.append(summary)
                 llm_was_used = True  # Mark that LLM was used in reduce phase
@@ -286,6 +487,7 @@ async def _summarize_descriptions(
     description_list: list[str],
     global_config: dict,
     llm_response_cache: BaseKVStorage | None = None,
+    usage: dict | None = None,
 ) -> str:
     """Helper function to summarize a list of descriptions using LLM.
 
@@ -294,6 +496,7 @@ async def _summarize_descriptions(
         descriptions: List of description strings to summarize
         global_config: Global configuration containing LLM function and settings
         llm_response_cache: Optional cache for LLM responses
+        usage: Optional dict accumulating LLM calls and estimated tokens
 
     Returns:
         Summarized description string
@@ -345,6 +548,64 @@ async def _summarize_descriptions(
         llm_response_cache=llm_response_cache,
         cache_type="summary",
     )
+    _add_summary_usage(usage, tokenizer, use_prompt, summary)
+    return summary
+
+
+async def _fold_into_summary(
+    description_type: str,
+    description_name: str,
+    existing_summary: str,
+    new_descriptions: list[str],
+    global_config: dict,
+    llm_response_cache: BaseKVStorage | None = None,
+    usage: dict | None = None,
+) -> str:
+    """Fold new descriptions into an existing LLM summary.
+
+    New descriptions are sent in groups that fit summary_context_size next to the current
+    summary (at least one description per group); each group updates the summary.
+
+    Returns:
+        Updated summary string
+    """
+    use_llm_func: callable = global_config["llm_model_func"]
+    # Apply higher priority (8) to entity/relation summary tasks
+    use_llm_func = partial(use_llm_func, _priority=8)
+
+    language = global_config["addon_params"].get("language", DEFAULT_SUMMARY_LANGUAGE)
+    tokenizer: Tokenizer = global_config["tokenizer"]
+    summary_context_size = global_config["summary_context_size"]
+
+    summary = existing_summary
+    pending = list(new_descriptions)
+    while pending:
+        budget = summary_context_size - len(tokenizer.encode(summary))
+        group, group_tokens = [], 0
+        while pending:
+            desc_tokens = len(tokenizer.encode(pending[0]))
+            if group and group_tokens + desc_tokens > budget:
+                break
+            group.append(pending.pop(0))
+            group_tokens += desc_tokens
+
+        use_prompt = PROMPTS["summarize_entity_descriptions_incremental"].format(
+            description_type=description_type,
+            description_name=description_name,
+            existing_summary=summary,
+            description_list="\n".join(
+                json.dumps({"Description": desc}, ensure_ascii=False) for desc in group
+            ),
+            summary_length=global_config["summary_length_recommended"],
+            language=language,
+        )
+        summary, _ = await use_llm_func_with_cache(
+            use_prompt,
+            use_llm_func,
+            llm_response_cache=llm_response_cache,
+            cache_type="summary",
+        )
+        _add_summary_usage(usage, tokenizer, use_prompt, summary)
     return summary
 
 
@@ -886,6 +1147,7 @@ async def _process_extraction_result(
     file_path: str = "unknown_source",
     tuple_delimiter: str = "<|#|>",
     completion_delimiter: str = "<|COMPLETE|>",
+    stats: dict | None = None,
 ) -> tuple[dict, dict]:
     """Process a single extraction result (either initial or gleaning)
     Args:
@@ -895,13 +1157,17 @@ async def _process_extraction_result(
         tuple_delimiter (str): Delimiter for tuple fields
         record_delimiter (str): Delimiter for records
         completion_delimiter (str): Delimiter for completion
+        stats (dict, optional): Filled with parse diagnostics: truncated, format_error,
+            records and unparsed_records
     Returns:
         tuple: (nodes_dict, edges_dict) containing the extracted entities and relationships
     """
     maybe_nodes = defaultdict(list)
     maybe_edges = defaultdict(list)
+    truncated = completion_delimiter not in result
+    unparsed_records = 0
 
-    if completion_delimiter not in result:
+    if truncated:
         logger.warning(
             f"{chunk_key}: Complete delimiter can not be found in extraction result"
         )
@@ -943,7 +1209,8 @@ async def _process_extraction_result(
                     )
                 fixed_records = fixed_records + [entity_relation_record]
 
-    if len(fixed_records) != len(records):
+    format_error = len(fixed_records) != len(records)
+    if format_error:
         logger.warning(
             f"{chunk_key}: LLM output format error; find LLM use {tuple_delimiter} as record seperators instead new-line"
         )
@@ -1000,10 +1267,307 @@ async def _process_extraction_result(
             relationship_data["src_id"] = truncated_source
             relationship_data["tgt_id"] = truncated_target
             maybe_edges[(truncated_source, truncated_target)].append(relationship_data)
+            continue
+
+        if record.strip(tuple_delimiter + " "):
+            unparsed_records += 1
+
+    if stats is not None:
+        stats.update(
+            truncated=truncated,
+            format_error=format_error,
+            records=len(fixed_records),
+            unparsed_records=unparsed_records,
+        )
 
     return dict(maybe_nodes), dict(maybe_edges)
 
 
+def _merge_gleaning_result(
+    maybe_nodes: dict, maybe_edges: dict, glean_nodes: dict, glean_edges: dict
+) -> tuple[int, int]:
+    """Merge a gleaning pass into the initial extraction in place, keeping the longer description
+
+    Returns:
+        tuple: (new_entities, new_relations) found only by the gleaning pass
+    """
+    new_entities = len(glean_nodes.keys() - maybe_nodes.keys())
+    new_relations = len(glean_edges.keys() - maybe_edges.keys())
+    for entity_name, glean_entities in glean_nodes.items():
+        if entity_name in maybe_nodes:
+            # Compare description lengths and keep the better one
+            original_desc_len = len(
+                maybe_nodes[entity_name][0].get("description", "") or ""
+            )
+            glean_desc_len = len(glean_entities[0].get("description", "") or "")
+
+            if glean_desc_len > original_desc_len:
+                maybe_nodes[entity_name] = list(glean_entities)
+            # Otherwise keep original version
+        else:
+            # New entity from gleaning stage
+            maybe_nodes[entity_name] = list(glean_entities)
+
+    for edge_key, glean_edge_list in glean_edges.items():
+        if edge_key in maybe_edges:
+            # Compare description lengths and keep the better one
+            original_desc_len = len(
+                maybe_edges[edge_key][0].get("description", "") or ""
+            )
+            glean_desc_len = len(glean_edge_list[0].get("description", "") or "")
+
+            if glean_desc_len > original_desc_len:
+                maybe_edges[edge_key] = list(glean_edge_list)
+            # Otherwise keep original version
+        else:
+            # New edge from gleaning stage
+            maybe_edges[edge_key] = list(glean_edge_list)
+
+    return new_entities, new_relations
+
+
+def _gleaning_reason(
+    parse_stats: dict, chunk_tokens: int, entity_count: int, min_density: float
+) -> str | None:
+    """Adaptive gleaning policy: return why a chunk likely has missed entities, or None to skip gleaning"""
+    if parse_stats.get("truncated"):
+        return "truncated output"
+    if parse_stats.get("format_error") or parse_stats.get("unparsed_records"):
+        return "parse anomalies"
+    if chunk_tokens > 0 and entity_count * 1000 / chunk_tokens < min_density:
+        return "low entity density"
+    return None
+
+
+def _group_chunks_for_packing(
+    ordered_chunks: list[tuple[str, TextChunkSchema]],
+    max_tokens: int,
+    max_chunks: int,
+) -> list[list[tuple[str, TextChunkSchema]]]:
+    """Greedily group consecutive chunks into packs of at most max_chunks chunks and max_tokens tokens.
+
+    Chunks at or above the token budget always form a pack of their own.
+    """
+    packs: list[list[tuple[str, TextChunkSchema]]] = []
+    current: list[tuple[str, TextChunkSchema]] = []
+    current_tokens = 0
+    for chunk in ordered_chunks:
+        chunk_tokens = chunk[1].get("tokens", 0) or 0
+        if current and (
+            len(current) >= max_chunks or current_tokens + chunk_tokens > max_tokens
+        ):
+            packs.append(current)
+            current, current_tokens = [], 0
+        current.append(chunk)
+        current_tokens += chunk_tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def _attribute_packed_record(
+    record: str,
+    pack: list[tuple[str, TextChunkSchema]],
+    tuple_delimiter: str,
+    current_key: str | None = None,
+) -> str:
+    """Pick the chunk a packed extraction record belongs to by matching its entity names.
+
+    The chunk named by the preceding header (current_key) wins unless none of the record's
+    names occur in it while another chunk contains them (e.g. a skipped chunk header).
+    """
+    fields = [f.strip().lower() for f in record.split(tuple_delimiter)]
+    if fields and fields[0].startswith("relation"):
+        names = [n for n in fields[1:3] if n]
+    else:
+        names = [n for n in fields[1:2] if n]
+    fallback = current_key or pack[0][0]
+    if not names:
+        return fallback
+
+    contents = {key: (dp.get("content") or "").lower() for key, dp in pack}
+    if current_key is not None and any(name in contents[current_key] for name in names):
+        return current_key
+    for key, content in contents.items():
+        if all(name in content for name in names):
+            return key
+    for key, content in contents.items():
+        if any(name in content for name in names):
+            return key
+    return fallback
+
+
+def _split_packed_extraction_result(
+    result: str,
+    pack: list[tuple[str, TextChunkSchema]],
+    tuple_delimiter: str = "<|#|>",
+    completion_delimiter: str = "<|COMPLETE|>",
+) -> dict[str, str]:
+    """Split the output of a packed extraction request into one extraction result per chunk.
+
+    Records follow the `chunk<|#|>N` header emitted before each chunk's records. Common
+    variants of the header are accepted too: `(chunk 2)`, `chunk: 2`, `<Chunk 2>`, markdown
+    decoration (`**chunk<|#|>2**`, `## Chunk 2`) and trailing delimiters; echoed closing
+    tags (`</Chunk 2>`) end the current chunk. Records outside any valid header, or whose
+    names only occur in another chunk, are attributed by entity-name matching. Every
+    section is terminated with the completion delimiter, so it parses like a single-chunk
+    result.
+
+    Returns:
+        dict: chunk_key -> extraction result text for that chunk
+    """
+    separator = rf"(?:{re.escape(tuple_delimiter)}|[#:|\s])*"
+    header_re = re.compile(
+        rf"^[(<\[*#`\s]*(/)?\s*chunk{separator}(\d+)"
+        rf"(?:{re.escape(tuple_delimiter)}|[)>\]*#`:.|\s])*$",
+        re.IGNORECASE,
+    )
+    sections: dict[str, list[str]] = {chunk_key: [] for chunk_key, _ in pack}
+    current = None
+    unattributed = 0
+    for line in result.split("\n"):
+        record = line.strip()
+        if not record:
+            continue
+        match = header_re.match(record)
+        if match:
+            number = int(match.group(2))
+            if match.group(1):  # closing tag
+                current = None
+            else:
+                current = pack[number - 1][0] if 1 <= number <= len(pack) else None
+            continue
+        for marker in (completion_delimiter, completion_delimiter.lower()):
+            record = record.replace(marker, "")
+        record = record.strip()
+        if not record:
+            continue
+        target = _attribute_packed_record(record, pack, tuple_delimiter, current)
+        if target != current:
+            unattributed += 1
+        sections[target].append(record)
+
+    if unattributed:
+        logger.warning(
+            f"{pack[0][0]}: {unattributed} packed extraction records outside their chunk header, attributed by entity name"
+        )
+    return {
+        chunk_key: "\n".join(records + [completion_delimiter])
+        for chunk_key, records in sections.items()
+    }
+
+
+async def _save_packed_extraction_section(
+    llm_response_cache: BaseKVStorage,
+    pack_cache_key: str,
+    chunk_key: str,
+    section: str,
+) -> str:
+    """Store one chunk's share of a packed extraction as a regular `extract` cache entry.
+
+    Rebuilds read extraction results per chunk from `llm_cache_list`, so each chunk must
+    reference a cache entry holding only its own records.
+    """
+    args_hash = compute_args_hash(pack_cache_key, chunk_key)
+    await save_to_cache(
+        llm_response_cache,
+        CacheData(
+            args_hash=args_hash,
+            content=section,
+            prompt=f"[packed extraction {pack_cache_key}]",
+            cache_type="extract",
+            chunk_id=chunk_key,
+        ),
+    )
+    return generate_cache_key("default", "extract", args_hash)
+
+
+def _serialize_chunk_extraction(maybe_nodes: dict, maybe_edges: dict) -> str:
+    """Encode one chunk's parsed extraction result as JSON for the extraction checkpoint"""
+    return json.dumps(
+        {
+            "entities": list(maybe_nodes.items()),
+            "relations": [[list(key), edges] for key, edges in maybe_edges.items()],
+        },
+        ensure_ascii=False,
+    )
+
+
+def _deserialize_chunk_extraction(result: str) -> tuple[dict, dict]:
+    """Decode a checkpointed extraction result back into (maybe_nodes, maybe_edges)"""
+    data = json.loads(result)
+    maybe_nodes = {name: entities for name, entities in data["entities"]}
+    maybe_edges = {tuple(key): edges for key, edges in data["relations"]}
+    return maybe_nodes, maybe_edges
+
+
+# LightRAG settings that shape extraction output, besides language and entity types
+EXTRACTION_SIGNATURE_FIELDS = (
+    "llm_model_name",
+    "entity_extract_max_gleaning",
+    "entity_extract_gleaning_policy",
+    "entity_extract_glean_min_density",
+    "entity_extract_prompt_layout",
+    "entity_extract_pack_chunks",
+    "entity_extract_pack_max_tokens",
+    "entity_extract_pack_max_chunks",
+)
+
+
+def extraction_checkpoint_signature(global_config: dict) -> str:
+    """Hash of the settings that shape extraction output; checkpoints are only reused under the same hash"""
+    addon_params = global_config.get("addon_params") or {}
+    language = addon_params.get("language", DEFAULT_SUMMARY_LANGUAGE)
+    entity_types = addon_params.get("entity_types", DEFAULT_ENTITY_TYPES)
+    return compute_args_hash(
+        language,
+        ",".join(entity_types),
+        *(str(global_config.get(name)) for name in EXTRACTION_SIGNATURE_FIELDS),
+    )
+
+
+async def _restore_checkpointed_chunks(
+    checkpoint_storage: BaseKVStorage,
+    ordered_chunks: list[tuple[str, TextChunkSchema]],
+    signature: str,
+    text_chunks_storage: BaseKVStorage | None,
+) -> dict[str, tuple[dict, dict]]:
+    """Load the results of chunks whose extraction already finished in an earlier run
+
+    Only `done` records written with the same extraction settings (signature) are used.
+    The chunk's `llm_cache_list` is restored as well, since re-chunking resets it.
+    """
+    records = await checkpoint_storage.get_by_ids(
+        [
+            make_extraction_checkpoint_key(chunk_dp.get("full_doc_id"), chunk_key)
+            for chunk_key, chunk_dp in ordered_chunks
+        ]
+    )
+    restored = {}
+    for (chunk_key, _), record in zip(ordered_chunks, records):
+        if (
+            not record
+            or record.get("status") != "done"
+            or record.get("signature") != signature
+        ):
+            continue
+        try:
+            restored[chunk_key] = _deserialize_chunk_extraction(record["result"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                f"Ignoring unreadable extraction checkpoint {chunk_key}: {e}"
+            )
+            continue
+        if record.get("llm_cache_list") and text_chunks_storage:
+            await update_chunk_cache_list(
+                chunk_key,
+                text_chunks_storage,
+                record["llm_cache_list"],
+                "entity_extraction",
+            )
+    return restored
+
+
 async def _rebuild_from_extraction_result(
     text_chunks_storage: BaseKVStorage,
     extraction_result: str,
@@ -1562,6 +2126,36 @@ async def _rebuild_single_relationship(
             pipeline_status["history_messages"].append(status_message)
 
 
+async def _vdb_payload_unchanged(
+    vdb: BaseVectorStorage, vdb_id: str, payload: dict[str, Any]
+) -> bool:
+    """Whether the stored vector record already holds exactly ``payload``.
+
+    Every payload field the storage persists (``content`` plus its
+    ``meta_fields`` such as source_id and file_path) must match, so a merge that
+    only adds a source chunk still rewrites the record. Only an upsert that
+    would re-embed the same text with the same metadata can be skipped.
+    """
+    try:
+        stored = await vdb.get_by_id(vdb_id)
+    except Exception as e:
+        logger.debug(f"Could not read vector record {vdb_id}: {e}")
+        return False
+    if not stored:
+        return False
+    fields = [k for k in payload if k == "content" or k in vdb.meta_fields]
+    return all(stored.get(k) == payload[k] for k in fields)
+
+
+async def _count_skipped_vdb_upsert(pipeline_status, pipeline_status_lock) -> None:
+    if pipeline_status is None or pipeline_status_lock is None:
+        return
+    async with pipeline_status_lock:
+        pipeline_status["vdb_upserts_skipped"] = (
+            pipeline_status.get("vdb_upserts_skipped", 0) + 1
+        )
+
+
 async def _merge_nodes_then_upsert(
     entity_name: str,
     nodes_data: list[dict],
@@ -1689,8 +2283,12 @@ async def _merge_nodes_then_upsert(
     )
     sorted_descriptions = [dp["description"] for dp in sorted_nodes]
 
-    # Combine already_description with sorted new sorted descriptions
-    description_list = already_description + sorted_descriptions
+    # Combine already_description with new descriptions not already stored, so a
+    # chunk repeating known facts leaves the description (and its vector) unchanged
+    existing_descriptions = set(already_description)
+    description_list = already_description + [
+        desc for desc in sorted_descriptions if desc not in existing_descriptions
+    ]
     if not description_list:
         logger.error(f"Entity {entity_name} has no description")
         raise ValueError(f"Entity {entity_name} has no description")
@@ -1702,6 +2300,8 @@ async def _merge_nodes_then_upsert(
                 raise PipelineCancelledException("User cancelled during entity summary")
 
     # 8. Get summary description an LLM usage status
+    summary_folds = _stored_summary_folds(already_node, description_list[0])
+    summary_usage = {}
     description, llm_was_used = await _handle_entity_relation_summary(
         "Entity",
         entity_name,
@@ -1709,7 +2309,13 @@ async def _merge_nodes_then_upsert(
         GRAPH_FIELD_SEP,
         global_config,
         llm_response_cache,
+        summary_folds=summary_folds,
+        usage=summary_usage,
     )
+    summary_state = _next_summary_state(
+        global_config, summary_usage, description, summary_folds, already_node
+    )
+    await _count_summary_usage(summary_usage, pipeline_status, pipeline_status_lock)
 
     # 9. Build file_path within MAX_FILE_PATHS
     file_paths_list = []
@@ -1792,6 +2398,7 @@ async def _merge_nodes_then_upsert(
         status_message += (
             f" ({', '.join(filter(None, [truncation_info_log, dd_message]))})"
         )
+    status_message += _summary_usage_message(summary_usage)
 
     # Add message to pipeline satus when merge happens
     if already_fragment > 0 or llm_was_used:
@@ -1813,11 +2420,14 @@ async def _merge_nodes_then_upsert(
         created_at=int(time.time()),
         truncate=truncation_info,
     )
+    if summary_state is not None:
+        node_data["summary_state"] = summary_state
     await knowledge_graph_inst.upsert_node(
         entity_name,
         node_data=node_data,
     )
     node_data["entity_name"] = entity_name
+    node_data["llm_summary"] = llm_was_used
     if entity_vdb is not None:
         entity_vdb_id = compute_mdhash_id(str(entity_name), prefix="ent-")
         entity_content = f"{entity_name}\n{description}"
@@ -1830,6 +2440,13 @@ async def _merge_nodes_then_upsert(
                 "file_path": file_path,
             }
         }
+        # A merge that changed neither the text nor the stored metadata needs
+        # no re-embedding
+        if already_node and await _vdb_payload_unchanged(
+            entity_vdb, entity_vdb_id, data_for_vdb[entity_vdb_id]
+        ):
+            await _count_skipped_vdb_upsert(pipeline_status, pipeline_status_lock)
+            return node_data
         await safe_vdb_operation_with_exception(
             operation=lambda payload=data_for_vdb: entity_vdb.upsert(payload),
             operation_name="entity_upsert",
@@ -2016,8 +2633,11 @@ async def _merge_edges_then_upsert(
     )
     sorted_descriptions = [dp["description"] for dp in sorted_edges]
 
-    # Combine already_description with sorted new descriptions
-    description_list = already_description + sorted_descriptions
+    # Combine already_description with new descriptions not already stored
+    existing_descriptions = set(already_description)
+    description_list = already_description + [
+        desc for desc in sorted_descriptions if desc not in existing_descriptions
+    ]
     if not description_list:
         logger.error(f"Relation {src_id}~{tgt_id} has no description")
         raise ValueError(f"Relation {src_id}~{tgt_id} has no description")
@@ -2031,6 +2651,8 @@ async def _merge_edges_then_upsert(
                 )
 
     # 8. Get summary description an LLM usage status
+    summary_folds = _stored_summary_folds(already_edge, description_list[0])
+    summary_usage = {}
     description, llm_was_used = await _handle_entity_relation_summary(
         "Relation",
         f"({src_id}, {tgt_id})",
@@ -2038,7 +2660,13 @@ async def _merge_edges_then_upsert(
         GRAPH_FIELD_SEP,
         global_config,
         llm_response_cache,
+        summary_folds=summary_folds,
+        usage=summary_usage,
+    )
+    summary_state = _next_summary_state(
+        global_config, summary_usage, description, summary_folds, already_edge
     )
+    await _count_summary_usage(summary_usage, pipeline_status, pipeline_status_lock)
 
     # 9. Build file_path within MAX_FILE_PATHS limit
     file_paths_list = []
@@ -2125,6 +2753,7 @@ async def _merge_edges_then_upsert(
         status_message += (
             f" ({', '.join(filter(None, [truncation_info_log, dd_message]))})"
         )
+    status_message += _summary_usage_message(summary_usage)
 
     # Add message to pipeline satus when merge happens
     if already_fragment > 0 or llm_was_used:
@@ -2304,19 +2933,18 @@ async def _merge_edges_then_upsert(
                         pipeline_status["history_messages"].append(status_message)
 
     edge_created_at = int(time.time())
-    await knowledge_graph_inst.upsert_edge(
-        src_id,
-        tgt_id,
-        edge_data=dict(
-            weight=weight,
-            description=description,
-            keywords=keywords,
-            source_id=source_id,
-            file_path=file_path,
-            created_at=edge_created_at,
-            truncate=truncation_info,
-        ),
+    graph_edge_data = dict(
+        weight=weight,
+        description=description,
+        keywords=keywords,
+        source_id=source_id,
+        file_path=file_path,
+        created_at=edge_created_at,
+        truncate=truncation_info,
     )
+    if summary_state is not None:
+        graph_edge_data["summary_state"] = summary_state
+    await knowledge_graph_inst.upsert_edge(src_id, tgt_id, edge_data=graph_edge_data)
 
     edge_data = dict(
         src_id=src_id,
@@ -2328,6 +2956,7 @@ async def _merge_edges_then_upsert(
         created_at=edge_created_at,
         truncate=truncation_info,
         weight=weight,
+        llm_summary=llm_was_used,
     )
 
     # Sort src_id and tgt_id to ensure consistent ordering (smaller string first)
@@ -2337,12 +2966,6 @@ async def _merge_edges_then_upsert(
     if relationships_vdb is not None:
         rel_vdb_id = compute_mdhash_id(src_id + tgt_id, prefix="rel-")
         rel_vdb_id_reverse = compute_mdhash_id(tgt_id + src_id, prefix="rel-")
-        try:
-            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
-        except Exception as e:
-            logger.debug(
-                f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
-            )
         rel_content = f"{keywords}\t{src_id}\n{tgt_id}\n{description}"
         vdb_data = {
             rel_vdb_id: {
@@ -2356,6 +2979,19 @@ async def _merge_edges_then_upsert(
                 "file_path": file_path,
             }
         }
+        # A merge that changed neither the text nor the stored metadata needs
+        # no re-embedding
+        if already_edge and await _vdb_payload_unchanged(
+            relationships_vdb, rel_vdb_id, vdb_data[rel_vdb_id]
+        ):
+            await _count_skipped_vdb_upsert(pipeline_status, pipeline_status_lock)
+            return edge_data
+        try:
+            await relationships_vdb.delete([rel_vdb_id, rel_vdb_id_reverse])
+        except Exception as e:
+            logger.debug(
+                f"Could not delete old relationship vector records {rel_vdb_id}, {rel_vdb_id_reverse}: {e}"
+            )
         await safe_vdb_operation_with_exception(
             operation=lambda payload=vdb_data: relationships_vdb.upsert(payload),
             operation_name="relationship_upsert",
@@ -2367,6 +3003,131 @@ async def _merge_edges_then_upsert(
     return edge_data
 
 
+async def _update_doc_entity_relation_index(
+    doc_id: str,
+    processed_entities: list[dict],
+    edge_results: list[tuple[dict | None, list[dict]]],
+    full_entities_storage: BaseKVStorage,
+    full_relations_storage: BaseKVStorage,
+    pipeline_status: dict = None,
+    pipeline_status_lock=None,
+) -> None:
+    """Store the final entity names and relation pairs of one document (merge phase 3)
+
+    Args:
+        processed_entities: merged entity data of the entities extracted from the document
+        edge_results: (edge_data, added_entities) of the relations extracted from the document
+    """
+    try:
+        all_added_entities = [
+            added_entity
+            for _, added_entities in edge_results
+            for added_entity in added_entities
+        ]
+
+        # Merge all entities: original entities + entities added during edge processing
+        final_entity_names = set()
+
+        # Add original processed entities
+        for entity_data in processed_entities:
+            if entity_data and entity_data.get("entity_name"):
+                final_entity_names.add(entity_data["entity_name"])
+
+        # Add entities that were added during relationship processing
+        for added_entity in all_added_entities:
+            if added_entity and added_entity.get("entity_name"):
+                final_entity_names.add(added_entity["entity_name"])
+
+        # Collect all relation pairs
+        final_relation_pairs = set()
+        for edge_data, _ in edge_results:
+            if edge_data:
+                src_id = edge_data.get("src_id")
+                tgt_id = edge_data.get("tgt_id")
+                if src_id and tgt_id:
+                    relation_pair = tuple(sorted([src_id, tgt_id]))
+                    final_relation_pairs.add(relation_pair)
+
+        log_message = f"Phase 3: Updating final {len(final_entity_names)}({len(processed_entities)}+{len(all_added_entities)}) entities and  {len(final_relation_pairs)} relations from {doc_id}"
+        logger.info(log_message)
+        if pipeline_status is not None and pipeline_status_lock is not None:
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+        # Update storage
+        if final_entity_names:
+            await full_entities_storage.upsert(
+                {
+                    doc_id: {
+                        "entity_names": list(final_entity_names),
+                        "count": len(final_entity_names),
+                    }
+                }
+            )
+
+        if final_relation_pairs:
+            await full_relations_storage.upsert(
+                {
+                    doc_id: {
+                        "relation_pairs": [list(pair) for pair in final_relation_pairs],
+                        "count": len(final_relation_pairs),
+                    }
+                }
+            )
+
+        logger.debug(
+            f"Updated entity-relation index for document {doc_id}: {len(final_entity_names)} entities (original: {len(processed_entities)}, added: {len(all_added_entities)}), {len(final_relation_pairs)} relations"
+        )
+
+    except Exception as e:
+        logger.error(
+            f"Failed to update entity-relation index for document {doc_id}: {e}"
+        )
+        # Don't raise exception to avoid affecting main flow
+
+
+async def _report_batch_merge_savings(
+    doc_entity_names: dict[str, set],
+    doc_edge_keys: dict[str, set],
+    processed_entities: list[dict],
+    processed_edges: list[dict],
+    pipeline_status: dict = None,
+    pipeline_status_lock=None,
+) -> None:
+    """Log the work saved by merging several documents at once.
+
+    An entity or relation mentioned by k documents of the batch is merged once
+    instead of k times: k-1 graph writes and vector upserts are saved, and k-1
+    description summaries when its merge needed an LLM summary.
+    """
+    entity_docs = Counter(name for names in doc_entity_names.values() for name in names)
+    edge_docs = Counter(key for keys in doc_edge_keys.values() for key in keys)
+
+    vdb_upserts_saved = sum(count - 1 for count in entity_docs.values()) + sum(
+        count - 1 for count in edge_docs.values()
+    )
+    summary_calls_saved = sum(
+        entity_docs[entity_data["entity_name"]] - 1
+        for entity_data in processed_entities
+        if entity_data and entity_data.get("llm_summary")
+    ) + sum(
+        edge_docs[tuple(sorted((edge_data["src_id"], edge_data["tgt_id"])))] - 1
+        for edge_data in processed_edges
+        if edge_data and edge_data.get("llm_summary")
+    )
+
+    doc_count = len(doc_entity_names.keys() | doc_edge_keys.keys())
+    log_message = f"Batch merge of {doc_count} docs: saved {vdb_upserts_saved} entity/relation upserts, {summary_calls_saved} summary LLM calls"
+    await _update_pipeline_counters(
+        pipeline_status,
+        pipeline_status_lock,
+        log_message,
+        batch_merge_vdb_upserts_saved=vdb_upserts_saved,
+        batch_merge_summary_calls_saved=summary_calls_saved,
+    )
+
+
 async def merge_nodes_and_edges(
     chunk_results: list,
     knowledge_graph_inst: BaseGraphStorage,
@@ -2384,6 +3145,7 @@ async def merge_nodes_and_edges(
     current_file_number: int = 0,
     total_files: int = 0,
     file_path: str = "unknown_source",
+    doc_chunk_results: dict[str, list] | None = None,
 ) -> None:
     """Two-phase merge: process all entities first, then all relationships
 
@@ -2392,6 +3154,11 @@ async def merge_nodes_and_edges(
     2. Phase 2: Process all relationships concurrently (may add missing entities)
     3. Phase 3: Update full_entities and full_relations storage with final results
 
+    With doc_chunk_results (cross-document batch merge), the extraction results of
+    several documents are merged together: each entity/relation is read, summarized,
+    upserted and embedded once for the whole batch, and full_entities/full_relations
+    are still written per document.
+
     Args:
         chunk_results: List of tuples (maybe_nodes, maybe_edges) containing extracted entities and relationships
         knowledge_graph_inst: Knowledge graph storage
@@ -2409,6 +3176,8 @@ async def merge_nodes_and_edges(
         current_file_number: Current file number for logging
         total_files: Total files for logging
         file_path: File path for logging
+        doc_chunk_results: Optional doc_id -> chunk_results for a cross-document batch;
+            replaces chunk_results and doc_id
     """
 
     # Check for cancellation at the start of merge
@@ -2417,19 +3186,30 @@ async def merge_nodes_and_edges(
             if pipeline_status.get("cancellation_requested", False):
                 raise PipelineCancelledException("User cancelled during merge phase")
 
-    # Collect all nodes and edges from all chunks
+    if doc_chunk_results is None:
+        doc_chunk_results = {doc_id: chunk_results}
+    else:
+        doc_id = f"{len(doc_chunk_results)} docs"
+
+    # Collect all nodes and edges from all chunks, remembering which
+    # documents mention them
     all_nodes = defaultdict(list)
     all_edges = defaultdict(list)
-
-    for maybe_nodes, maybe_edges in chunk_results:
-        # Collect nodes
-        for entity_name, entities in maybe_nodes.items():
-            all_nodes[entity_name].extend(entities)
-
-        # Collect edges with sorted keys for undirected graph
-        for edge_key, edges in maybe_edges.items():
-            sorted_edge_key = tuple(sorted(edge_key))
-            all_edges[sorted_edge_key].extend(edges)
+    doc_entity_names = defaultdict(set)
+    doc_edge_keys = defaultdict(set)
+
+    for batch_doc_id, batch_chunk_results in doc_chunk_results.items():
+        for maybe_nodes, maybe_edges in batch_chunk_results:
+            # Collect nodes
+            for entity_name, entities in maybe_nodes.items():
+                all_nodes[entity_name].extend(entities)
+                doc_entity_names[batch_doc_id].add(entity_name)
+
+            # Collect edges with sorted keys for undirected graph
+            for edge_key, edges in maybe_edges.items():
+                sorted_edge_key = tuple(sorted(edge_key))
+                all_edges[sorted_edge_key].extend(edges)
+                doc_edge_keys[batch_doc_id].add(sorted_edge_key)
 
     total_entities_count = len(all_nodes)
     total_relations_count = len(all_edges)
@@ -2592,9 +3372,9 @@ async def merge_nodes_and_edges(
                     )
 
                     if edge_data is None:
-                        return None, []
+                        return edge_key, None, []
 
-                    return edge_data, added_entities
+                    return edge_key, edge_data, added_entities
 
                 except Exception as e:
                     error_msg = f"Error processing relation `{sorted_edge_key}`: {e}"
@@ -2629,6 +3409,8 @@ async def merge_nodes_and_edges(
     # Execute relationship tasks with error handling
     processed_edges = []
     all_added_entities = []
+    # edge key -> (edge_data, added_entities), used to attribute results to documents
+    edge_results = {}
 
     if edge_tasks:
         done, pending = await asyncio.wait(
@@ -2639,7 +3421,7 @@ async def merge_nodes_and_edges(
 
         for task in done:
             try:
-                edge_data, added_entities = task.result()
+                edge_key, edge_data, added_entities = task.result()
             except BaseException as e:
                 if first_exception is None:
                     first_exception = e
@@ -2647,6 +3429,7 @@ async def merge_nodes_and_edges(
                 if edge_data is not None:
                     processed_edges.append(edge_data)
                 all_added_entities.extend(added_entities)
+                edge_results[edge_key] = (edge_data, added_entities)
 
         if pending:
             for task in pending:
@@ -2657,78 +3440,52 @@ async def merge_nodes_and_edges(
                     if first_exception is None:
                         first_exception = result
                 else:
-                    edge_data, added_entities = result
+                    edge_key, edge_data, added_entities = result
                     if edge_data is not None:
                         processed_edges.append(edge_data)
                     all_added_entities.extend(added_entities)
+                    edge_results[edge_key] = (edge_data, added_entities)
 
         if first_exception is not None:
             raise first_exception
 
     # ===== Phase 3: Update full_entities and full_relations storage =====
-    if full_entities_storage and full_relations_storage and doc_id:
-        try:
-            # Merge all entities: original entities + entities added during edge processing
-            final_entity_names = set()
-
-            # Add original processed entities
-            for entity_data in processed_entities:
-                if entity_data and entity_data.get("entity_name"):
-                    final_entity_names.add(entity_data["entity_name"])
-
-            # Add entities that were added during relationship processing
-            for added_entity in all_added_entities:
-                if added_entity and added_entity.get("entity_name"):
-                    final_entity_names.add(added_entity["entity_name"])
-
-            # Collect all relation pairs
-            final_relation_pairs = set()
-            for edge_data in processed_edges:
-                if edge_data:
-                    src_id = edge_data.get("src_id")
-                    tgt_id = edge_data.get("tgt_id")
-                    if src_id and tgt_id:
-                        relation_pair = tuple(sorted([src_id, tgt_id]))
-                        final_relation_pairs.add(relation_pair)
-
-            log_message = f"Phase 3: Updating final {len(final_entity_names)}({len(processed_entities)}+{len(all_added_entities)}) entities and  {len(final_relation_pairs)} relations from {doc_id}"
-            logger.info(log_message)
-            async with pipeline_status_lock:
-                pipeline_status["latest_message"] = log_message
-                pipeline_status["history_messages"].append(log_message)
-
-            # Update storage
-            if final_entity_names:
-                await full_entities_storage.upsert(
-                    {
-                        doc_id: {
-                            "entity_names": list(final_entity_names),
-                            "count": len(final_entity_names),
-                        }
-                    }
-                )
-
-            if final_relation_pairs:
-                await full_relations_storage.upsert(
-                    {
-                        doc_id: {
-                            "relation_pairs": [
-                                list(pair) for pair in final_relation_pairs
-                            ],
-                            "count": len(final_relation_pairs),
-                        }
-                    }
-                )
-
-            logger.debug(
-                f"Updated entity-relation index for document {doc_id}: {len(final_entity_names)} entities (original: {len(processed_entities)}, added: {len(all_added_entities)}), {len(final_relation_pairs)} relations"
+    if full_entities_storage and full_relations_storage:
+        processed_entity_data = {
+            entity_data["entity_name"]: entity_data
+            for entity_data in processed_entities
+            if entity_data and entity_data.get("entity_name")
+        }
+        for batch_doc_id in doc_chunk_results:
+            if not batch_doc_id:
+                continue
+            await _update_doc_entity_relation_index(
+                batch_doc_id,
+                [
+                    processed_entity_data[name]
+                    for name in doc_entity_names[batch_doc_id]
+                    if name in processed_entity_data
+                ],
+                [
+                    edge_results[edge_key]
+                    for edge_key in doc_edge_keys[batch_doc_id]
+                    if edge_key in edge_results
+                ],
+                full_entities_storage,
+                full_relations_storage,
+                pipeline_status,
+                pipeline_status_lock,
             )
 
-        except Exception as e:
-            logger.error(
-                f"Failed to update entity-relation index for document {doc_id}: {e}"
-            )
-            # Don't raise exception to avoid affecting main flow
+    if len(doc_chunk_results) > 1:
+        await _report_batch_merge_savings(
+            doc_entity_names,
+            doc_edge_keys,
+            processed_entities,
+            processed_edges,
+            pipeline_status,
+            pipeline_status_lock,
+        )
 
     log_message = f"Completed merging: {len(processed_entities)} entities, {len(all_added_entities)} extra entities, {len(processed_edges)} relations"
     logger.info(log_message)
@@ -2737,6 +3494,85 @@ async def merge_nodes_and_edges(
         pipeline_status["history_messages"].append(log_message)
 
 
+async def _update_pipeline_counters(
+    pipeline_status: dict | None, pipeline_status_lock, log_message: str, **counters
+) -> None:
+    """Log a message and add counters to the shared pipeline_status"""
+    logger.info(log_message)
+    if pipeline_status is None or pipeline_status_lock is None:
+        return
+    async with pipeline_status_lock:
+        pipeline_status["latest_message"] = log_message
+        pipeline_status["history_messages"].append(log_message)
+        for name, value in counters.items():
+            pipeline_status[name] = pipeline_status.get(name, 0) + value
+
+
+async def _report_packing_savings(
+    packs: list[list[tuple[str, TextChunkSchema]]],
+    build_extraction_prompts,
+    context_base: dict,
+    global_config: dict,
+    pipeline_status: dict = None,
+    pipeline_status_lock=None,
+) -> None:
+    """Log the extraction calls and prompt tokens saved by packing one document's chunks.
+
+    Each chunk packed beside another saves its own extraction call (and gleaning call,
+    counted as if every chunk were gleaned), i.e. one copy of the instructions and
+    examples, minus the pack instruction overhead.
+    """
+    packed = [pack for pack in packs if len(pack) > 1]
+    if not packed:
+        return
+
+    tokenizer: Tokenizer = global_config["tokenizer"]
+    system_prompt, user_prompt = build_extraction_prompts("")
+    prompt_overhead = len(tokenizer.encode(system_prompt)) + len(
+        tokenizer.encode(user_prompt)
+    )
+    continue_overhead = len(
+        tokenizer.encode(
+            PROMPTS["entity_continue_extraction_user_prompt"].format(
+                **{**context_base, "input_text": ""}
+            )
+        )
+    )
+    gleaning = global_config.get("entity_extract_max_gleaning", 0) > 0
+
+    calls_saved = 0
+    tokens_saved = 0
+    for pack in packed:
+        extra_chunks = len(pack) - 1
+        instruction_tokens = len(
+            tokenizer.encode(
+                PROMPTS["entity_extraction_pack_instruction"].format(
+                    **context_base, chunk_count=len(pack)
+                )
+            )
+        )
+        calls_saved += extra_chunks
+        tokens_saved += extra_chunks * prompt_overhead - instruction_tokens
+        if gleaning:
+            # The gleaning request repeats the initial prompt as history
+            calls_saved += extra_chunks
+            tokens_saved += (
+                extra_chunks * (prompt_overhead + continue_overhead)
+                - 2 * instruction_tokens
+            )
+    tokens_saved = max(tokens_saved, 0)
+
+    packed_chunks = sum(len(pack) for pack in packed)
+    log_message = f"Chunk packing: {packed_chunks} chunks in {len(packed)} packs, saved {calls_saved} LLM calls (~{tokens_saved} prompt tokens)"
+    await _update_pipeline_counters(
+        pipeline_status,
+        pipeline_status_lock,
+        log_message,
+        extract_calls_saved=calls_saved,
+        extract_tokens_saved=tokens_saved,
+    )
+
+
 async def extract_entities(
     chunks: dict[str, TextChunkSchema],
     global_config: dict[str, str],
@@ -2744,7 +3580,17 @@ async def extract_entities(
     pipeline_status_lock=None,
     llm_response_cache: BaseKVStorage | None = None,
     text_chunks_storage: BaseKVStorage | None = None,
+    checkpoint_storage: BaseKVStorage | None = None,
+    checkpoint_progress: Callable[[int], Awaitable[None]] | None = None,
 ) -> list:
+    """Extract entities and relations from chunks
+
+    When checkpoint_storage is given, the outcome of every chunk (done with its parsed
+    result, or failed) is persisted as soon as it is known, and chunks already done in an
+    earlier run are restored from it instead of being sent to the LLM again.
+    checkpoint_progress is then awaited with the number of chunks checkpointed as done
+    under the current settings, after the restore and after every finished request.
+    """
     # Check for cancellation at the start of entity extraction
     if pipeline_status is not None and pipeline_status_lock is not None:
         async with pipeline_status_lock:
@@ -2782,9 +3628,127 @@ async def extract_entities(
         language=language,
     )
 
+    static_system_prompt = None
+    if global_config.get("entity_extract_prompt_layout") == "prefix_cache":
+        static_system_prompt = PROMPTS["entity_extraction_static_system_prompt"].format(
+            **context_base
+        )
+
+    def _build_extraction_prompts(input_text: str) -> tuple[str, str]:
+        """Return (system_prompt, user_prompt) for the initial extraction of input_text"""
+        if static_system_prompt is not None:
+            # Prefix-cache layout: identical system prompt, chunk text in the
+            # user message
+            return static_system_prompt, PROMPTS[
+                "entity_extraction_static_user_prompt"
+            ].format(**{**context_base, "input_text": input_text})
+        return (
+            PROMPTS["entity_extraction_system_prompt"].format(
+                **{**context_base, "input_text": input_text}
+            ),
+            PROMPTS["entity_extraction_user_prompt"].format(
+                **{**context_base, "input_text": input_text}
+            ),
+        )
+
     processed_chunks = 0
     total_chunks = len(ordered_chunks)
 
+    # Checkpoints are only reused while the settings that shape the
+    # extraction output are unchanged
+    checkpoint_signature = extraction_checkpoint_signature(global_config)
+    # Cache keys referenced by each extracted chunk, recorded in its checkpoint
+    chunk_cache_refs: dict[str, list[str]] = {}
+    restored_results = {}
+    checkpointed_chunks = 0
+    if checkpoint_storage is not None and ordered_chunks:
+        restored_results = await _restore_checkpointed_chunks(
+            checkpoint_storage,
+            ordered_chunks,
+            checkpoint_signature,
+            text_chunks_storage,
+        )
+        if restored_results:
+            ordered_chunks = [
+                chunk for chunk in ordered_chunks if chunk[0] not in restored_results
+            ]
+            processed_chunks = checkpointed_chunks = len(restored_results)
+            log_message = f"Resuming extraction: {processed_chunks} of {total_chunks} chunks restored from checkpoint"
+            logger.info(log_message)
+            if pipeline_status is not None:
+                async with pipeline_status_lock:
+                    pipeline_status["latest_message"] = log_message
+                    pipeline_status["history_messages"].append(log_message)
+            if checkpoint_progress is not None:
+                await checkpoint_progress(checkpointed_chunks)
+
+    async def _save_checkpoint(
+        unit: list[tuple[str, TextChunkSchema]],
+        results: list[tuple[dict, dict]] | None = None,
+        error: Exception | None = None,
+    ) -> None:
+        """Record the outcome of one extraction request for each of its chunks"""
+        nonlocal checkpointed_chunks
+        if checkpoint_storage is None:
+            return
+        records = {}
+        for index, (chunk_key, chunk_dp) in enumerate(unit):
+            record = {
+                "full_doc_id": chunk_dp.get("full_doc_id"),
+                "signature": checkpoint_signature,
+            }
+            if results is not None:
+                record.update(
+                    status="done",
+                    result=_serialize_chunk_extraction(*results[index]),
+                    llm_cache_list=chunk_cache_refs.get(chunk_key, []),
+                )
+            else:
+                record.update(status="failed", error_msg=str(error))
+            key = make_extraction_checkpoint_key(chunk_dp.get("full_doc_id"), chunk_key)
+            records[key] = record
+        try:
+            await checkpoint_storage.upsert(records)
+        except Exception as e:
+            logger.warning(f"Failed to save extraction checkpoint: {e}")
+            return
+        if results is not None and checkpoint_progress is not None:
+            checkpointed_chunks += len(unit)
+            await checkpoint_progress(checkpointed_chunks)
+
+    gleaning_policy = global_config.get(
+        "entity_extract_gleaning_policy", DEFAULT_ENTITY_EXTRACT_GLEANING_POLICY
+    )
+    glean_min_density = global_config.get(
+        "entity_extract_glean_min_density", DEFAULT_ENTITY_EXTRACT_GLEAN_MIN_DENSITY
+    )
+    gleaning_stats = {"calls": 0, "skipped": 0, "new_entities": 0, "new_relations": 0}
+
+    def _should_glean(unit_key: str, candidates: list[tuple[dict, int, int]]) -> bool:
+        """Decide whether to run the gleaning pass for one extraction request
+        Args:
+            unit_key (str): chunk key (first chunk key for packed requests)
+            candidates (list): (parse_stats, chunk_tokens, entity_count) of each chunk in the request
+        """
+        if entity_extract_max_gleaning <= 0:
+            return False
+        if gleaning_policy == "adaptive":
+            reasons = {
+                _gleaning_reason(stats, tokens, count, glean_min_density)
+                for stats, tokens, count in candidates
+            } - {None}
+            if not reasons:
+                gleaning_stats["skipped"] += 1
+                logger.debug(f"{unit_key}: gleaning skipped by adaptive policy")
+                return False
+            logger.debug(f"{unit_key}: gleaning for {', '.join(sorted(reasons))}")
+        gleaning_stats["calls"] += 1
+        return True
+
+    def _record_gleaning(new_entities: int, new_relations: int) -> None:
+        gleaning_stats["new_entities"] += new_entities
+        gleaning_stats["new_relations"] += new_relations
+
     async def _process_single_content(chunk_key_dp: tuple[str, TextChunkSchema]):
         """Process a single chunk
         Args:
@@ -2804,12 +3768,10 @@ async def extract_entities(
         cache_keys_collector = []
 
         # Get initial extraction
-        entity_extraction_system_prompt = PROMPTS[
-            "entity_extraction_system_prompt"
-        ].format(**{**context_base, "input_text": content})
-        entity_extraction_user_prompt = PROMPTS["entity_extraction_user_prompt"].format(
-            **{**context_base, "input_text": content}
-        )
+        (
+            entity_extraction_system_prompt,
+            entity_extraction_user_prompt,
+        ) = _build_extraction_prompts(content)
         entity_continue_extraction_user_prompt = PROMPTS[
             "entity_continue_extraction_user_prompt"
         ].format(**{**context_base, "input_text": content})
@@ -2829,6 +3791,7 @@ async def extract_entities(
         )
 
         # Process initial extraction with file path
+        parse_stats = {}
         maybe_nodes, maybe_edges = await _process_extraction_result(
             final_result,
             chunk_key,
@@ -2836,10 +3799,13 @@ async def extract_entities(
             file_path,
             tuple_delimiter=context_base["tuple_delimiter"],
             completion_delimiter=context_base["completion_delimiter"],
+            stats=parse_stats,
         )
 
         # Process additional gleaning results only 1 time when entity_extract_max_gleaning is greater than zero.
-        if entity_extract_max_gleaning > 0:
+        if _should_glean(
+            chunk_key, [(parse_stats, chunk_dp.get("tokens", 0), len(maybe_nodes))]
+        ):
             glean_result, timestamp = await use_llm_func_with_cache(
                 entity_continue_extraction_user_prompt,
                 use_llm_func,
@@ -2862,36 +3828,13 @@ async def extract_entities(
             )
 
             # Merge results - compare description lengths to choose better version
-            for entity_name, glean_entities in glean_nodes.items():
-                if entity_name in maybe_nodes:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_nodes[entity_name][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_entities[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_nodes[entity_name] = list(glean_entities)
-                    # Otherwise keep original version
-                else:
-                    # New entity from gleaning stage
-                    maybe_nodes[entity_name] = list(glean_entities)
-
-            for edge_key, glean_edges in glean_edges.items():
-                if edge_key in maybe_edges:
-                    # Compare description lengths and keep the better one
-                    original_desc_len = len(
-                        maybe_edges[edge_key][0].get("description", "") or ""
-                    )
-                    glean_desc_len = len(glean_edges[0].get("description", "") or "")
-
-                    if glean_desc_len > original_desc_len:
-                        maybe_edges[edge_key] = list(glean_edges)
-                    # Otherwise keep original version
-                else:
-                    # New edge from gleaning stage
-                    maybe_edges[edge_key] = list(glean_edges)
+            _record_gleaning(
+                *_merge_gleaning_result(
+                    maybe_nodes, maybe_edges, glean_nodes, glean_edges
+                )
+            )
 
+        chunk_cache_refs[chunk_key] = cache_keys_collector
         # Batch update chunk's llm_cache_list with all collected cache keys
         if cache_keys_collector and text_chunks_storage:
             await update_chunk_cache_list(
@@ -2914,11 +3857,181 @@ async def extract_entities(
         # Return the extracted nodes and edges for centralized processing
         return maybe_nodes, maybe_edges
 
+    async def _process_packed_contents(pack: list[tuple[str, TextChunkSchema]]):
+        """Process several small chunks with a single extraction request (and gleaning request)
+        Args:
+            pack (list[tuple[str, TextChunkSchema]]): consecutive chunks sharing one request
+        Returns:
+            list: (maybe_nodes, maybe_edges) per chunk, attributed back to each chunk_key
+        """
+        nonlocal processed_chunks
+        pack_key = pack[0][0]
+        packed_text = "\n\n".join(
+            PROMPTS["entity_extraction_pack_chunk"].format(
+                chunk_number=index + 1, chunk_text=chunk_dp["content"]
+            )
+            for index, (_, chunk_dp) in enumerate(pack)
+        )
+        pack_instruction = PROMPTS["entity_extraction_pack_instruction"].format(
+            **context_base, chunk_count=len(pack)
+        )
+        system_prompt, user_prompt = _build_extraction_prompts(packed_text)
+        user_prompt = user_prompt + pack_instruction
+
+        # One cache key per request; the packed output is cached under its
+        # own cache_type
+        # so rebuilds only ever see the per-chunk sections saved below
+        pack_cache_keys = []
+        final_result, timestamp = await use_llm_func_with_cache(
+            user_prompt,
+            use_llm_func,
+            system_prompt=system_prompt,
+            llm_response_cache=llm_response_cache,
+            cache_type="extract_pack",
+            chunk_id=pack_key,
+            cache_keys_collector=pack_cache_keys,
+        )
+        passes = [
+            (
+                _split_packed_extraction_result(
+                    final_result,
+                    pack,
+                    tuple_delimiter=context_base["tuple_delimiter"],
+                    completion_delimiter=context_base["completion_delimiter"],
+                ),
+                timestamp,
+            )
+        ]
+
+        results = []
+        glean_candidates = []
+        for chunk_key, chunk_dp in pack:
+            parse_stats = {}
+            maybe_nodes, maybe_edges = await _process_extraction_result(
+                passes[0][0][chunk_key],
+                chunk_key,
+                timestamp,
+                chunk_dp.get("file_path", "unknown_source"),
+                tuple_delimiter=context_base["tuple_delimiter"],
+                completion_delimiter=context_base["completion_delimiter"],
+                stats=parse_stats,
+            )
+            results.append((maybe_nodes, maybe_edges))
+            glean_candidates.append(
+                (parse_stats, chunk_dp.get("tokens", 0), len(maybe_nodes))
+            )
+
+        # Per-chunk sections always end with the completion delimiter, so
+        # check the raw output
+        if context_base["completion_delimiter"].lower() not in final_result.lower():
+            glean_candidates.append(({"truncated": True}, 0, 0))
+
+        # One gleaning request covers the whole pack when any of its chunks needs it
+        if _should_glean(pack_key, glean_candidates):
+            continue_prompt = (
+                PROMPTS["entity_continue_extraction_user_prompt"].format(
+                    **{**context_base, "input_text": packed_text}
+                )
+                + pack_instruction
+            )
+            glean_result, timestamp = await use_llm_func_with_cache(
+                continue_prompt,
+                use_llm_func,
+                system_prompt=system_prompt,
+                llm_response_cache=llm_response_cache,
+                history_messages=pack_user_ass_to_openai_messages(
+                    user_prompt, final_result
+                ),
+                cache_type="extract_pack",
+                chunk_id=pack_key,
+                cache_keys_collector=pack_cache_keys,
+            )
+            sections = _split_packed_extraction_result(
+                glean_result,
+                pack,
+                tuple_delimiter=context_base["tuple_delimiter"],
+                completion_delimiter=context_base["completion_delimiter"],
+            )
+            passes.append((sections, timestamp))
+            new_entities = new_relations = 0
+            for (chunk_key, chunk_dp), (maybe_nodes, maybe_edges) in zip(pack, results):
+                glean_nodes, glean_edges = await _process_extraction_result(
+                    sections[chunk_key],
+                    chunk_key,
+                    timestamp,
+                    chunk_dp.get("file_path", "unknown_source"),
+                    tuple_delimiter=context_base["tuple_delimiter"],
+                    completion_delimiter=context_base["completion_delimiter"],
+                )
+                chunk_new_entities, chunk_new_relations = _merge_gleaning_result(
+                    maybe_nodes, maybe_edges, glean_nodes, glean_edges
+                )
+                new_entities += chunk_new_entities
+                new_relations += chunk_new_relations
+            _record_gleaning(new_entities, new_relations)
+
+        # Every chunk references the packed entries (removed with the
+        # document) plus its own sections
+        chunk_cache_keys = {chunk_key: list(pack_cache_keys) for chunk_key, _ in pack}
+        if llm_response_cache is not None and len(pack_cache_keys) == len(passes):
+            for pack_cache_key, (sections, _) in zip(pack_cache_keys, passes):
+                for chunk_key, section in sections.items():
+                    chunk_cache_keys[chunk_key].append(
+                        await _save_packed_extraction_section(
+                            llm_response_cache, pack_cache_key, chunk_key, section
+                        )
+                    )
+
+        chunk_cache_refs.update(chunk_cache_keys)
+        if text_chunks_storage:
+            for chunk_key, _ in pack:
+                if chunk_cache_keys[chunk_key]:
+                    await update_chunk_cache_list(
+                        chunk_key,
+                        text_chunks_storage,
+                        chunk_cache_keys[chunk_key],
+                        "entity_extraction",
+                    )
+
+        processed_chunks += len(pack)
+        entities_count = sum(len(nodes) for nodes, _ in results)
+        relations_count = sum(len(edges) for _, edges in results)
+        log_message = f"Chunk {processed_chunks} of {total_chunks} extracted {entities_count} Ent + {relations_count} Rel from {len(pack)} packed chunks {pack_key}"
+        logger.info(log_message)
+        if pipeline_status is not None:
+            async with pipeline_status_lock:
+                pipeline_status["latest_message"] = log_message
+                pipeline_status["history_messages"].append(log_message)
+
+        return results
+
+    # Group small consecutive chunks so they share one extraction request
+    if global_config.get("entity_extract_pack_chunks", False):
+        work_units = _group_chunks_for_packing(
+            ordered_chunks,
+            global_config.get(
+                "entity_extract_pack_max_tokens", DEFAULT_ENTITY_EXTRACT_PACK_MAX_TOKENS
+            ),
+            global_config.get(
+                "entity_extract_pack_max_chunks", DEFAULT_ENTITY_EXTRACT_PACK_MAX_CHUNKS
+            ),
+        )
+        await _report_packing_savings(
+            work_units,
+            _build_extraction_prompts,
+            context_base,
+            global_config,
+            pipeline_status,
+            pipeline_status_lock,
+        )
+    else:
+        work_units = [[chunk] for chunk in ordered_chunks]
+
     # Get max async tasks limit from global_config
     chunk_max_async = global_config.get("llm_model_max_async", 4)
     semaphore = asyncio.Semaphore(chunk_max_async)
 
-    async def _process_with_semaphore(chunk):
+    async def _process_with_semaphore(unit: list[tuple[str, TextChunkSchema]]):
         async with semaphore:
             # Check for cancellation before processing chunk
             if pipeline_status is not None and pipeline_status_lock is not None:
@@ -2929,24 +4042,33 @@ async def extract_entities(
                         )
 
             try:
-                return await _process_single_content(chunk)
+                if len(unit) > 1:
+                    results = await _process_packed_contents(unit)
+                else:
+                    results = [await _process_single_content(unit[0])]
             except Exception as e:
-                chunk_id = chunk[0]  # Extract chunk_id from chunk[0]
+                if not isinstance(e, PipelineCancelledException):
+                    await _save_checkpoint(unit, error=e)
+                chunk_id = unit[0][0]  # Extract chunk_id of the (first) chunk
                 prefixed_exception = create_prefixed_exception(e, chunk_id)
                 raise prefixed_exception from e
+            await _save_checkpoint(unit, results=results)
+            return results
 
     tasks = []
-    for c in ordered_chunks:
-        task = asyncio.create_task(_process_with_semaphore(c))
+    for unit in work_units:
+        task = asyncio.create_task(_process_with_semaphore(unit))
         tasks.append(task)
 
     # Wait for tasks to complete or for the first exception to occur
     # This allows us to cancel remaining tasks if any task fails
-    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    done, pending = set(), set()
+    if tasks:  # Empty when every chunk was restored from checkpoint
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
 
     # Check if any task raised an exception and ensure all exceptions are retrieved
     first_exception = None
-    chunk_results = []
+    chunk_results = list(restored_results.values())
 
     for task in done:
         try:
@@ -2955,7 +4077,7 @@ async def extract_entities(
                 if first_exception is None:
                     first_exception = exception
             else:
-                chunk_results.append(task.result())
+                chunk_results.extend(task.result())
         except Exception as e:
             if first_exception is None:
                 first_exception = e
@@ -2977,6 +4099,21 @@ async def extract_entities(
         prefixed_exception = create_prefixed_exception(first_exception, progress_prefix)
         raise prefixed_exception from first_exception
 
+    if entity_extract_max_gleaning > 0:
+        log_message = (
+            f"Gleaning: {gleaning_stats['calls']} calls, {gleaning_stats['skipped']} skipped, "
+            f"found {gleaning_stats['new_entities']} new Ent + {gleaning_stats['new_relations']} new Rel"
+        )
+        await _update_pipeline_counters(
+            pipeline_status,
+            pipeline_status_lock,
+            log_message,
+            gleaning_calls=gleaning_stats["calls"],
+            gleaning_skipped=gleaning_stats["skipped"],
+            gleaning_new_entities=gleaning_stats["new_entities"],
+            gleaning_new_relations=gleaning_stats["new_relations"],
+        )
+
     # If all tasks completed successfully, chunk_results already contains the results
     # Return the chunk_results for later processing in merge_nodes_and_edges
     return chunk_results
@@ -3133,6 +4270,14 @@ async def kg_query(
             " == LLM cache == Query cache hit, using cached response as query result"
         )
         response = cached_response
+        if query_param.stream:
+            response = replay_cached_stream(
+                cached_response,
+                global_config.get(
+                    "stream_cache_replay_chunk_size",
+                    DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE,
+                ),
+            )
     else:
         response = await use_model_func(
             user_query,
@@ -3156,17 +4301,19 @@ async def kg_query(
                 "user_prompt": query_param.user_prompt or "",
                 "enable_rerank": query_param.enable_rerank,
             }
-            await save_to_cache(
-                hashing_kv,
-                CacheData(
-                    args_hash=args_hash,
-                    content=response,
-                    prompt=query,
-                    mode=query_param.mode,
-                    cache_type="query",
-                    queryparam=queryparam_dict,
-                ),
+            cache_data = CacheData(
+                args_hash=args_hash,
+                content=response,
+                prompt=query,
+                mode=query_param.mode,
+                cache_type="query",
+                queryparam=queryparam_dict,
             )
+            if hasattr(response, "__aiter__"):
+                # Cache the full text once the stream has completed
+                response = cache_stream_response(response, hashing_kv, cache_data)
+            else:
+                await save_to_cache(hashing_kv, cache_data)
 
     # Return unified result based on actual response type
     if isinstance(response, str):
@@ -4915,6 +6062,14 @@ async def naive_query(
             " == LLM cache == Query cache hit, using cached response as query result"
         )
         response = cached_response
+        if query_param.stream:
+            response = replay_cached_stream(
+                cached_response,
+                global_config.get(
+                    "stream_cache_replay_chunk_size",
+                    DEFAULT_STREAM_CACHE_REPLAY_CHUNK_SIZE,
+                ),
+            )
     else:
         response = await use_model_func(
             user_query,
@@ -4936,17 +6091,19 @@ async def naive_query(
                 "user_prompt": query_param.user_prompt or "",
                 "enable_rerank": query_param.enable_rerank,
             }
-            await save_to_cache(
-                hashing_kv,
-                CacheData(
-                    args_hash=args_hash,
-                    content=response,
-                    prompt=query,
-                    mode=query_param.mode,
-                    cache_type="query",
-                    queryparam=queryparam_dict,
-                ),
+            cache_data = CacheData(
+                args_hash=args_hash,
+                content=response,
+                prompt=query,
+                mode=query_param.mode,
+                cache_type="query",
+                queryparam=queryparam_dict,
             )
+            if hasattr(response, "__aiter__"):
+                # Cache the full text once the stream has completed
+                response = cache_stream_response(response, hashing_kv, cache_data)
+            else:
+                await save_to_cache(hashing_kv, cache_data)
 
     # Return unified result based on actual response type
     if isinstance(response, str):
@@ -80,6 +80,38 @@ Extract entities and relationships from the input text to be processed.
 <Output>
 """
 
+# Prefix-cache-friendly layout: the system prompt (instructions + examples) carries no
+# chunk text and is byte-identical for every chunk; the text moves into the user message
+PROMPTS["entity_extraction_static_system_prompt"] = (
+    PROMPTS["entity_extraction_system_prompt"]
+    .split("---Real Data to be Processed---")[0]
+    .rstrip()
+    + "\n"
+)
+
+PROMPTS["entity_extraction_static_user_prompt"] = """---Real Data to be Processed---
+<Input>
+Entity_types: [{entity_types}]
+Text:
+```
+{input_text}
+```
+
+""" + PROMPTS["entity_extraction_user_prompt"]
+
+# Multi-chunk packing: several small chunks share one extraction request
+PROMPTS["entity_extraction_pack_chunk"] = """<Chunk {chunk_number}>
+{chunk_text}
+</Chunk {chunk_number}>"""
+
+PROMPTS["entity_extraction_pack_instruction"] = """
+---Multiple Input Chunks---
+The input text consists of {chunk_count} independent chunks, each wrapped in `<Chunk N>` and `</Chunk N>` tags.
+1.  **Per-Chunk Extraction:** Process each chunk independently. A relationship must only connect entities that appear in the same chunk.
+2.  **Chunk Header:** Before the records of each chunk, output a header line `chunk{tuple_delimiter}N`, where N is the chunk number. Output the header for every chunk, even when it has no records.
+3.  **Single Completion Signal:** Output `{completion_delimiter}` only once, after the records of the last chunk.
+"""
+
 PROMPTS["entity_continue_extraction_user_prompt"] = """---Task---
 Based on the last extraction task, identify and extract any **missed or incorrectly formatted** entities and relationships from the input text.
 
@@ -207,6 +239,46 @@ Description List:
 ---Output---
 """
 
+PROMPTS["summarize_entity_descriptions_incremental"] = """---Role---
+You are a Knowledge Graph Specialist, proficient in data curation and synthesis.
+
+---Task---
+Your task is to update the existing summary of a given entity or relation with a list of newly collected descriptions, producing a single, comprehensive, and cohesive summary.
+
+---Instructions---
+1. Input Format: The existing summary is provided as plain text in the `Existing Summary` section. The new descriptions are provided in JSON format, each JSON object on a new line within the `New Description List` section.
+2. Output Format: The updated summary will be returned as plain text, presented in multiple paragraphs, without any additional formatting or extraneous comments before or after the summary.
+3. Preservation: Keep every key fact of the existing summary unless a new description explicitly corrects it.
+4. Comprehensiveness: Integrate all key information from *every* new description. Do not omit any important facts or details.
+5. Context & Objectivity:
+  - Write the summary from an objective, third-person perspective.
+  - Explicitly mention the full name of the entity or relation at the beginning of the summary to ensure immediate clarity and context.
+6. Conflict Handling:
+  - If new descriptions appear to concern a distinct entity or relationship sharing the same name, summarize each one *separately* within the overall output.
+  - If they conflict with the existing summary for the same entity/relation, attempt to reconcile them or present both viewpoints with noted uncertainty.
+7. Length Constraint: The summary's total length must not exceed {summary_length} tokens, while still maintaining depth and completeness.
+8. Language:
+  - The entire output must be written in {language}.
+  - Proper nouns (e.g., personal names, place names, organization names) should be retained in their original language if a proper, widely accepted translation is not available or would cause ambiguity.
+
+---Input---
+{description_type} Name: {description_name}
+
+Existing Summary:
+
+```
+{existing_summary}
+```
+
+New Description List:
+
+```
+{description_list}
+```
+
+---Output---
+"""
+
 PROMPTS["fail_response"] = (
     "Sorry, I'm not able to provide an answer to that question.[no-context]"
 )
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-call client overhead: fresh OpenAI client per call vs pooled client.
+
+Starts a minimal local OpenAI-compatible embeddings endpoint and times the same
+embedding request made through a newly created client (the previous behaviour
+of openai_embed / openai_complete_if_cache) and through the shared client pool.
+Against a local endpoint the difference is client construction plus TCP
+connection setup; against a remote HTTPS provider the TLS handshake saved per
+call comes on top of that.
+
+Usage:
+    python -m lightrag.tools.benchmark_client_pool [--calls 200] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lightrag.llm.client_pool import close_shared_clients, shared_client_stats
+from lightrag.llm.openai import create_openai_async_client, get_openai_async_client
+
+_BODY = json.dumps(
+    {
+        "object": "list",
+        "data": [{"object": "embedding", "index": 0, "embedding": [0.0] * 8}],
+        "model": "bench",
+        "usage": {"prompt_tokens": 1, "total_tokens": 1},
+    }
+).encode("utf-8")
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            header = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in header.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            if length:
+                await reader.readexactly(length)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                + f"Content-Length: {len(_BODY)}\r\n\r\n".encode()
+                + _BODY
+            )
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        pass
+    finally:
+        writer.close()
+
+
+async def _timed_calls(make_call, calls: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    durations: list[float] = []
+
+    async def _one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await make_call()
+            durations.append((time.perf_counter() - started) * 1000)
+
+    await asyncio.gather(*[_one() for _ in range(calls)])
+    return durations
+
+
+def _report(label: str, durations: list[float]) -> None:
+    ordered = sorted(durations)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{label:<8} mean {statistics.mean(ordered):7.2f} ms   "
+        f"p50 {statistics.median(ordered):7.2f} ms   p95 {p95:7.2f} ms"
+    )
+
+
+async def main(calls: int, concurrency: int) -> None:
+    server = await asyncio.start_server(_handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/v1"
+    api_key = "benchmark"
+
+    async def fresh_call() -> None:
+        client = create_openai_async_client(api_key=api_key, base_url=base_url)
+        async with client:
+            await client.embeddings.create(model="bench", input=["x"])
+
+    async def pooled_call() -> None:
+        client = get_openai_async_client(api_key=api_key, base_url=base_url)
+        await client.embeddings.create(model="bench", input=["x"])
+
+    # Warm up imports and the pooled client
+    await fresh_call()
+    await pooled_call()
+
+    print(f"{calls} embedding calls, concurrency {concurrency}")
+    _report("fresh", await _timed_calls(fresh_call, calls, concurrency))
+    _report("pooled", await _timed_calls(pooled_call, calls, concurrency))
+    print(f"pool stats: {shared_client_stats()}")
+
+    await close_shared_clients()
+    server.close()
+    await server.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.concurrency))
@@ -2,6 +2,7 @@ from __future__ import annotations
 import weakref
 
 import asyncio
+import base64
 import html
 import csv
 import json
@@ -11,12 +12,16 @@ import os
 import re
 import time
 import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from datetime import datetime
 from functools import wraps
-from hashlib import md5
+from hashlib import md5, sha256
 from typing import (
     Any,
+    AsyncIterator,
     Protocol,
     Callable,
     TYPE_CHECKING,
@@ -356,6 +361,7 @@ class EmbeddingFunc:
     send_dimensions: bool = (
         False  # Control whether to send embedding_dim to the function
     )
+    model_name: str | None = None  # Identifies the model in embedding cache keys
 
     async def __call__(self, *args, **kwargs) -> np.ndarray:
         # Only inject embedding_dim when send_dimensions is True
@@ -465,6 +471,365 @@ class HealthCheckTimeoutError(Exception):
         )
 
 
+def _is_overload_error(exc: BaseException) -> bool:
+    """Whether an exception signals provider overload (429/5xx/timeout)"""
+    # Unwrap tenacity RetryError to the last underlying exception
+    last_attempt = getattr(exc, "last_attempt", None)
+    if last_attempt is not None and hasattr(last_attempt, "exception"):
+        inner = last_attempt.exception()
+        if inner is not None:
+            exc = inner
+    if isinstance(exc, (asyncio.TimeoutError, TimeoutError, WorkerTimeoutError)):
+        return True
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    name = type(exc).__name__
+    return any(
+        marker in name
+        for marker in (
+            "RateLimit",
+            "Timeout",
+            "Overloaded",
+            "ServiceUnavailable",
+            "InternalServerError",
+            "APIConnection",
+        )
+    )
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency gate used by priority_limit_async_func_call.
+
+    While calls succeed at healthy latency and the current limit is saturated,
+    the limit grows by ``increase_step`` per window of ``limit`` completions
+    (additive increase). On 429/5xx/timeouts it is multiplied by
+    ``decrease_factor`` (at most once per ``cooldown`` seconds). The limit
+    always stays within [min_limit, max_limit].
+
+    Latency is "healthy" when it is within ``latency_tolerance`` times a slowly
+    drifting baseline of the fastest observed calls. With ``adaptive=False``
+    the gate is pinned at ``max_limit`` and the instance only collects metrics.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: int | None = None,
+        adaptive: bool = True,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        cooldown: float = 1.0,
+        window: int = 512,
+    ):
+        self.adaptive = adaptive
+        self.max_limit = max(1, int(max_limit))
+        self.min_limit = max(1, min(int(min_limit), self.max_limit))
+        if initial_limit is None:
+            initial_limit = self.max_limit
+        self._limit = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.cooldown = cooldown
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._baseline: float | None = None
+        self._last_decrease = 0.0
+        self._held = 0
+        self._executing = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._counters = {
+            "completed": 0,
+            "errors": 0,
+            "overload_errors": 0,
+            "limit_increases": 0,
+            "limit_decreases": 0,
+        }
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    async def acquire(self) -> None:
+        """Wait until fewer than ``limit`` slots are held, then take one"""
+        while self._held >= self.limit:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            finally:
+                if not waiter.done():
+                    waiter.cancel()
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+        self._held += 1
+
+    def release(self) -> None:
+        self._held = max(0, self._held - 1)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = self.limit - self._held
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def started(self) -> None:
+        self._executing += 1
+
+    def finished(self, latency: float, outcome: str | None) -> None:
+        """Record a finished call: outcome is "ok", "overload", "error" or None (cancelled)"""
+        saturated = self._executing >= self.limit
+        self._executing = max(0, self._executing - 1)
+        if outcome is None:
+            return
+        self._latencies.append(latency)
+        self._counters["completed"] += 1
+        if outcome == "ok":
+            if self._baseline is None or latency < self._baseline:
+                self._baseline = latency
+            else:
+                # Drift slowly towards recent latency so the baseline can recover
+                self._baseline += (latency - self._baseline) * 0.01
+            healthy = latency <= self._baseline * self.latency_tolerance
+            if self.adaptive and healthy and saturated:
+                self._increase()
+            return
+
+        self._counters["errors"] += 1
+        if outcome == "overload":
+            self._counters["overload_errors"] += 1
+            if self.adaptive:
+                self._decrease()
+
+    def _increase(self) -> None:
+        if self._limit >= self.max_limit:
+            return
+        before = self.limit
+        self._limit = min(
+            float(self.max_limit), self._limit + self.increase_step / self._limit
+        )
+        if self.limit > before:
+            self._counters["limit_increases"] += 1
+            self._wake()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        new_limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+        if new_limit < self._limit:
+            self._limit = new_limit
+            self._counters["limit_decreases"] += 1
+
+    def snapshot(self) -> dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def percentile(q: float) -> float | None:
+            if not latencies:
+                return None
+            idx = min(len(latencies) - 1, int(q * len(latencies)))
+            return round(latencies[idx] * 1000, 1)
+
+        return {
+            "adaptive": self.adaptive,
+            "limit": self.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._executing,
+            **self._counters,
+            "latency_ms": {
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "baseline": (
+                    round(self._baseline * 1000, 1)
+                    if self._baseline is not None
+                    else None
+                ),
+            },
+        }
+
+
+class TokenBucket:
+    """Per-minute budget that refills continuously and may go into debt.
+
+    ``reserve`` always succeeds and returns how long the caller has to wait
+    until the bucket is out of debt, so concurrent callers queue up in
+    reservation order without a lock.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A single request larger than the budget must still be able to run
+        self.level -= min(amount, self.capacity)
+        return 0.0 if self.level >= 0 else -self.level / self.rate
+
+    def adjust(self, delta: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact"""
+        self.level = min(self.capacity, self.level - delta)
+
+
+class RateLimiter:
+    """Request (RPM) and token (TPM) budget for one provider.
+
+    Calls reserve one request plus their estimated tokens and sleep until both
+    buckets allow them; ``reconcile`` corrects the token bucket once the actual
+    output size is known. A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0):
+        self.name = name
+        self._waits: deque[float] = deque(maxlen=512)
+        self._counters = {
+            "requests": 0,
+            "throttled": 0,
+            "tokens_reserved": 0,
+            "tokens_reconciled": 0,
+            "throttle_wait_s": 0.0,
+        }
+        self.configure(rpm, tpm)
+
+    def configure(self, rpm: float = 0, tpm: float = 0) -> None:
+        self.rpm = rpm or 0
+        self.tpm = tpm or 0
+        self._requests = TokenBucket(rpm) if rpm and rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm and tpm > 0 else None
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Reserve one request and ``tokens`` tokens; returns the throttle wait in seconds"""
+        now = time.monotonic()
+        wait = 0.0
+        if self._requests is not None:
+            wait = max(wait, self._requests.reserve(1, now))
+        if self._tokens is not None and tokens > 0:
+            wait = max(wait, self._tokens.reserve(tokens, now))
+        self._counters["requests"] += 1
+        self._counters["tokens_reserved"] += tokens
+        if wait > 0:
+            self._counters["throttled"] += 1
+            self._counters["throttle_wait_s"] += wait
+            await asyncio.sleep(wait)
+        self._waits.append(wait)
+        return wait
+
+    def reconcile(self, estimated: int, actual: int) -> None:
+        if self._tokens is not None and actual != estimated:
+            self._tokens.adjust(actual - estimated)
+            self._counters["tokens_reconciled"] += actual - estimated
+
+    def snapshot(self) -> dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def percentile(q: float) -> float | None:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1)
+
+        return {
+            "name": self.name,
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            **{k: v for k, v in self._counters.items() if k != "throttle_wait_s"},
+            "throttle_wait_ms": {
+                "total": round(self._counters["throttle_wait_s"] * 1000, 1),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+            },
+        }
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+
+
+class PipelineStageMetrics:
+    """Queue depth and throughput counters for the staged document pipeline.
+
+    Each stage tracks documents waiting in its input queue, documents being
+    processed, completions, failures and busy time. ``snapshot()`` returns a
+    plain dict suitable for the shared pipeline_status.
+    """
+
+    def __init__(self, stages: Iterable[str]):
+        self.started_at = time.monotonic()
+        self._stages = {
+            name: {
+                "queued": 0,
+                "in_flight": 0,
+                "completed": 0,
+                "failed": 0,
+                "busy_seconds": 0.0,
+            }
+            for name in stages
+        }
+
+    def enqueued(self, stage: str) -> None:
+        self._stages[stage]["queued"] += 1
+
+    def started(self, stage: str) -> float:
+        counters = self._stages[stage]
+        counters["queued"] = max(0, counters["queued"] - 1)
+        counters["in_flight"] += 1
+        return time.monotonic()
+
+    def finished(self, stage: str, started_at: float, ok: bool = True) -> None:
+        counters = self._stages[stage]
+        counters["in_flight"] = max(0, counters["in_flight"] - 1)
+        counters["completed" if ok else "failed"] += 1
+        counters["busy_seconds"] += time.monotonic() - started_at
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        elapsed_minutes = max(time.monotonic() - self.started_at, 1e-6) / 60
+        result = {}
+        for name, counters in self._stages.items():
+            done = counters["completed"] + counters["failed"]
+            result[name] = {
+                "queued": counters["queued"],
+                "in_flight": counters["in_flight"],
+                "completed": counters["completed"],
+                "failed": counters["failed"],
+                "docs_per_minute": round(counters["completed"] / elapsed_minutes, 2),
+                "avg_seconds": round(counters["busy_seconds"] / done, 2)
+                if done
+                else 0.0,
+            }
+        return result
+
+
+def get_rate_limiter(name: str, rpm: float = 0, tpm: float = 0) -> RateLimiter:
+    """Process-wide limiter per provider key, so instances sharing a quota share buckets"""
+    limiter = _rate_limiters.get(name)
+    if limiter is None:
+        limiter = _rate_limiters[name] = RateLimiter(name, rpm, tpm)
+    elif (limiter.rpm, limiter.tpm) != (rpm or 0, tpm or 0):
+        logger.info(f"Rate limiter {name}: limits changed to rpm={rpm}, tpm={tpm}")
+        limiter.configure(rpm, tpm)
+    return limiter
+
+
 def priority_limit_async_func_call(
     max_size: int,
     llm_timeout: float = None,
@@ -473,6 +838,12 @@ def priority_limit_async_func_call(
     max_queue_size: int = 1000,
     cleanup_timeout: float = 2.0,
     queue_name: str = "limit_async",
+    adaptive: bool = False,
+    adaptive_min_size: int = 1,
+    adaptive_max_size: int | None = None,
+    rate_limiter: RateLimiter | None = None,
+    token_estimator: Callable[[tuple, dict], tuple[int, int]] | None = None,
+    result_token_counter: Callable[[Any], int | None] | None = None,
 ):
     """
     Enhanced priority-limited asynchronous function call decorator with robust timeout handling
@@ -482,18 +853,32 @@ def priority_limit_async_func_call(
     - Task state tracking to prevent race conditions
     - Enhanced health check system with stuck task detection
     - Proper resource cleanup and error recovery
+    - Optional adaptive (AIMD) concurrency limit, see AdaptiveConcurrencyLimiter
 
     Args:
-        max_size: Maximum number of concurrent calls
+        max_size: Maximum number of concurrent calls (starting limit in adaptive mode)
         max_queue_size: Maximum queue capacity to prevent memory overflow
         llm_timeout: LLM provider timeout (from global config), used to calculate other timeouts
         max_execution_timeout: Maximum time for worker to execute function (defaults to llm_timeout + 30s)
         max_task_duration: Maximum time before health check intervenes (defaults to llm_timeout + 60s)
         cleanup_timeout: Maximum time to wait for cleanup operations (defaults to 2.0s)
         queue_name: Optional queue name for logging identification (defaults to "limit_async")
+        adaptive: Let the concurrency limit float between adaptive_min_size and adaptive_max_size
+        adaptive_min_size: Lower bound of the adaptive limit (defaults to 1)
+        adaptive_max_size: Upper bound of the adaptive limit (defaults to max_size)
+        rate_limiter: Optional RPM/TPM budget; calls wait for it before execution and the
+            wait is reported as throttle time, separate from the call latency. A worker
+            waits while holding its concurrency slot, so under budget pressure slots sit
+            idle; throughput is bounded by the budget either way (reservations are served
+            in order), but a high-priority call dequeued later waits behind the
+            reservations of every waiting slot
+        token_estimator: Estimates (input_tokens, expected_output_tokens) of a call from
+            (args, kwargs); their sum is charged against the token budget
+        result_token_counter: Counts output tokens of a result (None if unknown) so the
+            expected output can be corrected after the call
 
     Returns:
-        Decorator function
+        Decorator function; the wrapped function exposes ``shutdown()`` and ``metrics()``
     """
 
     def final_decro(func):
@@ -527,11 +912,30 @@ def priority_limit_async_func_call(
         active_futures = weakref.WeakSet()
         reinit_count = 0
 
+        # Concurrency gate: workers are spawned up to the ceiling and the limiter
+        # decides how many of them may run at once
+        if adaptive:
+            pool_size = max(max_size, adaptive_max_size or max_size)
+            limiter = AdaptiveConcurrencyLimiter(
+                pool_size,
+                min_limit=adaptive_min_size,
+                initial_limit=max_size,
+                adaptive=True,
+            )
+        else:
+            pool_size = max_size
+            limiter = AdaptiveConcurrencyLimiter(max_size, adaptive=False)
+
         async def worker():
             """Enhanced worker that processes tasks with proper timeout and state management"""
             try:
                 while not shutdown_event.is_set():
+                    gate_held = False
                     try:
+                        if limiter.adaptive:
+                            await limiter.acquire()
+                            gate_held = True
+
                         # Get task from queue with timeout for shutdown checking
                         try:
                             (
@@ -544,6 +948,25 @@ def priority_limit_async_func_call(
                         except asyncio.TimeoutError:
                             continue
 
+                        # Wait for the provider rate budget before the call is
+                        # considered started (throttle time is not call latency).
+                        # The slot stays held: the reservation is already made in
+                        # order, so releasing it would not let another call start sooner
+                        input_tokens = expected_output_tokens = 0
+                        if rate_limiter is not None and rate_limiter.enabled:
+                            if token_estimator is not None:
+                                try:
+                                    input_tokens, expected_output_tokens = (
+                                        token_estimator(args, kwargs)
+                                    )
+                                except Exception as e:
+                                    logger.debug(
+                                        f"{queue_name}: Token estimation failed: {e}"
+                                    )
+                            await rate_limiter.acquire(
+                                input_tokens + expected_output_tokens
+                            )
+
                         # Get task state and mark worker as started
                         async with task_states_lock:
                             if task_id not in task_states:
@@ -566,6 +989,8 @@ def priority_limit_async_func_call(
                             queue.task_done()
                             continue
 
+                        outcome = None
+                        limiter.started()
                         try:
                             # Execute function with timeout protection
                             if max_execution_timeout is not None:
@@ -574,12 +999,24 @@ def priority_limit_async_func_call(
                                 )
                             else:
                                 result = await func(*args, **kwargs)
+                            outcome = "ok"
+
+                            if (
+                                expected_output_tokens
+                                and result_token_counter is not None
+                            ):
+                                output_tokens = result_token_counter(result)
+                                if output_tokens is not None:
+                                    rate_limiter.reconcile(
+                                        expected_output_tokens, output_tokens
+                                    )
 
                             # Set result if future is still valid
                             if not task_state.future.done():
                                 task_state.future.set_result(result)
 
                         except asyncio.TimeoutError:
+                            outcome = "overload"
                             # Worker-level timeout (max_execution_timeout exceeded)
                             logger.warning(
                                 f"{queue_name}: Worker timeout for task {task_id} after {max_execution_timeout}s"
@@ -599,12 +1036,18 @@ def priority_limit_async_func_call(
                             )
                         except Exception as e:
                             # Function execution error
+                            outcome = "overload" if _is_overload_error(e) else "error"
                             logger.error(
                                 f"{queue_name}: Error in decorated function for task {task_id}: {str(e)}"
                             )
                             if not task_state.future.done():
                                 task_state.future.set_exception(e)
                         finally:
+                            limiter.finished(
+                                asyncio.get_event_loop().time()
+                                - task_state.execution_start_time,
+                                outcome,
+                            )
                             # Clean up task state
                             async with task_states_lock:
                                 task_states.pop(task_id, None)
@@ -616,6 +1059,9 @@ def priority_limit_async_func_call(
                             f"{queue_name}: Critical error in worker: {str(e)}"
                         )
                         await asyncio.sleep(0.1)
+                    finally:
+                        if gate_held:
+                            limiter.release()
             finally:
                 logger.debug(f"{queue_name}: Worker exiting")
 
@@ -670,7 +1116,7 @@ def priority_limit_async_func_call(
                     tasks.difference_update(done_tasks)
 
                     active_tasks_count = len(tasks)
-                    workers_needed = max_size - active_tasks_count
+                    workers_needed = pool_size - active_tasks_count
 
                     if workers_needed > 0:
                         logger.info(
@@ -720,7 +1166,7 @@ def priority_limit_async_func_call(
                     )
 
                 # Create worker tasks
-                workers_needed = max_size - active_tasks_count
+                workers_needed = pool_size - active_tasks_count
                 for _ in range(workers_needed):
                     task = asyncio.create_task(worker())
                     tasks.add(task)
@@ -902,14 +1348,352 @@ def priority_limit_async_func_call(
                 async with task_states_lock:
                     task_states.pop(task_id, None)
 
-        # Add shutdown method to decorated function
+        def metrics():
+            """Current limit, queue depth, in-flight count and latency percentiles"""
+            return {
+                "queue_name": queue_name,
+                "queue_depth": queue.qsize(),
+                "pending": len(task_states),
+                **limiter.snapshot(),
+                "rate_limit": (
+                    rate_limiter.snapshot()
+                    if rate_limiter is not None and rate_limiter.enabled
+                    else None
+                ),
+            }
+
+        # Add shutdown and metrics methods to decorated function
         wait_func.shutdown = shutdown
+        wait_func.metrics = metrics
 
         return wait_func
 
     return final_decro
 
 
+class EmbeddingBatcher:
+    """Coalesce concurrent embedding calls into batched requests.
+
+    Calls arriving within ``max_wait`` seconds of each other are merged (with
+    identical texts embedded once) into requests of at most ``max_batch_size``
+    texts and, when ``max_tokens`` is set, at most that many tokens as measured
+    by ``token_counter``; each caller receives only its own rows.
+
+    Calls are only merged with calls carrying the same keyword arguments, so a
+    ``_priority`` passed by the caller is forwarded unchanged to the priority
+    queue behind ``func``. Calls whose ``_priority`` is below ``urgent_below``
+    (query embeddings) are flushed on the next loop iteration instead of
+    waiting for the batching window.
+
+    With ``memoize=True`` vectors are kept for the lifetime of the batcher, so
+    texts embedded up front (e.g. all queries of a batch) are served without
+    another request; see ``embedding_batch_scope``.
+    """
+
+    def __init__(
+        self,
+        func,
+        max_batch_size: int = 32,
+        max_wait: float = 0.01,
+        max_tokens: int = 0,
+        token_counter: Callable[[str], int] | None = None,
+        urgent_below: int = 10,
+        memoize: bool = False,
+    ):
+        self.func = func
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.max_tokens = max_tokens if token_counter is not None else 0
+        self.token_counter = token_counter
+        self.urgent_below = urgent_below
+        self.memoize = memoize
+        # call key -> [pending calls, pending text count, pending tokens, flush handle]
+        self._buckets: dict[str, list] = {}
+        self._memo: dict[str, Any] = {}
+        # The event loop only holds weak references to tasks; keep running batches alive
+        self._tasks: set[asyncio.Task] = set()
+        self.calls = 0
+        self.texts_requested = 0
+        self.texts_embedded = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "calls": self.calls,
+            "texts_requested": self.texts_requested,
+            "texts_embedded": self.texts_embedded,
+        }
+
+    async def __call__(self, texts: list[str], **kwargs) -> np.ndarray:
+        texts = list(texts)
+        if not texts:
+            return await self.func(texts, **kwargs)
+        self.texts_requested += len(texts)
+        if self.memoize and all(t in self._memo for t in texts):
+            return np.array([self._memo[t] for t in texts])
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = repr(sorted(kwargs.items()))
+        bucket = self._buckets.setdefault(key, [[], 0, 0, None])
+        bucket[0].append((texts, future))
+        bucket[1] += len(texts)
+        if self.max_tokens:
+            bucket[2] += sum(self.token_counter(t) for t in texts)
+
+        if bucket[1] >= self.max_batch_size or (
+            self.max_tokens and bucket[2] >= self.max_tokens
+        ):
+            self._flush(key, kwargs)
+        elif bucket[3] is None:
+            if kwargs.get("_priority", self.urgent_below) < self.urgent_below:
+                bucket[3] = loop.call_soon(self._flush, key, kwargs)
+            else:
+                bucket[3] = loop.call_later(self.max_wait, self._flush, key, kwargs)
+        return await future
+
+    def _flush(self, key: str, kwargs: dict) -> None:
+        bucket = self._buckets.pop(key, None)
+        if bucket is None:
+            return
+        if bucket[3] is not None:
+            bucket[3].cancel()
+        task = asyncio.create_task(self._run(bucket[0], kwargs))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _split(self, texts: list[str]) -> list[list[str]]:
+        batches: list[list[str]] = []
+        current: list[str] = []
+        current_tokens = 0
+        for text in texts:
+            tokens = self.token_counter(text) if self.max_tokens else 0
+            if current and (
+                len(current) >= self.max_batch_size
+                or (self.max_tokens and current_tokens + tokens > self.max_tokens)
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _run(
+        self, pending: list[tuple[list[str], asyncio.Future]], kwargs: dict
+    ) -> None:
+        # This task must not route back into the scope batcher that spawned it
+        _embedding_batcher_var.set(None)
+        unique_texts = list(
+            dict.fromkeys(
+                t for texts, _ in pending for t in texts if t not in self._memo
+            )
+        )
+        rows = self._memo if self.memoize else {}
+        try:
+            for batch in self._split(unique_texts):
+                self.calls += 1
+                self.texts_embedded += len(batch)
+                result = await self.func(batch, **kwargs)
+                rows.update(zip(batch, result))
+            for texts, future in pending:
+                if not future.done():
+                    future.set_result(np.array([rows[t] for t in texts]))
+        except BaseException as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+
+
+_embedding_batcher_var: ContextVar[EmbeddingBatcher | None] = ContextVar(
+    "lightrag_embedding_batcher", default=None
+)
+
+
+@contextmanager
+def embedding_batch_scope(batcher: EmbeddingBatcher):
+    """Route embedding calls made in this context (and tasks it spawns) through ``batcher``."""
+    token = _embedding_batcher_var.set(batcher)
+    try:
+        yield batcher
+    finally:
+        _embedding_batcher_var.reset(token)
+
+
+def batch_scope_aware(func, default_batcher: EmbeddingBatcher | None = None):
+    """Route calls to ``func`` through an embedding batcher.
+
+    Inside an active ``embedding_batch_scope`` its batcher is used; otherwise
+    ``default_batcher`` (the always-on micro-batcher, if any). Without either,
+    the call passes straight through to ``func``.
+    """
+
+    @wraps(func)
+    async def wrapper(texts, *args, **kwargs):
+        batcher = _embedding_batcher_var.get() or default_batcher
+        if batcher is None or args:
+            return await func(texts, *args, **kwargs)
+        return await batcher(texts, **kwargs)
+
+    return wrapper
+
+
+class EmbeddingCache:
+    """Content-addressed embedding cache backed by a KV storage.
+
+    Vectors are keyed by (model, dim, sha256(text)) and stored as base64
+    float32, so any KV backend can hold them. ``wrap`` returns a function that
+    serves cached rows, embeds only the missing (deduplicated) texts and stores
+    them. The cache keeps at most ``max_entries`` vectors, evicting the least
+    recently used; the key order is persisted as one extra record so eviction
+    survives restarts. Storage errors never fail an embedding call.
+    """
+
+    INDEX_KEY = "__index__"
+
+    def __init__(self, model: str, dim: int, max_entries: int = 50000):
+        self.model = model
+        self.dim = dim
+        self.max_entries = max(0, max_entries)
+        self.storage = None  # BaseKVStorage, attached once storages are created
+        self._order: OrderedDict[str, None] = OrderedDict()
+        self._index_dirty = False
+        self._counters = {
+            "texts": 0,
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def key(self, text: str) -> str:
+        digest = sha256(text.encode("utf-8", errors="replace")).hexdigest()
+        return f"{self.model}:{self.dim}:{digest}"
+
+    def _touch(self, key: str) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+        self._index_dirty = True
+
+    def _decode(self, entry: dict | None) -> np.ndarray | None:
+        if not entry or entry.get("dim") != self.dim:
+            return None
+        try:
+            vector = np.frombuffer(base64.b64decode(entry["embedding"]), np.float32)
+        except Exception:
+            return None
+        return vector if vector.shape[0] == self.dim else None
+
+    async def load_index(self) -> None:
+        if self.storage is None:
+            return
+        try:
+            entry = await self.storage.get_by_id(self.INDEX_KEY)
+            if entry and entry.get("embedding"):
+                for key in json.loads(entry["embedding"]):
+                    self._order.setdefault(key, None)
+            # max_entries may have been lowered since the index was written
+            await self._evict()
+        except Exception as e:
+            self._counters["errors"] += 1
+            logger.warning(f"Embedding cache: failed to load index: {e}")
+
+    async def save_index(self) -> None:
+        if self.storage is None or not self._index_dirty:
+            return
+        try:
+            # The index record reuses the entry layout so every KV backend accepts it
+            await self.storage.upsert(
+                {
+                    self.INDEX_KEY: {
+                        "model": self.INDEX_KEY,
+                        "dim": 0,
+                        "embedding": json.dumps(list(self._order)),
+                    }
+                }
+            )
+            self._index_dirty = False
+        except Exception as e:
+            self._counters["errors"] += 1
+            logger.warning(f"Embedding cache: failed to save index: {e}")
+
+    async def _evict(self) -> None:
+        if not self.max_entries or len(self._order) <= self.max_entries:
+            return
+        evicted = []
+        while len(self._order) > self.max_entries:
+            evicted.append(self._order.popitem(last=False)[0])
+        self._counters["evictions"] += len(evicted)
+        self._index_dirty = True
+        await self.storage.delete(evicted)
+
+    def wrap(self, func):
+        @wraps(func)
+        async def wrapper(texts, *args, **kwargs):
+            if self.storage is None or args or not texts:
+                return await func(texts, *args, **kwargs)
+            texts = [texts] if isinstance(texts, str) else list(texts)
+            keys = [self.key(text) for text in texts]
+            self._counters["texts"] += len(texts)
+
+            vectors: dict[str, np.ndarray] = {}
+            unique_keys = list(dict.fromkeys(keys))
+            try:
+                entries = await self.storage.get_by_ids(unique_keys)
+                for key, entry in zip(unique_keys, entries):
+                    vector = self._decode(entry)
+                    if vector is not None:
+                        vectors[key] = vector
+                        self._touch(key)
+            except Exception as e:
+                self._counters["errors"] += 1
+                logger.warning(f"Embedding cache lookup failed: {e}")
+
+            missing = {
+                key: text for key, text in zip(keys, texts) if key not in vectors
+            }
+            miss_count = sum(1 for key in keys if key in missing)
+            self._counters["hits"] += len(texts) - miss_count
+            self._counters["misses"] += miss_count
+            if missing:
+                embeddings = await func(list(missing.values()), **kwargs)
+                new_entries = {}
+                for key, vector in zip(missing, embeddings):
+                    vector = np.asarray(vector, dtype=np.float32)
+                    vectors[key] = vector
+                    new_entries[key] = {
+                        "model": self.model,
+                        "dim": self.dim,
+                        "embedding": base64.b64encode(vector.tobytes()).decode(),
+                    }
+                    self._touch(key)
+                try:
+                    await self.storage.upsert(new_entries)
+                    self._counters["stores"] += len(new_entries)
+                    await self._evict()
+                except Exception as e:
+                    self._counters["errors"] += 1
+                    logger.warning(f"Embedding cache store failed: {e}")
+
+            return np.array([vectors[key] for key in keys])
+
+        return wrapper
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "model": self.model,
+            "dim": self.dim,
+            "size": len(self._order),
+            "max_entries": self.max_entries,
+            **self._counters,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
 def wrap_embedding_func_with_attrs(**kwargs):
     """Wrap a function with attributes"""
 
@@ -1156,6 +1940,41 @@ async def save_to_cache(hashing_kv, cache_data: CacheData):
     await hashing_kv.upsert({flattened_key: cache_entry})
 
 
+async def cache_stream_response(
+    response: AsyncIterator[str], hashing_kv, cache_data: CacheData
+) -> AsyncIterator[str]:
+    """Tee a streaming LLM response into the cache.
+
+    Chunks are passed through as they arrive while the full text is accumulated;
+    it is saved with ``save_to_cache`` only after the stream completed. Streams
+    that fail or are abandoned by the consumer are not cached.
+    """
+    parts = []
+    cacheable = True
+    async for chunk in response:
+        if isinstance(chunk, str):
+            parts.append(chunk)
+        else:
+            cacheable = False
+        yield chunk
+
+    if cacheable and parts:
+        cache_data.content = "".join(parts)
+        try:
+            await save_to_cache(hashing_kv, cache_data)
+        except Exception as e:
+            logger.warning(f"Failed to cache streamed response: {e}")
+
+
+async def replay_cached_stream(content: str, chunk_size: int) -> AsyncIterator[str]:
+    """Replay a cached response as a stream of ``chunk_size`` characters (0: one chunk)"""
+    if chunk_size <= 0:
+        yield content
+        return
+    for start in range(0, len(content), chunk_size):
+        yield content[start : start + chunk_size]
+
+
 def safe_unicode_decode(content):
     # Regular expression to find all Unicode escape sequences of the form \uXXXX
     unicode_escape_pattern = re.compile(r"\\u([0-9a-fA-F]{4})")
@@ -2267,6 +3086,7 @@ class TokenTracker:
         self.prompt_tokens = 0
         self.completion_tokens = 0
         self.total_tokens = 0
+        self.cached_tokens = 0
         self.call_count = 0
 
     def add_usage(self, token_counts):
@@ -2274,9 +3094,11 @@ class TokenTracker:
 
         Args:
             token_counts: A dictionary containing prompt_tokens, completion_tokens, total_tokens
+                and optionally cached_tokens (prompt tokens served from the provider's prefix cache)
         """
         self.prompt_tokens += token_counts.get("prompt_tokens", 0)
         self.completion_tokens += token_counts.get("completion_tokens", 0)
+        self.cached_tokens += token_counts.get("cached_tokens", 0) or 0
 
         # If total_tokens is provided, use it directly; otherwise calculate the sum
         if "total_tokens" in token_counts:
@@ -2294,6 +3116,7 @@ class TokenTracker:
             "prompt_tokens": self.prompt_tokens,
             "completion_tokens": self.completion_tokens,
             "total_tokens": self.total_tokens,
+            "cached_tokens": self.cached_tokens,
             "call_count": self.call_count,
         }
 
@@ -2303,7 +3126,8 @@ class TokenTracker:
             f"LLM call count: {usage['call_count']}, "
             f"Prompt tokens: {usage['prompt_tokens']}, "
             f"Completion tokens: {usage['completion_tokens']}, "
-            f"Total tokens: {usage['total_tokens']}"
+            f"Total tokens: {usage['total_tokens']}, "
+            f"Cached prompt tokens: {usage['cached_tokens']}"
         )
 
 
@@ -2643,6 +3467,16 @@ def make_relation_chunk_key(src: str, tgt: str) -> str:
     return GRAPH_FIELD_SEP.join(sorted((src, tgt)))
 
 
+def make_extraction_checkpoint_key(doc_id: str | None, chunk_id: str) -> str:
+    """Create the storage key of a chunk's extraction checkpoint.
+
+    Chunk ids are content hashes shared by every document containing the same
+    chunk, so checkpoints are kept per document.
+    """
+
+    return f"{doc_id}{GRAPH_FIELD_SEP}{chunk_id}" if doc_id else chunk_id
+
+
 def parse_relation_chunk_key(key: str) -> tuple[str, str]:
     """Parse a relation chunk storage key back into its entity pair."""
 
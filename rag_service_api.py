@@ -1,13 +1,18 @@
 import os
 import json
+import time
+import hashlib
 import asyncio
-from typing import List, Optional, Dict, Any
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Awaitable, Callable, Iterator
 import numpy as np
 from datetime import datetime
+
 try:
     # Lightweight .env loader so you can configure the service via a local .env file
     # OS env vars always take precedence over .env entries when override=False
     from dotenv import load_dotenv
+
     load_dotenv(dotenv_path=os.environ.get("DOTENV_PATH", ".env"), override=False)
 except Exception:
     # If python-dotenv is not installed, simply skip; service will still read OS env vars
@@ -16,6 +21,7 @@ except Exception:
 from fastapi import FastAPI, UploadFile, File, HTTPException, Form
 from fastapi import Body, Query
 from fastapi import Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # Optional installer for runtime dependencies
@@ -29,6 +35,7 @@ WATCHDOG_AVAILABLE = False
 try:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler
+
     WATCHDOG_AVAILABLE = True
 except Exception:
     try:
@@ -36,6 +43,7 @@ except Exception:
             pm.install("watchdog")
             from watchdog.observers import Observer
             from watchdog.events import FileSystemEventHandler
+
             WATCHDOG_AVAILABLE = True
     except Exception:
         WATCHDOG_AVAILABLE = False
@@ -44,12 +52,14 @@ except Exception:
 HTTPX_AVAILABLE = False
 try:
     import httpx
+
     HTTPX_AVAILABLE = True
 except Exception:
     try:
         if pm is not None:
             pm.install("httpx")
             import httpx
+
             HTTPX_AVAILABLE = True
     except Exception:
         HTTPX_AVAILABLE = False
@@ -58,21 +68,27 @@ except Exception:
 QDRANT_CLIENT_AVAILABLE = False
 try:
     from qdrant_client import QdrantClient, models  # type: ignore
+
     QDRANT_CLIENT_AVAILABLE = True
 except Exception:
     try:
         if pm is not None:
             pm.install("qdrant-client")
             from qdrant_client import QdrantClient, models  # type: ignore
+
             QDRANT_CLIENT_AVAILABLE = True
     except Exception:
         QDRANT_CLIENT_AVAILABLE = False
 
 from lightrag import LightRAG
-from lightrag.base import QueryParam
-from lightrag.utils import EmbeddingFunc
+from lightrag.base import DocStatus, QueryParam
+from lightrag.utils import (
+    EmbeddingFunc,
+    generate_track_id,
+    generate_reference_list_from_chunks,
+)
 from lightrag.llm.openai import openai_complete_if_cache, openai_embed
-from lightrag.kg.shared_storage import initialize_pipeline_status
+from lightrag.kg.shared_storage import initialize_pipeline_status, get_namespace_data
 from ragAnything import RAGAnything
 
 
@@ -94,7 +110,9 @@ CHAT_BASE_URL = (
 EMBED_API_KEY = os.environ.get("EMBED_API_KEY") or CHAT_API_KEY
 EMBED_BASE_URL = os.environ.get("EMBED_BASE_URL") or CHAT_BASE_URL
 
-WORKING_DIR = os.environ.get("LIGHTRAG_WORKING_DIR", "d:/yuki/LightRAG/existing_lightrag_storage")
+WORKING_DIR = os.environ.get(
+    "LIGHTRAG_WORKING_DIR", "d:/yuki/LightRAG/existing_lightrag_storage"
+)
 WORKSPACE = os.environ.get("WORKSPACE", "hire")
 VERSION = os.environ.get("SERVICE_VERSION", "1.0.3")
 
@@ -102,15 +120,65 @@ VERSION = os.environ.get("SERVICE_VERSION", "1.0.3")
 QDRANT_URL = os.environ.get("QDRANT_URL")
 QDRANT_API_KEY = os.environ.get("QDRANT_API_KEY")
 COSINE_THRESHOLD = float(os.environ.get("COSINE_THRESHOLD", "0.2"))
-DEFAULT_IMPORT_DIR = os.environ.get("DEFAULT_IMPORT_DIR", "d:/yuki/LightRAG/hire_document")
+DEFAULT_IMPORT_DIR = os.environ.get(
+    "DEFAULT_IMPORT_DIR", "d:/yuki/LightRAG/hire_document"
+)
 # 上传保存目录，默认指向 hire_document，可用环境变量覆盖
-UPLOAD_TARGET_DIR = os.path.normpath(os.environ.get("UPLOAD_TARGET_DIR", "d:/yuki/LightRAG/hire_document"))
+UPLOAD_TARGET_DIR = os.path.normpath(
+    os.environ.get("UPLOAD_TARGET_DIR", "d:/yuki/LightRAG/hire_document")
+)
 
 # 目录监听配置（可选）
 FILE_WATCH_ENABLED = os.environ.get("FILE_WATCH_ENABLED", "true").lower() == "true"
-FILE_WATCH_EXTS = set([s.strip().lower() for s in os.environ.get("FILE_WATCH_EXTS", ".pdf,.md,.docx").split(",") if s.strip()])
+FILE_WATCH_EXTS = set(
+    [
+        s.strip().lower()
+        for s in os.environ.get("FILE_WATCH_EXTS", ".pdf,.md,.docx").split(",")
+        if s.strip()
+    ]
+)
 FILE_WATCH_RECURSIVE = os.environ.get("FILE_WATCH_RECURSIVE", "true").lower() == "true"
 FILE_WATCH_DEBOUNCE_MS = int(os.environ.get("FILE_WATCH_DEBOUNCE_MS", "1000"))
+# 单批最多文件数、待入库批次队列上限（队列满时监听暂停出队，形成背压）
+FILE_WATCH_BATCH_MAX = max(1, int(os.environ.get("FILE_WATCH_BATCH_MAX", "50")))
+FILE_WATCH_QUEUE_SIZE = max(1, int(os.environ.get("FILE_WATCH_QUEUE_SIZE", "8")))
+
+# 上传：单文件大小上限（字节，0 表示不限制）与分块写盘大小
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_BYTES", str(200 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = max(
+    64 * 1024, int(os.environ.get("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+)
+
+# 并发入库：同时解析/入库的文件数上限（需结合 LLM/嵌入服务的限流调节）
+INGEST_CONCURRENCY = max(1, int(os.environ.get("INGEST_CONCURRENCY", "4")))
+
+# 回调投递：共享连接池 + 有界队列 + 指数退避重试
+CALLBACK_TIMEOUT = float(os.environ.get("CALLBACK_TIMEOUT", "15"))
+CALLBACK_WORKERS = max(1, int(os.environ.get("CALLBACK_WORKERS", "8")))
+CALLBACK_QUEUE_SIZE = max(1, int(os.environ.get("CALLBACK_QUEUE_SIZE", "1000")))
+CALLBACK_ENQUEUE_TIMEOUT = float(os.environ.get("CALLBACK_ENQUEUE_TIMEOUT", "5"))
+CALLBACK_MAX_RETRIES = max(0, int(os.environ.get("CALLBACK_MAX_RETRIES", "5")))
+CALLBACK_RETRY_BASE = float(os.environ.get("CALLBACK_RETRY_BASE", "0.5"))
+CALLBACK_RETRY_MAX = float(os.environ.get("CALLBACK_RETRY_MAX", "30"))
+CALLBACK_PER_HOST_CONCURRENCY = max(
+    1, int(os.environ.get("CALLBACK_PER_HOST_CONCURRENCY", "4"))
+)
+CALLBACK_DRAIN_TIMEOUT = float(os.environ.get("CALLBACK_DRAIN_TIMEOUT", "10"))
+
+# 批量查询：/query_batch 单次请求的问题数上限与默认并发
+QUERY_BATCH_MAX_QUESTIONS = max(
+    1, int(os.environ.get("QUERY_BATCH_MAX_QUESTIONS", "500"))
+)
+QUERY_BATCH_CONCURRENCY = max(1, int(os.environ.get("QUERY_BATCH_CONCURRENCY", "8")))
+
+# 答案缓存：/query 结果按（规范化问题 + 模式 + 参数 + 数据版本）缓存；任一入库完成即失效
+ANSWER_CACHE_ENABLED = os.environ.get("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "600"))
+ANSWER_CACHE_MAX_ENTRIES = max(
+    1, int(os.environ.get("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+)
+# 可选：配置后使用 Redis 共享缓存（多实例部署），例如 redis://localhost:6379/0
+ANSWER_CACHE_REDIS_URL = os.environ.get("ANSWER_CACHE_REDIS_URL")
 
 # User-specified models
 CHAT_MODEL = os.environ.get("CHAT_MODEL", "qwen3-vl-plus")
@@ -118,6 +186,12 @@ EMBED_MODEL = os.environ.get("EMBED_MODEL", "text-embedding-3-large")
 EMBED_DIM = int(os.environ.get("EMBED_DIM", "3072"))
 # 可选：自动探测嵌入维度（默认关闭以尊重显式配置）
 EMBED_DIM_AUTODETECT = os.environ.get("EMBED_DIM_AUTODETECT", "false").lower() == "true"
+# 维度不一致时是否截断/补零（启动时读取一次）
+EMBED_DIM_COERCE = os.environ.get("EMBED_DIM_COERCE", "false").lower() == "true"
+# 探测结果持久化到工作目录，重启/多 worker 启动时复用，模型名或嵌入服务地址变化才重新探测
+EMBED_FINGERPRINT_FILE = os.path.join(
+    WORKING_DIR, WORKSPACE or "", "embedding_fingerprint.json"
+)
 
 if not CHAT_API_KEY:
     raise RuntimeError(
@@ -141,7 +215,6 @@ lightrag_instance: Optional[LightRAG] = None
 
 # Watcher runtime state
 observer_instance: Optional[Observer] = None
-_watcher_seen: set[str] = set()
 _app_loop: Optional[asyncio.AbstractEventLoop] = None
 
 
@@ -170,28 +243,52 @@ class QueryRequest(BaseModel):
     mode: Optional[str] = "hybrid"  # local|global|hybrid|naive|mix|bypass
 
 
+class QueryBatchRequest(BaseModel):
+    questions: List[str]
+    mode: Optional[str] = "hybrid"
+    # 同时执行的问题数上限，缺省使用 QUERY_BATCH_CONCURRENCY
+    max_concurrency: Optional[int] = None
+
+
 class SearchRequest(BaseModel):
-    query: str
+    query: Optional[str] = None
+    # 批量检索：一次请求多条查询，共用一次嵌入调用
+    queries: Optional[List[str]] = None
     top_k: Optional[int] = 20
 
 
 class ResetQdrantRequest(BaseModel):
     # Safety switch: must set confirm=true to proceed
     confirm: bool = False
-    # If true, recreate collections immediately with current EMBED_DIM
+    # If true, recreate collections immediately with the active embedding dimension
     recreate: bool = False
     # Optional: specify target collections; defaults to all LightRAG collections
     collections: Optional[List[str]] = None
 
 
+class EmbedDimState:
+    """Embedding dimension in effect for this process.
+
+    Starts as the configured EMBED_DIM; build_instances replaces it with the
+    dimension settled by _resolve_embed_dim before LightRAG is created.
+    """
+
+    def __init__(self, dim: int) -> None:
+        self.dim = dim
+
+
+_embed_dim_state = EmbedDimState(EMBED_DIM)
+
+
 # -----------------------------
 # Helper to build instances
 # -----------------------------
 async def _embed_and_check(texts: List[str]) -> np.ndarray:
-    """Call the embedding provider and ensure returned vector dims match EMBED_DIM.
+    """Call the embedding provider and ensure returned vector dims match the active dimension.
 
-    If the provider dimension differs from EMBED_DIM, optionally coerce by
-    trimming or zero-padding when EMBED_DIM_COERCE=true in environment.
+    If the provider dimension differs from the dimension resolved at startup
+    (EMBED_DIM unless autodetected), optionally coerce by trimming or
+    zero-padding when EMBED_DIM_COERCE=true.
     """
     # The underlying OpenAI-compatible embed function is async; await its result
     vectors = await openai_embed(
@@ -201,74 +298,164 @@ async def _embed_and_check(texts: List[str]) -> np.ndarray:
         base_url=EMBED_BASE_URL,
     )
 
-    # Whether to coerce dimension mismatches instead of failing
-    EMBED_DIM_COERCE = os.environ.get("EMBED_DIM_COERCE", "false").lower() == "true"
-
-    # Preferred path: numpy ndarray with shape (n, dim)
-    if hasattr(vectors, "shape") and len(vectors.shape) == 2:
-        dim = int(vectors.shape[1])
-        if dim != EMBED_DIM:
-            if EMBED_DIM_COERCE:
-                # Coerce by trimming or zero-padding
-                if dim > EMBED_DIM:
-                    vectors = vectors[:, :EMBED_DIM]
-                else:
-                    pad_width = ((0, 0), (0, EMBED_DIM - dim))
-                    vectors = np.pad(vectors, pad_width, mode="constant")
-            else:
-                raise RuntimeError(
-                    f"Embedding dimension mismatch: configured EMBED_DIM={EMBED_DIM}, got {dim} from model '{EMBED_MODEL}'. "
-                    "Set EMBED_DIM to match the model, recreate Qdrant collections, or enable EMBED_DIM_COERCE=true to auto-adjust."
-                )
-        return vectors
+    # Preferred path is a numpy ndarray with shape (n, dim); otherwise convert
+    if not (hasattr(vectors, "shape") and len(vectors.shape) == 2):
+        try:
+            vectors = np.array(list(vectors), dtype=float)
+        except TypeError:
+            raise RuntimeError(
+                "Embedding output is not iterable; check embedding provider configuration."
+            )
+        if len(vectors.shape) != 2:
+            raise RuntimeError("Embedding output shape invalid; expected 2D array.")
+
+    dim = int(vectors.shape[1])
+    target = _embed_dim_state.dim
+    if dim != target:
+        if not EMBED_DIM_COERCE:
+            raise RuntimeError(
+                f"Embedding dimension mismatch: expected {target} (EMBED_DIM={EMBED_DIM}), got {dim} from model '{EMBED_MODEL}'. "
+                "Set EMBED_DIM to match the model, recreate Qdrant collections, or enable EMBED_DIM_COERCE=true to auto-adjust."
+            )
+        # Coerce by trimming or zero-padding
+        if dim > target:
+            vectors = vectors[:, :target]
+        else:
+            vectors = np.pad(vectors, ((0, 0), (0, target - dim)), mode="constant")
+    return vectors
+
+
+# LightRAG's Qdrant collections (see QdrantVectorDBStorage naming)
+LIGHTRAG_QDRANT_COLLECTIONS = [
+    "lightrag_vdb_chunks",
+    "lightrag_vdb_entities",
+    "lightrag_vdb_relationships",
+]
+
 
-    # Fallback: iterable of vectors → convert to ndarray and validate/adjust
+def _embed_fingerprint_key() -> Dict[str, str]:
+    """Identify the embedding endpoint: the same model name may differ per provider."""
+    return {"model": EMBED_MODEL, "base_url": (EMBED_BASE_URL or "").rstrip("/")}
+
+
+def _load_embed_fingerprint() -> Optional[Dict[str, Any]]:
     try:
-        vectors = np.array(list(vectors), dtype=float)
-        if len(vectors.shape) == 2:
-            dim = int(vectors.shape[1])
-            if dim != EMBED_DIM:
-                if EMBED_DIM_COERCE:
-                    if dim > EMBED_DIM:
-                        vectors = vectors[:, :EMBED_DIM]
-                    else:
-                        pad_width = ((0, 0), (0, EMBED_DIM - dim))
-                        vectors = np.pad(vectors, pad_width, mode="constant")
-                else:
-                    raise RuntimeError(
-                        f"Embedding dimension mismatch: configured EMBED_DIM={EMBED_DIM}, got {dim} from model '{EMBED_MODEL}'. "
-                        "Set EMBED_DIM to match the model, recreate Qdrant collections, or enable EMBED_DIM_COERCE=true to auto-adjust."
-                    )
-            return vectors
+        with open(EMBED_FINGERPRINT_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict) and int(data.get("dim", 0)) > 0:
+            return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"[EmbedDim] 指纹文件读取失败，将重新探测：{e}")
+    return None
+
+
+def _save_embed_fingerprint(dim: int) -> None:
+    data = {
+        **_embed_fingerprint_key(),
+        "dim": dim,
+        "detected_at": datetime.now().isoformat(),
+    }
+    try:
+        os.makedirs(os.path.dirname(EMBED_FINGERPRINT_FILE), exist_ok=True)
+        # Atomic replace: concurrent worker boots never see a half-written file
+        tmp = f"{EMBED_FINGERPRINT_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, EMBED_FINGERPRINT_FILE)
+    except Exception as e:
+        print(f"[EmbedDim] 指纹文件写入失败：{e}")
+
+
+async def _probe_embed_dim() -> Optional[int]:
+    try:
+        test_vecs = await openai_embed(
+            ["维度探测"],
+            model=EMBED_MODEL,
+            api_key=EMBED_API_KEY,
+            base_url=EMBED_BASE_URL,
+        )
+        if hasattr(test_vecs, "shape") and len(test_vecs.shape) == 2:
+            return int(test_vecs.shape[1])
+        print("[EmbedDim] 自动探测失败：返回形状异常，保留原配置")
+    except Exception as e:
+        print(f"[EmbedDim] 自动探测异常：{e}，保留原配置 {EMBED_DIM}")
+    return None
+
+
+def _qdrant_collection_dims() -> Dict[str, int]:
+    """Vector sizes of existing LightRAG collections (metadata only, no embedding call)."""
+    dims: Dict[str, int] = {}
+    if not QDRANT_CLIENT_AVAILABLE or not QDRANT_URL:
+        return dims
+    try:
+        client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
+        for name in LIGHTRAG_QDRANT_COLLECTIONS:
+            try:
+                if not client.collection_exists(name):
+                    continue
+                vectors = client.get_collection(name).config.params.vectors
+                size = getattr(vectors, "size", None)
+                if size is not None:
+                    dims[name] = int(size)
+            except Exception:
+                continue
+    except Exception as e:
+        print(f"[EmbedDim] 读取 Qdrant 集合维度失败：{e}")
+    return dims
+
+
+async def _resolve_embed_dim() -> int:
+    """Settle the embedding dimension at startup and return it.
+
+    With EMBED_DIM_AUTODETECT, the persisted fingerprint is reused as long as
+    EMBED_MODEL and EMBED_BASE_URL are unchanged and the existing Qdrant
+    collections agree with it; otherwise the model is probed once and the
+    fingerprint rewritten. In all modes the resolved dimension is checked
+    against the collections.
+    """
+    resolved = EMBED_DIM
+    probed = False
+    if EMBED_DIM_AUTODETECT:
+        fingerprint = _load_embed_fingerprint()
+        key = _embed_fingerprint_key()
+        if fingerprint and all(fingerprint.get(k) == v for k, v in key.items()):
+            resolved = int(fingerprint["dim"])
         else:
-            raise RuntimeError("Embedding output shape invalid; expected 2D array.")
-    except TypeError:
-        raise RuntimeError("Embedding output is not iterable; check embedding provider configuration.")
+            detected = await _probe_embed_dim()
+            probed = detected is not None
+            if detected is not None:
+                resolved = detected
+                _save_embed_fingerprint(detected)
+
+    collection_dims = await asyncio.to_thread(_qdrant_collection_dims)
+    mismatched = {n: d for n, d in collection_dims.items() if d != resolved}
+    if mismatched and EMBED_DIM_AUTODETECT and not probed:
+        # Collections disagree with the cached fingerprint: verify against
+        # the provider once
+        detected = await _probe_embed_dim()
+        if detected is not None:
+            resolved = detected
+            _save_embed_fingerprint(detected)
+            mismatched = {n: d for n, d in collection_dims.items() if d != resolved}
+
+    if resolved != EMBED_DIM:
+        print(f"[EmbedDim] 使用探测维度 {resolved}，覆盖原配置 {EMBED_DIM}")
+    if mismatched:
+        print(
+            f"[EmbedDim] 警告：Qdrant 集合维度与嵌入维度 {resolved} 不一致：{mismatched}。"
+            "请确认 EMBED_MODEL/EMBED_DIM，或通过 /admin/reset_qdrant 重建集合后重新入库。"
+        )
+    return resolved
+
 
 async def build_instances():
     global rag_anything, lightrag_instance
 
-    # 如启用自动探测，则通过一次嵌入调用获取实际维度以避免 500 错误
-    if EMBED_DIM_AUTODETECT:
-        try:
-            test_vecs = await openai_embed(
-                ["维度探测"],
-                model=EMBED_MODEL,
-                api_key=EMBED_API_KEY,
-                base_url=EMBED_BASE_URL,
-            )
-            if hasattr(test_vecs, "shape") and len(test_vecs.shape) == 2:
-                detected_dim = int(test_vecs.shape[1])
-                if detected_dim != EMBED_DIM:
-                    print(
-                        f"[EmbedDim] 自动探测到 {detected_dim}，覆盖原配置 {EMBED_DIM}"
-                    )
-                    # 更新模块内 EMBED_DIM，使后续 _embed_and_check 与存储一致
-                    globals()["EMBED_DIM"] = detected_dim
-            else:
-                print("[EmbedDim] 自动探测失败：返回形状异常，保留原配置")
-        except Exception as e:
-            print(f"[EmbedDim] 自动探测异常：{e}，保留原配置 {EMBED_DIM}")
+    # 确定嵌入维度：优先复用持久化指纹，避免每次启动都调用嵌入接口；
+    # 结果写入 _embed_dim_state，供 _embed_and_check 与 /admin/reset_qdrant 使用
+    _embed_dim_state.dim = await _resolve_embed_dim()
 
     lightrag_instance = LightRAG(
         working_dir=WORKING_DIR,
@@ -278,7 +465,12 @@ async def build_instances():
         vector_db_storage_cls_kwargs={
             "cosine_better_than_threshold": COSINE_THRESHOLD,
         },
-        llm_model_func=lambda prompt, system_prompt=None, history_messages=[], **kwargs: openai_complete_if_cache(
+        # 模型名同时作为 LLM 限流（LLM_RPM_LIMIT/LLM_TPM_LIMIT）的提供方键
+        llm_model_name=CHAT_MODEL,
+        llm_model_func=lambda prompt,
+        system_prompt=None,
+        history_messages=[],
+        **kwargs: openai_complete_if_cache(
             CHAT_MODEL,
             prompt,
             system_prompt=system_prompt,
@@ -288,8 +480,9 @@ async def build_instances():
             **kwargs,
         ),
         embedding_func=EmbeddingFunc(
-            embedding_dim=EMBED_DIM,
+            embedding_dim=_embed_dim_state.dim,
             func=_embed_and_check,
+            model_name=EMBED_MODEL,
         ),
     )
 
@@ -298,7 +491,11 @@ async def build_instances():
 
     rag_anything = RAGAnything(
         lightrag=lightrag_instance,
-        vision_model_func=lambda prompt, system_prompt=None, history_messages=[], image_data=None, **kwargs: (
+        vision_model_func=lambda prompt,
+        system_prompt=None,
+        history_messages=[],
+        image_data=None,
+        **kwargs: (
             openai_complete_if_cache(
                 # visual branch can reuse chat model name if provider supports images; else fallback to text-only
                 CHAT_MODEL,
@@ -318,7 +515,9 @@ async def build_instances():
                                 {"type": "text", "text": prompt},
                                 {
                                     "type": "image_url",
-                                    "image_url": {"url": f"data:image/jpeg;base64,{image_data}"},
+                                    "image_url": {
+                                        "url": f"data:image/jpeg;base64,{image_data}"
+                                    },
                                 },
                             ],
                         }
@@ -348,7 +547,22 @@ async def build_instances():
 # History utils
 # -----------------------------
 HISTORY_DIR = os.path.join(os.getcwd(), "history")
-HISTORY_FILE = os.path.join(HISTORY_DIR, "query_history.json")
+# 旧版历史文件（JSON 数组），仅在首次启动时迁移到 JSONL
+LEGACY_HISTORY_FILE = os.path.join(HISTORY_DIR, "query_history.json")
+HISTORY_FILE = os.path.join(HISTORY_DIR, "query_history.jsonl")
+
+# 历史写入策略：后台批量追加 + 按大小轮转
+HISTORY_BATCH_SIZE = max(1, int(os.environ.get("HISTORY_BATCH_SIZE", "100")))
+HISTORY_FLUSH_INTERVAL_MS = max(
+    0, int(os.environ.get("HISTORY_FLUSH_INTERVAL_MS", "500"))
+)
+# fsync 策略：batch（每批落盘后 fsync）| none（交给操作系统刷盘）
+HISTORY_FSYNC = os.environ.get("HISTORY_FSYNC", "batch").lower()
+HISTORY_MAX_BYTES = max(
+    0, int(os.environ.get("HISTORY_MAX_BYTES", str(10 * 1024 * 1024)))
+)
+HISTORY_BACKUP_COUNT = max(0, int(os.environ.get("HISTORY_BACKUP_COUNT", "5")))
+HISTORY_QUEUE_SIZE = max(1, int(os.environ.get("HISTORY_QUEUE_SIZE", "10000")))
 
 
 def _ensure_history_dir() -> None:
@@ -358,19 +572,238 @@ def _ensure_history_dir() -> None:
         pass
 
 
+def _read_lines_reversed(path: str, block_size: int = 64 * 1024) -> Iterator[str]:
+    """Yield the lines of a text file last line first.
+
+    Reads fixed-size blocks backwards from the end of the file, so memory is
+    bounded by the block size plus the longest line rather than the file size.
+    """
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        tail = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + tail).split(b"\n")
+            # The first piece may continue in the previous block
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                yield line.decode("utf-8", errors="replace")
+        yield tail.decode("utf-8", errors="replace")
+
+
+class HistoryWriter:
+    """Append-only JSON Lines history sink fed by a background writer task.
+
+    Requests only enqueue entries; the writer drains the queue in batches
+    (up to ``batch_size`` entries or ``flush_interval`` seconds), appends
+    them in a worker thread, optionally fsyncs, and rotates the file once it
+    exceeds ``max_bytes`` (``query_history.jsonl`` -> ``.1`` -> ... ->
+    ``.backup_count``).
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+        fsync: bool = True,
+        max_bytes: int = 10 * 1024 * 1024,
+        backup_count: int = 5,
+        queue_size: int = 10000,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        _ensure_history_dir()
+        await asyncio.to_thread(self._migrate_legacy)
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush every queued entry and stop the writer task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        try:
+            await self._task
+        finally:
+            self._task = None
+            self._queue = None
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, ensure_ascii=False, default=str)
+        if self._queue is None:
+            # Writer not running (e.g. before startup): fall back to a direct append
+            self._write_lines([line])
+            return
+        try:
+            self._queue.put_nowait(line)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.dropped % 100 == 1:
+                print(f"[History] 写入队列已满，已丢弃 {self.dropped} 条记录")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            line = await self._queue.get()
+            if line is None:
+                break
+            batch = [line]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                try:
+                    if timeout <= 0:
+                        line = self._queue.get_nowait()
+                    else:
+                        line = await asyncio.wait_for(self._queue.get(), timeout)
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if line is None:
+                    stopping = True
+                    break
+                batch.append(line)
+            try:
+                await asyncio.to_thread(self._write_lines, batch)
+            except Exception as e:
+                # Non-blocking: history write failure must not break API
+                print(f"[History] 批量写入失败（{len(batch)} 条）：{e}")
+
+    def _write_lines(self, lines: List[str]) -> None:
+        _ensure_history_dir()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            size = f.tell()
+        if self.max_bytes and size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.isfile(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        os.replace(self.path, self.path + ".1")
+
+    def _migrate_legacy(self) -> None:
+        """One-time conversion of the legacy JSON-array history into JSONL."""
+        if os.path.exists(self.path) or not os.path.isfile(LEGACY_HISTORY_FILE):
+            return
+        try:
+            with open(LEGACY_HISTORY_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, list) and data:
+                self._write_lines(
+                    [json.dumps(e, ensure_ascii=False, default=str) for e in data]
+                )
+                print(f"[History] 已迁移旧版历史 {len(data)} 条至 {self.path}")
+        except Exception as e:
+            print(f"[History] 旧版历史迁移失败：{e}")
+
+    def files_oldest_first(self) -> List[str]:
+        rotated = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)]
+        return [p for p in rotated + [self.path] if os.path.isfile(p)]
+
+    def read_page(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        event_type: Optional[str] = None,
+        newest_first: bool = True,
+    ) -> Dict[str, Any]:
+        """Return one page of history entries without loading the whole history.
+
+        Oldest-first paging streams lines file by file. Newest-first paging
+        reads each file backwards in blocks, so memory stays bounded even
+        when rotation is off (``HISTORY_MAX_BYTES=0``).
+        """
+        files = self.files_oldest_first()
+        if newest_first:
+            files = files[::-1]
+        items: List[Dict[str, Any]] = []
+        matched = 0
+        has_more = False
+        for path in files:
+            if newest_first:
+                lines = _read_lines_reversed(path)
+            else:
+                lines = open(path, "r", encoding="utf-8")
+            try:
+                for raw in lines:
+                    raw = raw.strip()
+                    if not raw:
+                        continue
+                    try:
+                        entry = json.loads(raw)
+                    except Exception:
+                        continue
+                    if event_type and entry.get("type") != event_type:
+                        continue
+                    if matched >= offset + limit:
+                        has_more = True
+                        break
+                    if matched >= offset:
+                        items.append(entry)
+                    matched += 1
+            finally:
+                lines.close()
+            if has_more:
+                break
+        return {
+            "items": items,
+            "offset": offset,
+            "limit": limit,
+            "next_offset": offset + len(items) if has_more else None,
+            "has_more": has_more,
+        }
+
+
+_history_writer = HistoryWriter(
+    HISTORY_FILE,
+    batch_size=HISTORY_BATCH_SIZE,
+    flush_interval=HISTORY_FLUSH_INTERVAL_MS / 1000.0,
+    fsync=HISTORY_FSYNC != "none",
+    max_bytes=HISTORY_MAX_BYTES,
+    backup_count=HISTORY_BACKUP_COUNT,
+    queue_size=HISTORY_QUEUE_SIZE,
+)
+
+
 def _append_history(event_type: str, payload: Dict[str, Any]) -> None:
-    """Append an entry to a single JSON file as an array.
+    """Queue a history entry for the background JSONL writer.
 
-    If file does not exist, create it with an array. If exists but invalid,
-    recreate safely. Always ensure ASCII disabled for Chinese.
+    Never blocks the event loop on disk I/O and never raises; entries use
+    Asia/Shanghai timestamps and keep non-ASCII (Chinese) text readable.
     """
-    _ensure_history_dir()
     # Use Asia/Shanghai timezone for timestamps; fallback to +08:00 if zoneinfo unavailable
     try:
         from zoneinfo import ZoneInfo  # Python 3.9+
+
         tz = ZoneInfo("Asia/Shanghai")
     except Exception:
         from datetime import timezone, timedelta
+
         tz = timezone(timedelta(hours=8))
     entry = {
         "timestamp": datetime.now(tz).isoformat(),
@@ -378,53 +811,555 @@ def _append_history(event_type: str, payload: Dict[str, Any]) -> None:
         **payload,
     }
     try:
-        if os.path.isfile(HISTORY_FILE):
-            with open(HISTORY_FILE, "r", encoding="utf-8") as f:
-                try:
-                    data = json.load(f)
-                    if not isinstance(data, list):
-                        data = []
-                except Exception:
-                    data = []
-        else:
-            data = []
-        data.append(entry)
-        with open(HISTORY_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        _history_writer.append(entry)
     except Exception:
         # Non-blocking: history write failure must not break API
         pass
 
 
+# -----------------------------
+# Callback dispatcher (shared pool, retry queue)
+# -----------------------------
+class CallbackDispatcher:
+    """App-lifetime callback delivery with one pooled HTTP client.
+
+    Endpoints ``submit`` payloads into a bounded queue (waiting up to
+    ``enqueue_timeout`` when full, i.e. backpressure) and a fixed set of
+    workers POST them. Each destination host has its own concurrency limit.
+    Network errors, 429 and 5xx responses are rescheduled with exponential
+    backoff up to ``max_retries``; other 4xx responses fail immediately.
+    ``stop`` drains queued and scheduled retries before closing the client.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15,
+        workers: int = 8,
+        queue_size: int = 1000,
+        enqueue_timeout: float = 5,
+        max_retries: int = 5,
+        retry_base: float = 0.5,
+        retry_max: float = 30,
+        per_host_concurrency: int = 4,
+        drain_timeout: float = 10,
+    ):
+        self.timeout = timeout
+        self.workers = workers
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.per_host_concurrency = per_host_concurrency
+        self.drain_timeout = drain_timeout
+        self.http2 = False
+        self._client = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._retry_tasks: set[asyncio.Task] = set()
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._accepting = False
+        self.stats: Dict[str, Any] = {
+            "submitted": 0,
+            "delivered": 0,
+            "failed": 0,
+            "retried": 0,
+            "dropped": 0,
+            "last_error": None,
+            "hosts": {},
+        }
+
+    async def start(self) -> None:
+        if not HTTPX_AVAILABLE or self._client is not None:
+            return
+        try:
+            import h2  # noqa: F401  # enables HTTP/2 negotiation in httpx
+
+            http2 = True
+        except Exception:
+            http2 = False
+        self.http2 = http2
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=self.workers * 2,
+                max_keepalive_connections=self.workers,
+                keepalive_expiry=30,
+            ),
+            headers={"content-type": "application/json; charset=utf-8"},
+        )
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        self._accepting = True
+
+    async def stop(self) -> None:
+        if self._client is None:
+            return
+        self._accepting = False
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            print(
+                f"[Callback] 关闭时仍有 {self._queue.qsize()} 条待投递、{len(self._retry_tasks)} 条待重试，已放弃"
+            )
+        for task in list(self._retry_tasks) + self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(
+            *self._retry_tasks, *self._worker_tasks, return_exceptions=True
+        )
+        self._retry_tasks.clear()
+        self._worker_tasks = []
+        await self._client.aclose()
+        self._client = None
+        self._queue = None
+
+    async def _drain(self) -> None:
+        while True:
+            await self._queue.join()
+            if not self._retry_tasks:
+                return
+            await asyncio.wait(list(self._retry_tasks))
+
+    async def submit(self, url: str, payload: Dict[str, Any]) -> bool:
+        """Queue a callback; returns False when it was dropped."""
+        if not self._accepting:
+            self.stats["dropped"] += 1
+            reason = "未安装 httpx" if not HTTPX_AVAILABLE else "投递器未运行"
+            print(f"[Callback] {reason}，丢弃回调：{url}")
+            return False
+        self.stats["submitted"] += 1
+        try:
+            await asyncio.wait_for(
+                self._queue.put((url, payload, 0)), timeout=self.enqueue_timeout
+            )
+            return True
+        except asyncio.TimeoutError:
+            self.stats["dropped"] += 1
+            print(f"[Callback] 投递队列已满，丢弃回调：{url}")
+            return False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "pending_retries": len(self._retry_tasks),
+            "http2": self.http2,
+        }
+
+    def _host_stats(self, host: str) -> Dict[str, int]:
+        return self.stats["hosts"].setdefault(
+            host, {"delivered": 0, "failed": 0, "retried": 0}
+        )
+
+    async def _worker(self) -> None:
+        while True:
+            url, payload, attempt = await self._queue.get()
+            try:
+                await self._deliver(url, payload, attempt)
+            except Exception as e:
+                self.stats["last_error"] = str(e)
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, url: str, payload: Dict[str, Any], attempt: int) -> None:
+        host = httpx.URL(url).host or "unknown"
+        limit = self._host_limits.setdefault(
+            host, asyncio.Semaphore(self.per_host_concurrency)
+        )
+        retryable = False
+        error: Optional[str] = None
+        async with limit:
+            try:
+                resp = await self._client.post(url, json=payload)
+                if resp.status_code < 400:
+                    self.stats["delivered"] += 1
+                    self._host_stats(host)["delivered"] += 1
+                    return
+                retryable = resp.status_code == 429 or resp.status_code >= 500
+                error = f"HTTP {resp.status_code} from {host}"
+            except httpx.HTTPError as e:
+                retryable = True
+                error = f"{type(e).__name__} for {host}: {e}"
+
+        self.stats["last_error"] = error
+        if retryable and attempt < self.max_retries:
+            delay = min(self.retry_max, self.retry_base * (2**attempt))
+            self.stats["retried"] += 1
+            self._host_stats(host)["retried"] += 1
+            task = asyncio.create_task(self._requeue(url, payload, attempt + 1, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+        else:
+            self.stats["failed"] += 1
+            self._host_stats(host)["failed"] += 1
+            print(f"[Callback] 投递失败（第 {attempt + 1} 次）：{error}")
+
+    async def _requeue(
+        self, url: str, payload: Dict[str, Any], attempt: int, delay: float
+    ) -> None:
+        await asyncio.sleep(delay)
+        # Retries bypass the enqueue timeout: they were already accepted once
+        await self._queue.put((url, payload, attempt))
+
+
+_callback_dispatcher = CallbackDispatcher(
+    timeout=CALLBACK_TIMEOUT,
+    workers=CALLBACK_WORKERS,
+    queue_size=CALLBACK_QUEUE_SIZE,
+    enqueue_timeout=CALLBACK_ENQUEUE_TIMEOUT,
+    max_retries=CALLBACK_MAX_RETRIES,
+    retry_base=CALLBACK_RETRY_BASE,
+    retry_max=CALLBACK_RETRY_MAX,
+    per_host_concurrency=CALLBACK_PER_HOST_CONCURRENCY,
+    drain_timeout=CALLBACK_DRAIN_TIMEOUT,
+)
+
+
 # -----------------------------
 # Directory watcher (auto-ingest on new files)
 # -----------------------------
+def _sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+DocStatusLookup = Callable[[List[str]], Awaitable[Optional[Dict[str, str]]]]
+
+
+class ContentHashIndex:
+    """Persisted SHA-256 -> ingested document index plus an in-flight claim set.
+
+    Stored next to LightRAG's workspace files so byte-identical files are
+    recognised across restarts regardless of their name or location. Only
+    documents LightRAG reports as processed are recorded, and ``lookup``
+    re-checks that status, so content whose document failed or was deleted
+    since can be ingested again.
+    """
+
+    def __init__(self, path: str, doc_statuses: Optional[DocStatusLookup] = None):
+        self.path = path
+        self.doc_statuses = doc_statuses
+        self._data: Optional[Dict[str, Dict[str, Any]]] = None
+        self._inflight: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._data is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._data = data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                self._data = {}
+            except Exception as e:
+                print(f"[HashIndex] 读取失败，将重建：{e}")
+                self._data = {}
+        return self._data
+
+    async def lookup(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Index entry for already ingested content, or None.
+
+        An entry whose document is no longer processed (failed on a later
+        retry, deleted) is dropped. When the status cannot be read the entry
+        is trusted.
+        """
+        entry = self._load().get(digest)
+        doc_id = (entry or {}).get("doc_id")
+        if not doc_id or self.doc_statuses is None:
+            return entry
+        statuses = await self.doc_statuses([doc_id])
+        if statuses is None or statuses.get(doc_id) == DocStatus.PROCESSED:
+            return entry
+        await self.forget([digest])
+        return None
+
+    def claim(self, digest: str) -> bool:
+        """Reserve a hash for ingestion; False if already ingested or in flight."""
+        if digest in self._inflight or digest in self._load():
+            return False
+        self._inflight.add(digest)
+        return True
+
+    def release(self, digest: str) -> None:
+        self._inflight.discard(digest)
+
+    async def record(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        async with self._lock:
+            data = self._load()
+            now = datetime.now().isoformat()
+            for digest, info in entries.items():
+                data[digest] = {**info, "ingested_at": now}
+            snapshot = dict(data)
+            await asyncio.to_thread(self._save, snapshot)
+
+    async def forget(self, digests: List[str]) -> None:
+        async with self._lock:
+            data = self._load()
+            if not any(d in data for d in digests):
+                return
+            for digest in digests:
+                data.pop(digest, None)
+            snapshot = dict(data)
+            await asyncio.to_thread(self._save, snapshot)
+
+    async def clear(self) -> int:
+        """Forget every recorded hash (in-flight claims stay); returns the count."""
+        async with self._lock:
+            data = self._load()
+            count = len(data)
+            data.clear()
+            await asyncio.to_thread(self._save, {})
+        return count
+
+    def _save(self, data: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+
+async def _doc_statuses(doc_ids: List[str]) -> Optional[Dict[str, str]]:
+    """LightRAG doc_status per document id (missing ids are omitted).
+
+    Returns None when the status cannot be read, e.g. before startup.
+    """
+    if lightrag_instance is None:
+        return None
+    try:
+        statuses = await lightrag_instance.aget_docs_by_ids(doc_ids)
+    except Exception as e:
+        print(f"[HashIndex] 读取文档状态失败：{e}")
+        return None
+    result: Dict[str, str] = {}
+    for doc_id, st in statuses.items():
+        st = st if isinstance(st, dict) else vars(st)
+        result[doc_id] = st.get("status")
+    return result
+
+
+_hash_index = ContentHashIndex(
+    os.path.join(WORKING_DIR, WORKSPACE or "", "ingest_hash_index.json"),
+    doc_statuses=_doc_statuses,
+)
+
+
+async def _claim_digest(digest: str, file: str) -> Optional[Dict[str, Any]]:
+    """Claim content for ingestion; returns the skip record when it cannot be claimed."""
+    known = await _hash_index.lookup(digest)
+    if known is None and _hash_index.claim(digest):
+        return None
+    return {
+        "file": file,
+        "sha256": digest,
+        "reason": "already_ingested" if known is not None else "in_progress",
+        "doc_id": (known or {}).get("doc_id"),
+        "existing_path": (known or {}).get("path"),
+    }
+
+
+async def _claim_files(
+    paths: List[str],
+) -> tuple[List[tuple[str, str]], List[Dict[str, Any]], List[str]]:
+    """Hash files on disk and claim their content for ingestion.
+
+    Returns (claimed (path, sha256) pairs, skipped duplicates, unreadable paths).
+    Claims must be handed to ``_ingest_claimed``, which releases them.
+    """
+    claimed: List[tuple[str, str]] = []
+    skipped: List[Dict[str, Any]] = []
+    unreadable: List[str] = []
+    for path in paths:
+        try:
+            digest = await asyncio.to_thread(_sha256_file, path)
+        except Exception as e:
+            print(f"[HashIndex] 读取文件失败 {path}: {e}")
+            unreadable.append(path)
+            continue
+        skip = await _claim_digest(digest, path)
+        if skip is not None:
+            skipped.append(skip)
+            continue
+        claimed.append((path, digest))
+    return claimed, skipped, unreadable
+
+
+class WatchPipeline:
+    """Turns raw filesystem events into debounced, deduplicated ingestion batches.
+
+    Events only record the path. A flush loop promotes a path once no event
+    arrived for it during the debounce window *and* its size/mtime did not
+    change across one window (half-written files keep waiting). Ready paths
+    are hashed, skipped when the content was already ingested (its document
+    is still processed in LightRAG) or is in flight, and grouped into batches of up to ``batch_max`` files that go to
+    a bounded queue consumed by a single ingestion worker.
+    """
+
+    def __init__(self, debounce: float, batch_max: int, queue_size: int):
+        self.debounce = max(0.05, debounce)
+        self.batch_max = batch_max
+        self._pending: Dict[str, tuple[float, Optional[tuple[int, float]]]] = {}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"events": 0, "batches": 0, "queued_files": 0, "duplicates": 0}
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._flush_loop()),
+                asyncio.create_task(self._consume_loop()),
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._pending.clear()
+
+    def notify(self, path: str) -> None:
+        """Record a filesystem event (must run on the event loop thread)."""
+        self.stats["events"] += 1
+        previous = self._pending.get(path)
+        self._pending[path] = (time.monotonic(), previous[1] if previous else None)
+        self._wakeup.set()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            ready = self._collect_ready()
+            if ready:
+                await self._enqueue(ready)
+
+    def _collect_ready(self) -> List[str]:
+        now = time.monotonic()
+        ready: List[str] = []
+        for path, (last_event, last_stat) in list(self._pending.items()):
+            if now - last_event < self.debounce:
+                continue
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                # Temp file renamed away or deleted before it settled
+                self._pending.pop(path, None)
+                continue
+            current = (st.st_size, st.st_mtime)
+            if current != last_stat or st.st_size == 0:
+                # Still being written: observe again after another window
+                self._pending[path] = (last_event, current)
+                continue
+            self._pending.pop(path, None)
+            ready.append(path)
+        return ready
+
+    async def _enqueue(self, paths: List[str]) -> None:
+        claimed, skipped, _ = await _claim_files(paths)
+        self.stats["duplicates"] += len(skipped)
+        for i in range(0, len(claimed), self.batch_max):
+            batch = claimed[i : i + self.batch_max]
+            # Blocks when the ingestion queue is full (backpressure)
+            await self._queue.put(batch)
+            self.stats["batches"] += 1
+            self.stats["queued_files"] += len(batch)
+
+    async def _consume_loop(self) -> None:
+        while True:
+            batch = await self._queue.get()
+            try:
+                await self._ingest_batch(batch)
+            except Exception as e:
+                print(f"[Watcher] 批量入库异常：{e}")
+            finally:
+                for _, digest in batch:
+                    _hash_index.release(digest)
+                self._queue.task_done()
+
+    async def _ingest_batch(self, batch: List[tuple[str, str]]) -> None:
+        if rag_anything is None:
+            return
+        paths = [p for p, _ in batch]
+        job = _job_manager.create("watch", paths)
+
+        async def _work() -> Dict[str, Any]:
+            ingested, errors, timings, _ = await _ingest_claimed(
+                batch,
+                "./output",
+                "Failed to process a file",
+                on_progress=_job_manager.progress_callback(job["job_id"]),
+            )
+            result = {
+                "status": _status(len(ingested), errors),
+                "job_id": job["job_id"],
+                "ingested_count": len(ingested),
+                "errors": errors,
+                "ingested_files": ingested,
+                "timings": timings,
+            }
+            _append_history("ingest_watch", {"response": result})
+            return result
+
+        await _job_manager.run(job, _work())
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending_files": len(self._pending),
+            "queued_batches": self._queue.qsize(),
+        }
+
+
+_watch_pipeline: Optional[WatchPipeline] = None
+
+
 class IngestEventHandler(FileSystemEventHandler):
+    """Forwards matching create/modify/move events to the WatchPipeline."""
+
+    def _forward(self, path: str) -> None:
+        path = os.path.normpath(path)
+        _, ext = os.path.splitext(path)
+        if ext.lower() not in FILE_WATCH_EXTS:
+            return
+        if _watch_pipeline is not None and _app_loop is not None:
+            _app_loop.call_soon_threadsafe(_watch_pipeline.notify, path)
+
     def on_created(self, event):
         try:
-            if event.is_directory:
-                return
-            path = os.path.normpath(event.src_path)
-            _, ext = os.path.splitext(path)
-            if ext.lower() not in FILE_WATCH_EXTS:
-                return
-            # Debounce simple: avoid double-processing same path
-            if path in _watcher_seen:
-                return
-            _watcher_seen.add(path)
-            if rag_anything is not None and _app_loop is not None:
-                asyncio.run_coroutine_threadsafe(
-                    rag_anything.process_document_complete(file_path=path, output_dir="./output"),
-                    _app_loop,
-                )
+            if not event.is_directory:
+                self._forward(event.src_path)
         except Exception:
             # watcher must not crash service
             pass
 
+    def on_modified(self, event):
+        try:
+            if not event.is_directory:
+                self._forward(event.src_path)
+        except Exception:
+            pass
+
+    def on_moved(self, event):
+        try:
+            if not event.is_directory:
+                self._forward(event.dest_path)
+        except Exception:
+            pass
+
 
 def _start_watcher():
     """Initialize and start filesystem watcher if enabled and available."""
-    global observer_instance
+    global observer_instance, _watch_pipeline
     if observer_instance is not None:
         return
     if not FILE_WATCH_ENABLED or not WATCHDOG_AVAILABLE:
@@ -432,7 +1367,10 @@ def _start_watcher():
     # Prepare handler and directories
     handler = IngestEventHandler()
     dirs = []
-    for d in {os.path.normpath(DEFAULT_IMPORT_DIR), os.path.normpath(UPLOAD_TARGET_DIR)}:
+    for d in {
+        os.path.normpath(DEFAULT_IMPORT_DIR),
+        os.path.normpath(UPLOAD_TARGET_DIR),
+    }:
         try:
             if d and os.path.isdir(d):
                 dirs.append(d)
@@ -441,6 +1379,12 @@ def _start_watcher():
     if not dirs:
         return
     try:
+        _watch_pipeline = WatchPipeline(
+            debounce=FILE_WATCH_DEBOUNCE_MS / 1000.0,
+            batch_max=FILE_WATCH_BATCH_MAX,
+            queue_size=FILE_WATCH_QUEUE_SIZE,
+        )
+        _watch_pipeline.start()
         observer_instance = Observer()
         for d in dirs:
             observer_instance.schedule(handler, d, recursive=FILE_WATCH_RECURSIVE)
@@ -449,20 +1393,28 @@ def _start_watcher():
         observer_instance = None
 
 
-def _stop_watcher():
-    global observer_instance
+async def _stop_watcher():
+    global observer_instance, _watch_pipeline
     try:
         if observer_instance is not None:
             observer_instance.stop()
             observer_instance.join(timeout=5)
             observer_instance = None
-        _watcher_seen.clear()
+        if _watch_pipeline is not None:
+            await _watch_pipeline.stop()
+            _watch_pipeline = None
     except Exception:
         pass
+
+
+# -----------------------------
 # Lifespan events
 # -----------------------------
 @app.on_event("startup")
 async def on_startup():
+    await _history_writer.start()
+    await _callback_dispatcher.start()
+    await _answer_cache.start()
     await build_instances()
     # Start directory watcher after instances built
     try:
@@ -476,7 +1428,29 @@ async def on_startup():
 @app.on_event("shutdown")
 async def on_shutdown():
     try:
-        _stop_watcher()
+        await _stop_watcher()
+    except Exception:
+        pass
+    try:
+        await _job_manager.shutdown()
+    except Exception:
+        pass
+    try:
+        await _callback_dispatcher.stop()
+    except Exception:
+        pass
+    try:
+        await _answer_cache.stop()
+    except Exception:
+        pass
+    try:
+        # Also closes the pooled LLM/embedding clients
+        if lightrag_instance is not None:
+            await lightrag_instance.finalize_storages()
+    except Exception:
+        pass
+    try:
+        await _history_writer.stop()
     except Exception:
         pass
 
@@ -492,6 +1466,269 @@ def _status(ingested_count: int, errors: List[str]) -> str:
     return "error"
 
 
+ProgressCallback = Callable[[str, str, Dict[str, Any]], None]
+
+
+async def _ingest_one(
+    path: str,
+    output_dir: str,
+    timing: Dict[str, float],
+    on_progress: Optional[ProgressCallback] = None,
+) -> str:
+    """Parse and insert a single file, recording per-stage wall-clock seconds into ``timing``.
+
+    Parsing (MinerU) and insertion (KG extraction + multimodal processing) are
+    timed separately so INGEST_CONCURRENCY can be tuned against provider limits.
+    Returns the (content-based) LightRAG doc id.
+    """
+    start = time.perf_counter()
+    try:
+        if on_progress:
+            on_progress(path, "parsing", {})
+        content_list, doc_id = await rag_anything.parse_document(
+            path, output_dir=output_dir
+        )
+        parsed_at = time.perf_counter()
+        timing["parse"] = round(parsed_at - start, 3)
+        if on_progress:
+            on_progress(path, "inserting", {"doc_id": doc_id, "parse": timing["parse"]})
+        if content_list:
+            await rag_anything.insert_content_list(
+                content_list,
+                file_path=os.path.basename(path),
+                doc_id=doc_id,
+            )
+        timing["insert"] = round(time.perf_counter() - parsed_at, 3)
+        return doc_id
+    finally:
+        timing["total"] = round(time.perf_counter() - start, 3)
+
+
+# Shared across requests and background jobs so INGEST_CONCURRENCY
+# bounds the whole service
+_ingest_semaphore: Optional[asyncio.Semaphore] = None
+
+
+async def _ingest_files(
+    paths: List[str],
+    output_dir: str,
+    error_message: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[List[str], List[str], Dict[str, Dict[str, float]], Dict[str, str]]:
+    """Ingest files with at most INGEST_CONCURRENCY running at once service-wide.
+
+    Each file is isolated: a failure is recorded in the returned errors and
+    does not cancel the others. Returns (ingested, errors, timings, doc_ids)
+    with ``ingested`` kept in input order.
+    """
+    global _ingest_semaphore
+    if _ingest_semaphore is None:
+        _ingest_semaphore = asyncio.Semaphore(INGEST_CONCURRENCY)
+    timings: Dict[str, Dict[str, float]] = {p: {} for p in paths}
+    doc_ids: Dict[str, str] = {}
+
+    async def _run(p: str) -> bool:
+        async with _ingest_semaphore:
+            try:
+                doc_ids[p] = await _ingest_one(p, output_dir, timings[p], on_progress)
+                if on_progress:
+                    on_progress(p, "done", {"timings": timings[p]})
+                return True
+            except Exception as e:
+                print(f"[Ingest] 处理失败 {p}: {e}")
+                if on_progress:
+                    on_progress(p, "failed", {"timings": timings[p]})
+                return False
+
+    outcomes = await asyncio.gather(*(_run(p) for p in paths))
+    ingested = [p for p, ok in zip(paths, outcomes) if ok]
+    errors = [error_message for ok in outcomes if not ok]
+    if ingested:
+        # New content may change any answer: retire cached answers
+        await _answer_cache.invalidate()
+    return ingested, errors, timings, doc_ids
+
+
+async def _ingest_claimed(
+    claimed: List[tuple[str, str]],
+    output_dir: str,
+    error_message: str,
+    on_progress: Optional[ProgressCallback] = None,
+) -> tuple[List[str], List[str], Dict[str, Dict[str, float]], Dict[str, str]]:
+    """Ingest claimed files, record the processed hashes and release every claim.
+
+    LightRAG marks extraction/merge failures in doc_status instead of raising,
+    so a hash is only recorded once its document is reported PROCESSED; other
+    content stays eligible for a retry. Same return value as ``_ingest_files``.
+    """
+    try:
+        ingested, errors, timings, doc_ids = await _ingest_files(
+            [p for p, _ in claimed], output_dir, error_message, on_progress=on_progress
+        )
+        done = {p: doc_ids[p] for p in ingested if doc_ids.get(p)}
+        statuses = await _doc_statuses(list(set(done.values()))) if done else None
+        await _hash_index.record(
+            {
+                digest: {"path": p, "doc_id": done[p]}
+                for p, digest in claimed
+                if p in done and (statuses or {}).get(done[p]) == DocStatus.PROCESSED
+            }
+        )
+        return ingested, errors, timings, doc_ids
+    finally:
+        for _, digest in claimed:
+            _hash_index.release(digest)
+
+
+# -----------------------------
+# Background ingestion jobs
+# -----------------------------
+JOB_HISTORY_LIMIT = max(1, int(os.environ.get("JOB_HISTORY_LIMIT", "200")))
+JOB_SSE_HEARTBEAT = float(os.environ.get("JOB_SSE_HEARTBEAT", "15"))
+
+
+class IngestJobManager:
+    """In-process registry of ingestion jobs with per-file progress events.
+
+    Jobs are identified by LightRAG-style track ids (``ingest_<ts>_<uuid>``).
+    Every progress change is published to SSE subscribers of that job; the
+    registry keeps at most ``history_limit`` finished jobs.
+    """
+
+    def __init__(self, history_limit: int = 200):
+        self.history_limit = history_limit
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def create(self, kind: str, paths: List[str]) -> Dict[str, Any]:
+        job_id = generate_track_id("ingest")
+        job = {
+            "job_id": job_id,
+            "type": kind,
+            "status": "queued",
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "total_files": len(paths),
+            "completed_files": 0,
+            "failed_files": 0,
+            "files": {p: {"status": "pending", "doc_id": None} for p in paths},
+            "result": None,
+            "error": None,
+        }
+        self.jobs[job_id] = job
+        self._prune()
+        return job
+
+    def spawn(self, job: Dict[str, Any], work: Awaitable[Dict[str, Any]]) -> None:
+        task = asyncio.create_task(self.run(job, work))
+        self._tasks[job["job_id"]] = task
+        task.add_done_callback(lambda t, jid=job["job_id"]: self._on_task_done(jid, t))
+
+    async def run(
+        self, job: Dict[str, Any], work: Awaitable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        job["status"] = "running"
+        job["started_at"] = datetime.now().isoformat()
+        self._publish(job["job_id"], "status", {"status": "running"})
+        try:
+            result = await work
+            job["result"] = result
+            job["status"] = "completed" if result.get("status") != "error" else "failed"
+            return result
+        except BaseException as e:
+            job["status"] = (
+                "cancelled" if isinstance(e, asyncio.CancelledError) else "failed"
+            )
+            job["error"] = str(e) or type(e).__name__
+            raise
+        finally:
+            job["finished_at"] = datetime.now().isoformat()
+            self._publish(job["job_id"], "done", self.summary(job))
+            for q in self._subscribers.pop(job["job_id"], []):
+                q.put_nowait(None)
+
+    def _on_task_done(self, job_id: str, task: asyncio.Task) -> None:
+        self._tasks.pop(job_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[Jobs] 任务 {job_id} 失败：{task.exception()}")
+
+    def progress_callback(self, job_id: str) -> ProgressCallback:
+        def _on_progress(path: str, stage: str, info: Dict[str, Any]) -> None:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            entry = job["files"].setdefault(path, {"status": "pending", "doc_id": None})
+            entry["status"] = stage
+            if info.get("doc_id"):
+                entry["doc_id"] = info["doc_id"]
+            if "timings" in info:
+                entry["timings"] = info["timings"]
+            if stage == "done":
+                job["completed_files"] += 1
+            elif stage == "failed":
+                job["failed_files"] += 1
+            self._publish(
+                job_id,
+                "file",
+                {
+                    "file": path,
+                    **entry,
+                    "completed_files": job["completed_files"],
+                    "failed_files": job["failed_files"],
+                    "total_files": job["total_files"],
+                },
+            )
+
+        return _on_progress
+
+    def summary(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if k not in ("files", "result")}
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        q: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, []).append(q)
+        return q
+
+    def unsubscribe(self, job_id: str, q: asyncio.Queue) -> None:
+        subs = self._subscribers.get(job_id)
+        if subs and q in subs:
+            subs.remove(q)
+
+    def is_finished(self, job: Dict[str, Any]) -> bool:
+        return job["status"] in ("completed", "failed", "cancelled")
+
+    async def shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _publish(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        for q in self._subscribers.get(job_id, []):
+            q.put_nowait((event, data))
+
+    def _prune(self) -> None:
+        finished = [jid for jid, j in self.jobs.items() if self.is_finished(j)]
+        for jid in finished[: max(0, len(finished) - self.history_limit)]:
+            self.jobs.pop(jid, None)
+
+
+_job_manager = IngestJobManager(history_limit=JOB_HISTORY_LIMIT)
+
+
+def _accepted(job: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = job["job_id"]
+    return {
+        "status": "accepted",
+        "job_id": job_id,
+        "total_files": job["total_files"],
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+    }
+
+
 # Note: JSON-based ingest endpoint removed per privacy requirements.
 
 
@@ -499,7 +1736,10 @@ def _status(ingested_count: int, errors: List[str]) -> str:
 # Ingest auto-scan API (no files, no body)
 # -----------------------------
 @app.post("/ingest_auto")
-async def ingest_auto(callback_url: Optional[str] = Query(None)):
+async def ingest_auto(
+    callback_url: Optional[str] = Query(None),
+    wait: bool = Query(False),
+):
     if rag_anything is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
 
@@ -516,42 +1756,193 @@ async def ingest_auto(callback_url: Optional[str] = Query(None)):
             _, ext = os.path.splitext(name.lower())
             if os.path.isfile(p) and ext in allowed_ext:
                 saved_paths.append(p)
-    except Exception as e:
+    except Exception:
         errors.append("Scan default import dir failed")
 
     if not saved_paths:
-        raise HTTPException(status_code=400, detail={"message": "No files to ingest", "errors": errors})
+        raise HTTPException(
+            status_code=400, detail={"message": "No files to ingest", "errors": errors}
+        )
+
+    # Same directory the watcher observes: skip content already ingested or in flight
+    claimed, skipped, unreadable = await _claim_files(saved_paths)
+    errors.extend("Failed to read a file" for _ in unreadable)
+    job = _job_manager.create("ingest_auto", [p for p, _ in claimed])
+
+    async def _work() -> Dict[str, Any]:
+        # Ingest documents (bounded parallelism, per-file error isolation)
+        ingested, ingest_errors, timings, _ = await _ingest_claimed(
+            claimed,
+            "./output",
+            "Failed to process a file",
+            on_progress=_job_manager.progress_callback(job["job_id"]),
+        )
+        errors.extend(ingest_errors)
+        result = {
+            "status": _status(len(ingested) + len(skipped), errors),
+            "job_id": job["job_id"],
+            "ingested_count": len(ingested),
+            "skipped_count": len(skipped),
+            "errors": errors,
+            "scanned_files": saved_paths,
+            "ingested_files": ingested,
+            "skipped_files": skipped,
+            "concurrency": INGEST_CONCURRENCY,
+            "timings": timings,
+        }
+        _append_history("ingest_auto", {"response": result})
+        # Optional callback: POST result to external URL via the shared dispatcher
+        if callback_url:
+            await _callback_dispatcher.submit(callback_url, result)
+        return result
 
-    # Ingest documents
-    ingested: List[str] = []
-    for p in saved_paths:
+    if wait or not claimed:
+        return await _job_manager.run(job, _work())
+    _job_manager.spawn(job, _work())
+    return {**_accepted(job), "skipped_count": len(skipped), "skipped_files": skipped}
+
+
+# -----------------------------
+# Answer cache
+# -----------------------------
+class AnswerCache:
+    """TTL + LRU cache for /query answers, optionally shared through Redis.
+
+    Keys hash the normalized question, mode and remaining request params
+    together with the workspace data version. Every completed ingest bumps
+    the version, so answers computed against older data are never served
+    again; a query that started before the bump stores under the old version
+    and is equally unreachable.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, redis_url: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis_url = redis_url
+        self._redis = None
+        self._entries: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+        self._version = 0
+        self._version_key = f"rag_service:{WORKSPACE}:answer_cache:data_version"
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "errors": 0,
+        }
+
+    async def start(self) -> None:
+        if not self.redis_url:
+            return
         try:
-            await rag_anything.process_document_complete(file_path=p, output_dir="./output")
-            ingested.append(p)
+            try:
+                import redis.asyncio as aioredis  # type: ignore
+            except ImportError:
+                if pm is None:
+                    raise
+                pm.install("redis")
+                import redis.asyncio as aioredis  # type: ignore
+            self._redis = aioredis.from_url(self.redis_url, decode_responses=True)
+            await self._redis.ping()
         except Exception as e:
-            errors.append("Failed to process a file")
-    result = {
-        "status": _status(len(ingested), errors),
-        "ingested_count": len(ingested),
-        "errors": errors,
-        "scanned_files": saved_paths,
-        "ingested_files": ingested,
-    }
-    _append_history("ingest_auto", {"response": result})
-    # Optional callback: POST result to external URL
-    if callback_url and HTTPX_AVAILABLE:
-        async def _send_callback(url: str, payload: Dict[str, Any]):
+            print(f"[AnswerCache] Redis 不可用，改用进程内缓存：{e}")
+            self._redis = None
+
+    async def stop(self) -> None:
+        if self._redis is not None:
             try:
-                async with httpx.AsyncClient(timeout=15) as client:
-                    await client.post(url, json=payload, headers={"content-type": "application/json; charset=utf-8"})
+                close = getattr(self._redis, "aclose", None) or self._redis.close
+                await close()
             except Exception:
-                # Swallow callback errors and continue
                 pass
-        try:
-            asyncio.create_task(_send_callback(callback_url, result))
-        except Exception:
-            pass
-        return result
+            self._redis = None
+
+    @staticmethod
+    def normalize(question: str) -> str:
+        return " ".join(question.split()).casefold()
+
+    async def data_version(self) -> int:
+        if self._redis is not None:
+            try:
+                return int(await self._redis.get(self._version_key) or 0)
+            except Exception:
+                self.stats["errors"] += 1
+        return self._version
+
+    def key(self, question: str, params: Dict[str, Any], version: int) -> str:
+        raw = json.dumps(
+            {"q": self.normalize(question), "params": params, "v": version},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return f"rag_service:{WORKSPACE}:answer:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    async def get(self, key: str) -> Optional[Any]:
+        if self._redis is not None:
+            try:
+                raw = await self._redis.get(key)
+                if raw is not None:
+                    self.stats["hits"] += 1
+                    return json.loads(raw)
+                self.stats["misses"] += 1
+                return None
+            except Exception:
+                self.stats["errors"] += 1
+        item = self._entries.get(key)
+        if item is None or item[0] < time.monotonic():
+            if item is not None:
+                self._entries.pop(key, None)
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return item[1]
+
+    async def set(self, key: str, value: Any) -> None:
+        self.stats["stores"] += 1
+        if self._redis is not None:
+            try:
+                await self._redis.set(
+                    key, json.dumps(value, ensure_ascii=False), ex=max(1, int(self.ttl))
+                )
+                return
+            except Exception:
+                self.stats["errors"] += 1
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def invalidate(self) -> None:
+        """Bump the data version after the knowledge base changed."""
+        self.stats["invalidations"] += 1
+        self._version += 1
+        self._entries.clear()
+        if self._redis is not None:
+            try:
+                await self._redis.incr(self._version_key)
+            except Exception:
+                self.stats["errors"] += 1
+
+    async def snapshot(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": ANSWER_CACHE_ENABLED,
+            "backend": "redis" if self._redis is not None else "memory",
+            "ttl": self.ttl,
+            "max_entries": self.max_entries,
+            "size": len(self._entries),
+            "data_version": await self.data_version(),
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+_answer_cache = AnswerCache(
+    ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES, ANSWER_CACHE_REDIS_URL
+)
 
 
 # -----------------------------
@@ -562,36 +1953,181 @@ async def query(req: QueryRequest, callback_url: Optional[str] = Query(None)):
     if rag_anything is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
     try:
+        cache_key = None
+        if ANSWER_CACHE_ENABLED:
+            params = req.dict(exclude={"question"})
+            cache_key = _answer_cache.key(
+                req.question, params, await _answer_cache.data_version()
+            )
+            cached = await _answer_cache.get(cache_key)
+            if cached is not None:
+                response = {"result": cached, "cached": True}
+                _append_history("query", {"request": req.dict(), "response": response})
+                if callback_url:
+                    await _callback_dispatcher.submit(callback_url, response)
+                return response
         result = await rag_anything.aquery(req.question, mode=req.mode)
-        response = {"result": result}
+        if cache_key is not None and isinstance(result, str) and result:
+            await _answer_cache.set(cache_key, result)
+        response = {"result": result, "cached": False}
         _append_history("query", {"request": req.dict(), "response": response})
-        # Optional callback: POST result to external URL
-        if callback_url and HTTPX_AVAILABLE:
-            async def _send_callback(url: str, payload: Dict[str, Any]):
-                try:
-                    async with httpx.AsyncClient(timeout=15) as client:
-                        await client.post(url, json=payload, headers={"content-type": "application/json; charset=utf-8"})
-                except Exception:
-                    # Swallow callback errors and continue
-                    pass
-            try:
-                asyncio.create_task(_send_callback(callback_url, response))
-            except Exception:
-                pass
+        # Optional callback: POST result to external URL via the shared dispatcher
+        if callback_url:
+            await _callback_dispatcher.submit(callback_url, response)
         return response
     except Exception as e:
         # Propagate model/provider errors in a controlled manner
         raise HTTPException(status_code=500, detail=f"Query failed: {e}")
 
 
+@app.post("/query_batch")
+async def query_batch(
+    req: QueryBatchRequest, callback_url: Optional[str] = Query(None)
+):
+    """批量查询：以 NDJSON 流式返回，每完成一个问题输出一行，最后一行为汇总。"""
+    if lightrag_instance is None:
+        raise HTTPException(status_code=500, detail="Service not initialized")
+    if not req.questions:
+        raise HTTPException(status_code=400, detail="questions must not be empty")
+    if len(req.questions) > QUERY_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many questions: {len(req.questions)} > {QUERY_BATCH_MAX_QUESTIONS}",
+        )
+
+    async def _stream():
+        started = time.perf_counter()
+        results: List[Dict[str, Any]] = []
+        params = req.dict(include={"mode"})
+        version = await _answer_cache.data_version()
+        # Serve cached answers first; only misses go through the query pipeline
+        misses: List[int] = []
+        for index, question in enumerate(req.questions):
+            cached = None
+            if ANSWER_CACHE_ENABLED:
+                cached = await _answer_cache.get(
+                    _answer_cache.key(question, params, version)
+                )
+            if cached is None:
+                misses.append(index)
+                continue
+            item = {
+                "index": index,
+                "question": question,
+                "status": "success",
+                "result": cached,
+                "cached": True,
+            }
+            results.append(item)
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        batch_stats: Dict[str, int] = {}
+        if misses:
+            param = QueryParam(mode=req.mode or "hybrid")
+            async for outcome in lightrag_instance.aquery_batch(
+                [req.questions[i] for i in misses],
+                param,
+                max_concurrency=req.max_concurrency or QUERY_BATCH_CONCURRENCY,
+                stats=batch_stats,
+            ):
+                index = misses[outcome["index"]]
+                question = req.questions[index]
+                item = {
+                    "index": index,
+                    "question": question,
+                    "status": outcome["status"],
+                    "cached": False,
+                }
+                if outcome["status"] == "success":
+                    item["result"] = outcome["response"]
+                    if ANSWER_CACHE_ENABLED and outcome["response"]:
+                        await _answer_cache.set(
+                            _answer_cache.key(question, params, version),
+                            outcome["response"],
+                        )
+                else:
+                    item["error"] = outcome.get("error", "")
+                results.append(item)
+                yield json.dumps(item, ensure_ascii=False) + "\n"
+
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        summary = {
+            "done": True,
+            "total": len(req.questions),
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "cached": len(req.questions) - len(misses),
+            "embedding_calls": batch_stats.get("embedding_calls", 0),
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        yield json.dumps(summary, ensure_ascii=False) + "\n"
+        response = {**summary, "results": sorted(results, key=lambda r: r["index"])}
+        _append_history("query_batch", {"request": req.dict(), "response": response})
+        # Optional callback: POST result to external URL via the shared dispatcher
+        if callback_url:
+            await _callback_dispatcher.submit(callback_url, response)
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
 # -----------------------------
 # Ingest upload API (multipart)
 # -----------------------------
+class UploadTooLarge(Exception):
+    pass
+
+
+async def _stream_upload(uf: UploadFile, target_path: str) -> tuple[str, int]:
+    """Copy an upload to ``target_path`` in UPLOAD_CHUNK_SIZE pieces, hashing as it goes.
+
+    Data lands in a ``.part`` sibling first (ignored by the watcher) and is only
+    renamed into place once complete; an oversized or failed upload leaves
+    nothing behind. Returns (sha256 hex digest, size in bytes).
+    """
+    digest = hashlib.sha256()
+    size = 0
+    part_path = target_path + ".part"
+    try:
+        with open(part_path, "wb") as f:
+            while True:
+                chunk = await uf.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if UPLOAD_MAX_BYTES > 0 and size > UPLOAD_MAX_BYTES:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                await asyncio.to_thread(f.write, chunk)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    return digest.hexdigest(), size
+
+
+def _unique_upload_path(directory: str, fname: str, taken: set) -> str:
+    """Target path for an upload that no earlier file of the same request uses.
+
+    Same-named files in one request get ``name_1.ext``, ``name_2.ext`` ...
+    instead of overwriting each other on disk.
+    """
+    stem, ext = os.path.splitext(fname)
+    path = os.path.join(directory, fname)
+    n = 1
+    while path in taken:
+        path = os.path.join(directory, f"{stem}_{n}{ext}")
+        n += 1
+    return path
+
+
 @app.post("/ingest_upload")
 async def ingest_upload(
     files: List[UploadFile] = File(...),
     output_dir: str = Form("./output"),
     callback_url: Optional[str] = Form(None),
+    wait: bool = Form(False),
 ):
     if rag_anything is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
@@ -601,86 +2137,134 @@ async def ingest_upload(
 
     saved: List[str] = []
     errors: List[str] = []
+    # Byte-identical to something already ingested (or being ingested):
+    # acknowledged, not re-processed
+    skipped: List[Dict[str, Any]] = []
+    claimed: List[tuple[str, str]] = []
 
+    # Files must be persisted before responding: UploadFile is closed afterwards
     for uf in files:
+        # Sanitize filename
+        fname = os.path.basename(uf.filename or "")
+        if not fname:
+            errors.append("Save failed for a file")
+            continue
+        target_path = _unique_upload_path(uploads_dir, fname, set(saved))
         try:
-            # Sanitize filename
-            fname = os.path.basename(uf.filename)
-            target_path = os.path.join(uploads_dir, fname)
-            content = await uf.read()
-            with open(target_path, "wb") as f:
-                f.write(content)
-            saved.append(target_path)
-        except Exception as e:
+            digest, _ = await _stream_upload(uf, target_path)
+        except UploadTooLarge:
+            errors.append(f"File too large: {fname} (limit {UPLOAD_MAX_BYTES} bytes)")
+            continue
+        except Exception:
             errors.append("Save failed for a file")
-
-    ingested: List[str] = []
-    for p in saved:
+            continue
+        part_path = target_path + ".part"
+        skip = await _claim_digest(digest, fname)
+        if skip is not None:
+            os.remove(part_path)
+            skipped.append(skip)
+            continue
         try:
-            await rag_anything.process_document_complete(file_path=p, output_dir=output_dir)
-            ingested.append(p)
-        except Exception as e:
-            errors.append("Process failed for a file")
+            os.replace(part_path, target_path)
+        except Exception:
+            _hash_index.release(digest)
+            errors.append("Save failed for a file")
+            continue
+        saved.append(target_path)
+        claimed.append((target_path, digest))
+
+    job = _job_manager.create("ingest_upload", saved)
+
+    async def _work() -> Dict[str, Any]:
+        ingested, ingest_errors, timings, _ = await _ingest_claimed(
+            claimed,
+            output_dir,
+            "Process failed for a file",
+            on_progress=_job_manager.progress_callback(job["job_id"]),
+        )
+        errors.extend(ingest_errors)
+
+        result = {
+            "status": _status(len(ingested) + len(skipped), errors),
+            "job_id": job["job_id"],
+            "uploaded_count": len(saved),
+            "ingested_count": len(ingested),
+            "skipped_count": len(skipped),
+            "errors": errors,
+            "uploaded_files": saved,
+            "ingested_files": ingested,
+            "skipped_files": skipped,
+            "concurrency": INGEST_CONCURRENCY,
+            "timings": timings,
+        }
+        _append_history("ingest_upload", {"response": result})
+        # Optional callback: POST result to external URL via the shared dispatcher
+        if callback_url:
+            await _callback_dispatcher.submit(callback_url, result)
+        return result
 
-    result = {
-        "status": _status(len(ingested), errors),
+    if wait or not saved:
+        return await _job_manager.run(job, _work())
+    _job_manager.spawn(job, _work())
+    return {
+        **_accepted(job),
         "uploaded_count": len(saved),
-        "ingested_count": len(ingested),
-        "errors": errors,
         "uploaded_files": saved,
-        "ingested_files": ingested,
+        "skipped_count": len(skipped),
+        "skipped_files": skipped,
+        "errors": errors,
     }
-    _append_history("ingest_upload", {"response": result})
-    # Optional callback: POST result to external URL
-    if callback_url and HTTPX_AVAILABLE:
-        async def _send_callback(url: str, payload: Dict[str, Any]):
-            try:
-                async with httpx.AsyncClient(timeout=15) as client:
-                    await client.post(url, json=payload, headers={"content-type": "application/json; charset=utf-8"})
-            except Exception:
-                # Swallow callback errors and continue
-                pass
-        try:
-            asyncio.create_task(_send_callback(callback_url, result))
-        except Exception:
-            pass
-    return result
 
 
 # -----------------------------
 # Vector-only search API
 # -----------------------------
+def _vector_search_result(
+    chunks: List[Dict[str, Any]], top_k: int, elapsed_ms: float
+) -> Dict[str, Any]:
+    references, chunks = generate_reference_list_from_chunks(chunks)
+    return {
+        "status": "success" if chunks else "failure",
+        "message": "" if chunks else "No relevant document chunks found.",
+        "chunks": chunks,
+        "references": references,
+        "metadata": {"query_mode": "vector", "top_k": top_k, "elapsed_ms": elapsed_ms},
+    }
+
+
 @app.post("/search_vectors")
 async def search_vectors(req: SearchRequest, callback_url: Optional[str] = Query(None)):
     if lightrag_instance is None:
         raise HTTPException(status_code=500, detail="Service not initialized")
+    if not req.query and not req.queries:
+        raise HTTPException(status_code=400, detail="query or queries is required")
     try:
-        param = QueryParam(mode="naive", chunk_top_k=req.top_k, top_k=req.top_k)
-        data = await lightrag_instance.aquery_data(req.query, param)
-        # Only return chunks and references for clarity
-        chunks = data.get("data", {}).get("chunks", [])
-        references = data.get("data", {}).get("references", [])
-        response = {
-            "status": data.get("status", "success"),
-            "message": data.get("message", ""),
-            "chunks": chunks,
-            "references": references,
-            "metadata": data.get("metadata", {}),
-        }
+        # Lean path: one embedding call, direct chunks_vdb search, batched chunk fetch
+        started = time.perf_counter()
+        top_k = req.top_k or 20
+        if req.queries:
+            batches = await lightrag_instance.asearch_chunks(req.queries, top_k=top_k)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            response = {
+                "status": "success",
+                "results": [
+                    {"query": q, **_vector_search_result(chunks, top_k, elapsed_ms)}
+                    for q, chunks in zip(req.queries, batches)
+                ],
+                "metadata": {
+                    "query_mode": "vector",
+                    "top_k": top_k,
+                    "elapsed_ms": elapsed_ms,
+                },
+            }
+        else:
+            chunks = await lightrag_instance.asearch_chunks(req.query, top_k=top_k)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+            response = _vector_search_result(chunks, top_k, elapsed_ms)
         _append_history("search_vectors", {"request": req.dict(), "response": response})
-        # Optional callback: POST result to external URL
-        if callback_url and HTTPX_AVAILABLE:
-            async def _send_callback(url: str, payload: Dict[str, Any]):
-                try:
-                    async with httpx.AsyncClient(timeout=15) as client:
-                        await client.post(url, json=payload, headers={"content-type": "application/json; charset=utf-8"})
-                except Exception:
-                    # Swallow callback errors and continue
-                    pass
-            try:
-                asyncio.create_task(_send_callback(callback_url, response))
-            except Exception:
-                pass
+        # Optional callback: POST result to external URL via the shared dispatcher
+        if callback_url:
+            await _callback_dispatcher.submit(callback_url, response)
         return response
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Vector search failed: {e}")
@@ -729,33 +2313,215 @@ async def search_callback(request: Request):
     return {"status": "ok"}
 
 
+# -----------------------------
+# Ingestion job status / SSE progress
+# -----------------------------
+async def _pipeline_snapshot() -> Dict[str, Any]:
+    """Subset of LightRAG's shared pipeline_status for progress reporting."""
+    try:
+        pipeline_status = await get_namespace_data("pipeline_status")
+        return {
+            k: pipeline_status.get(k)
+            for k in (
+                "busy",
+                "job_name",
+                "docs",
+                "batchs",
+                "cur_batch",
+                "extract_calls_saved",
+                "extract_tokens_saved",
+                "gleaning_calls",
+                "gleaning_skipped",
+                "gleaning_new_entities",
+                "gleaning_new_relations",
+                "batch_merge_vdb_upserts_saved",
+                "batch_merge_summary_calls_saved",
+                "summary_llm_calls",
+                "summary_tokens",
+                "summary_folds",
+                "stages",
+                "latest_message",
+            )
+        }
+    except Exception:
+        return {}
+
+
+@app.get("/jobs")
+async def list_jobs():
+    return {
+        "jobs": [
+            _job_manager.summary(j) for j in reversed(list(_job_manager.jobs.values()))
+        ]
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = _job_manager.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    files = {p: dict(info) for p, info in job["files"].items()}
+    # Enrich with LightRAG doc_status (chunks, error_msg, completion) for
+    # files that reached insertion
+    doc_ids = [info["doc_id"] for info in files.values() if info.get("doc_id")]
+    if doc_ids and lightrag_instance is not None:
+        try:
+            statuses = await lightrag_instance.aget_docs_by_ids(doc_ids)
+            completion = await lightrag_instance.aget_docs_completion(
+                doc_ids, statuses=statuses
+            )
+            for info in files.values():
+                st = statuses.get(info.get("doc_id"))
+                if st is None:
+                    continue
+                st = st if isinstance(st, dict) else vars(st)
+                info["doc_status"] = str(st.get("status"))
+                info["chunks_count"] = st.get("chunks_count")
+                info["completion_percent"] = completion.get(info.get("doc_id"))
+                if st.get("error_msg"):
+                    info["error_msg"] = st.get("error_msg")
+        except Exception:
+            pass
+    return {
+        **job,
+        "files": files,
+        "pipeline": await _pipeline_snapshot()
+        if not _job_manager.is_finished(job)
+        else None,
+    }
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-Sent Events stream: `snapshot`, then `file`/`status` updates, then `done`."""
+    job = _job_manager.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    def _sse(event: str, data: Dict[str, Any]) -> str:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+    async def _stream():
+        queue = _job_manager.subscribe(job_id)
+        try:
+            yield _sse("snapshot", job)
+            if _job_manager.is_finished(job):
+                yield _sse("done", _job_manager.summary(job))
+                return
+            while True:
+                try:
+                    item = await asyncio.wait_for(
+                        queue.get(), timeout=JOB_SSE_HEARTBEAT
+                    )
+                except asyncio.TimeoutError:
+                    pipeline = await _pipeline_snapshot()
+                    yield _sse("pipeline", pipeline) if pipeline else ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                event, data = item
+                yield _sse(event, data)
+        finally:
+            _job_manager.unsubscribe(job_id, queue)
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -----------------------------
+# Callback delivery metrics
+# -----------------------------
+@app.get("/callbacks/stats")
+async def callback_stats():
+    return _callback_dispatcher.snapshot()
+
+
+@app.get("/cache/stats")
+async def answer_cache_stats():
+    return await _answer_cache.snapshot()
+
+
+@app.post("/cache/clear")
+async def answer_cache_clear():
+    await _answer_cache.invalidate()
+    return {"status": "ok", "data_version": await _answer_cache.data_version()}
+
+
+@app.get("/embedding_cache/stats")
+async def embedding_cache_stats():
+    if lightrag_instance is None:
+        raise HTTPException(status_code=500, detail="LightRAG 未初始化")
+    return lightrag_instance.embedding_cache_stats()
+
+
+@app.get("/concurrency/stats")
+async def concurrency_stats():
+    if lightrag_instance is None:
+        raise HTTPException(status_code=500, detail="LightRAG 未初始化")
+    return lightrag_instance.concurrency_stats()
+
+
+@app.get("/watcher/stats")
+async def watcher_stats():
+    if _watch_pipeline is None:
+        return {"enabled": False}
+    return {"enabled": True, **_watch_pipeline.snapshot()}
+
+
+# -----------------------------
+# History reader (paged, JSONL)
+# -----------------------------
+@app.get("/history")
+async def get_history(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=1000),
+    event_type: Optional[str] = Query(None, alias="type"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+):
+    """分页读取历史记录（默认最新在前），可按 `type` 过滤，例如 `query`、`ingest_upload`。"""
+    try:
+        return await asyncio.to_thread(
+            _history_writer.read_page, offset, limit, event_type, order == "desc"
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Read history failed: {e}")
+
+
 # -----------------------------
 # Admin: reset Qdrant collections (方案A)
 # -----------------------------
 @app.post("/admin/reset_qdrant")
 async def admin_reset_qdrant(req: ResetQdrantRequest = Body(...)):
     """
-    删除（并可选重建）LightRAG使用的 Qdrant 集合，使其与当前 EMBED_DIM 对齐。
+    删除（并可选重建）LightRAG使用的 Qdrant 集合，使其与当前嵌入维度（EMBED_DIM 或启动时探测结果）对齐。
 
     注意：该操作会清空向量数据，需要重建索引（/ingest_auto 或 /ingest_upload）。
     """
     if not req.confirm:
-        raise HTTPException(status_code=400, detail="Refused: set confirm=true to proceed.")
+        raise HTTPException(
+            status_code=400, detail="Refused: set confirm=true to proceed."
+        )
     if not QDRANT_CLIENT_AVAILABLE:
-        raise HTTPException(status_code=500, detail="qdrant-client not available for admin operation")
+        raise HTTPException(
+            status_code=500, detail="qdrant-client not available for admin operation"
+        )
     if not QDRANT_URL:
-        raise HTTPException(status_code=500, detail="Missing QDRANT_URL for admin operation")
+        raise HTTPException(
+            status_code=500, detail="Missing QDRANT_URL for admin operation"
+        )
 
-    # Default target collections based on LightRAG naming convention
-    default_collections = [
-        "lightrag_vdb_chunks",
-        "lightrag_vdb_entities",
-        "lightrag_vdb_relationships",
-    ]
-    target_collections = req.collections or default_collections
+    target_collections = req.collections or LIGHTRAG_QDRANT_COLLECTIONS
 
     client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-    results: Dict[str, Any] = {"deleted": {}, "recreated": {}, "embed_dim": EMBED_DIM}
+    results: Dict[str, Any] = {
+        "deleted": {},
+        "recreated": {},
+        "embed_dim": _embed_dim_state.dim,
+    }
 
     # Delete existing collections if present
     for name in target_collections:
@@ -773,14 +2539,14 @@ async def admin_reset_qdrant(req: ResetQdrantRequest = Body(...)):
         except Exception as e:
             results["deleted"][name] = f"error: {e}"
 
-    # Optionally recreate with current EMBED_DIM
+    # Optionally recreate with the active embedding dimension
     if req.recreate:
         for name in target_collections:
             try:
                 client.create_collection(
                     name,
                     vectors_config=models.VectorParams(
-                        size=EMBED_DIM,
+                        size=_embed_dim_state.dim,
                         distance=models.Distance.COSINE,
                     ),
                     hnsw_config=models.HnswConfigDiff(payload_m=16, m=0),
@@ -801,11 +2567,18 @@ async def admin_reset_qdrant(req: ResetQdrantRequest = Body(...)):
             except Exception as e:
                 results["recreated"][name] = f"error: {e}"
 
+    # 向量已清空：忘记已入库的内容哈希，否则重新入库时旧文件会被当作重复跳过
+    try:
+        results["hash_index_cleared"] = await _hash_index.clear()
+    except Exception as e:
+        results["hash_index_cleared"] = f"error: {e}"
+
     # 提示需要重启服务以确保 LightRAG 内部状态与集合匹配（或继续使用无需重启但需重新索引）
     results["next_steps"] = [
         "如果未选择 recreate=true，请重启服务后再执行索引（ingest），集合会在首次使用时按 EMBED_DIM 自动创建。",
         "如选择了 recreate=true，可以直接执行 /ingest_auto 或 /ingest_upload 重建索引。",
     ]
+    await _answer_cache.invalidate()
     _append_history("admin_reset_qdrant", {"request": req.dict(), "response": results})
     return results
 
@@ -822,6 +2595,26 @@ async def admin_reset_qdrant(req: ResetQdrantRequest = Body(...)):
 #   COSINE_THRESHOLD, LIGHTRAG_WORKING_DIR, WORKSPACE,
 #   EMBED_DIM_AUTODETECT, EMBED_DIM_COERCE,
 #   SERVICE_VERSION, DEFAULT_IMPORT_DIR, UPLOAD_TARGET_DIR,
-#   FILE_WATCH_ENABLED, FILE_WATCH_EXTS, FILE_WATCH_RECURSIVE, FILE_WATCH_DEBOUNCE_MS
+#   FILE_WATCH_ENABLED, FILE_WATCH_EXTS, FILE_WATCH_RECURSIVE, FILE_WATCH_DEBOUNCE_MS,
+#   FILE_WATCH_BATCH_MAX, FILE_WATCH_QUEUE_SIZE, INGEST_CONCURRENCY,
+#   UPLOAD_MAX_BYTES, UPLOAD_CHUNK_SIZE,
+#   HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL_MS, HISTORY_FSYNC, HISTORY_MAX_BYTES,
+#   HISTORY_BACKUP_COUNT, HISTORY_QUEUE_SIZE,
+#   CALLBACK_TIMEOUT, CALLBACK_WORKERS, CALLBACK_QUEUE_SIZE, CALLBACK_ENQUEUE_TIMEOUT,
+#   CALLBACK_MAX_RETRIES, CALLBACK_RETRY_BASE, CALLBACK_RETRY_MAX,
+#   CALLBACK_PER_HOST_CONCURRENCY, CALLBACK_DRAIN_TIMEOUT,
+#   JOB_HISTORY_LIMIT, JOB_SSE_HEARTBEAT,
+#   ANSWER_CACHE_ENABLED, ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES,
+#   ANSWER_CACHE_REDIS_URL, QUERY_BATCH_MAX_QUESTIONS, QUERY_BATCH_CONCURRENCY,
+#   ADAPTIVE_CONCURRENCY, ADAPTIVE_CONCURRENCY_MIN, ADAPTIVE_CONCURRENCY_MAX_FACTOR,
+#   LLM_RPM_LIMIT, LLM_TPM_LIMIT, LLM_RATE_LIMIT_KEY, LLM_OUTPUT_TOKENS_ESTIMATE,
+#   EMBEDDING_RPM_LIMIT, EMBEDDING_TPM_LIMIT, EMBEDDING_RATE_LIMIT_KEY,
+#   ENABLE_EMBEDDING_CACHE, EMBEDDING_CACHE_MAX_ENTRIES,
+#   ENTITY_EXTRACT_PROMPT_LAYOUT, ENTITY_EXTRACT_PACK_CHUNKS,
+#   ENTITY_EXTRACT_PACK_MAX_TOKENS, ENTITY_EXTRACT_PACK_MAX_CHUNKS,
+#   ENTITY_EXTRACT_GLEANING_POLICY, ENTITY_EXTRACT_GLEAN_MIN_DENSITY,
+#   MAX_PARALLEL_INSERT, MAX_PARALLEL_MERGE, MERGE_BATCH_SIZE, MERGE_BATCH_WINDOW,
+#   ENABLE_EXTRACTION_CHECKPOINT, SUMMARY_MODE, SUMMARY_REBUILD_INTERVAL
+#   (read by LightRAG)
 # - Supports: upload PDFs/MD/DOCX (parsed via mineru in RAGAnything), and direct file paths; if none provided, scans DEFAULT_IMPORT_DIR
-# - Vector DB: configured to use QdrantVectorDBStorage via env variables
\ No newline at end of file
+# - Vector DB: configured to use QdrantVectorDBStorage via env variables
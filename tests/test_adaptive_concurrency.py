@@ -0,0 +1,230 @@
+"""
+Unit tests for the adaptive (AIMD) concurrency limit (lightrag.utils).
+
+Covers AdaptiveConcurrencyLimiter on its own (additive increase, multiplicative
+decrease, bounds, gate behaviour) and through priority_limit_async_func_call
+(429/timeout handling and progress when the limit drops below the number of
+calls in flight).
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.utils import (
+    AdaptiveConcurrencyLimiter,
+    WorkerTimeoutError,
+    priority_limit_async_func_call,
+)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+def run_saturated(limiter: AdaptiveConcurrencyLimiter, outcome: str, rounds: int):
+    """Finish ``rounds`` calls while every slot of the current limit is executing."""
+    for _ in range(rounds):
+        for _ in range(limiter.limit):
+            limiter.started()
+        limiter.finished(0.1, outcome)
+        for _ in range(limiter.limit - 1):
+            limiter.finished(0.1, None)
+
+
+class TestAdaptiveConcurrencyLimiter:
+    def test_limit_grows_on_saturated_success(self):
+        limiter = AdaptiveConcurrencyLimiter(8, min_limit=1, initial_limit=2)
+
+        run_saturated(limiter, "ok", rounds=10)
+
+        assert limiter.limit > 2
+        assert limiter.snapshot()["limit_increases"] >= 1
+
+    def test_limit_does_not_grow_when_not_saturated(self):
+        limiter = AdaptiveConcurrencyLimiter(8, min_limit=1, initial_limit=4)
+
+        for _ in range(50):
+            limiter.started()
+            limiter.finished(0.1, "ok")
+
+        assert limiter.limit == 4
+
+    def test_limit_does_not_grow_on_slow_calls(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            8, min_limit=1, initial_limit=2, latency_tolerance=2.0
+        )
+        limiter.started()
+        limiter.finished(0.1, "ok")  # baseline
+
+        for _ in range(10):
+            limiter.started()
+            limiter.started()
+            limiter.finished(1.0, "ok")
+            limiter.finished(1.0, None)
+
+        assert limiter.limit == 2
+
+    def test_limit_halves_on_overload_with_cooldown(self):
+        limiter = AdaptiveConcurrencyLimiter(16, initial_limit=16, cooldown=60)
+
+        limiter.started()
+        limiter.finished(0.1, "overload")
+        assert limiter.limit == 8
+
+        # A burst of failures from the same overload only counts once
+        for _ in range(5):
+            limiter.started()
+            limiter.finished(0.1, "overload")
+        assert limiter.limit == 8
+        assert limiter.snapshot()["overload_errors"] == 6
+
+    def test_other_errors_do_not_shrink_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(8, cooldown=0)
+
+        limiter.started()
+        limiter.finished(0.1, "error")
+
+        assert limiter.limit == 8
+
+    def test_limit_stays_within_bounds(self):
+        limiter = AdaptiveConcurrencyLimiter(
+            6, min_limit=2, initial_limit=4, cooldown=0
+        )
+
+        for _ in range(20):
+            limiter.started()
+            limiter.finished(0.1, "overload")
+        assert limiter.limit == 2
+
+        run_saturated(limiter, "ok", rounds=500)
+        assert limiter.limit == 6
+
+    def test_non_adaptive_limit_is_pinned(self):
+        limiter = AdaptiveConcurrencyLimiter(4, adaptive=False, cooldown=0)
+
+        limiter.started()
+        limiter.finished(0.1, "overload")
+
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_gate_waits_until_held_below_lowered_limit(self):
+        limiter = AdaptiveConcurrencyLimiter(4, initial_limit=4, cooldown=0)
+        for _ in range(4):
+            await limiter.acquire()
+
+        limiter.started()
+        limiter.finished(0.1, "overload")  # limit 4 -> 2 with 4 slots held
+        waiter = asyncio.ensure_future(limiter.acquire())
+
+        limiter.release()  # held 3
+        limiter.release()  # held 2
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.release()  # held 1 < limit 2
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter._held == 2
+
+
+class TestAdaptivePriorityQueue:
+    @pytest.mark.asyncio
+    async def test_429_shrinks_limit(self):
+        async def func(fail):
+            if fail:
+                raise RateLimited("too many requests")
+            return "ok"
+
+        wrapped = priority_limit_async_func_call(
+            4, adaptive=True, adaptive_max_size=8, queue_name="test_429"
+        )(func)
+        try:
+            with pytest.raises(RateLimited):
+                await wrapped(True)
+            metrics = wrapped.metrics()
+            assert metrics["limit"] == 2
+            assert metrics["overload_errors"] == 1
+        finally:
+            await wrapped.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_timeout_shrinks_limit(self):
+        async def func():
+            await asyncio.sleep(1)
+
+        wrapped = priority_limit_async_func_call(
+            4,
+            max_execution_timeout=0.05,
+            adaptive=True,
+            adaptive_max_size=8,
+            queue_name="test_timeout",
+        )(func)
+        try:
+            with pytest.raises(TimeoutError):
+                await wrapped()
+            assert wrapped.metrics()["limit"] == 2
+        finally:
+            await wrapped.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_limit_grows_under_load(self):
+        async def func():
+            await asyncio.sleep(0.01)
+            return "ok"
+
+        wrapped = priority_limit_async_func_call(
+            2, adaptive=True, adaptive_max_size=6, queue_name="test_grow"
+        )(func)
+        try:
+            await asyncio.gather(*(wrapped() for _ in range(60)))
+            metrics = wrapped.metrics()
+            assert 2 < metrics["limit"] <= 6
+        finally:
+            await wrapped.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_no_deadlock_when_limit_drops_below_in_flight(self):
+        release = asyncio.Event()
+        running = 0
+
+        async def func(fail):
+            nonlocal running
+            running += 1
+            try:
+                if fail:
+                    raise RateLimited("too many requests")
+                await release.wait()
+                return "ok"
+            finally:
+                running -= 1
+
+        wrapped = priority_limit_async_func_call(
+            4, adaptive=True, adaptive_max_size=4, queue_name="test_deadlock"
+        )(func)
+        try:
+            slow = [asyncio.ensure_future(wrapped(False)) for _ in range(3)]
+            await asyncio.sleep(0.05)
+            with pytest.raises(RateLimited):
+                await wrapped(True)
+            assert wrapped.metrics()["limit"] == 2
+
+            # Queued behind three in-flight calls with a limit of two
+            queued = [asyncio.ensure_future(wrapped(False)) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            assert running == 3  # none of them started over the lowered limit
+            release.set()
+
+            results = await asyncio.wait_for(asyncio.gather(*slow, *queued), timeout=10)
+            assert results == ["ok"] * 8
+            assert wrapped.metrics()["in_flight"] == 0
+        finally:
+            await wrapped.shutdown()
+
+
+def test_worker_timeout_counts_as_overload():
+    from lightrag.utils import _is_overload_error
+
+    assert _is_overload_error(WorkerTimeoutError(1.0))
+    assert _is_overload_error(RateLimited())
+    assert not _is_overload_error(ValueError("bad input"))
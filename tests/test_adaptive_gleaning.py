@@ -0,0 +1,118 @@
+"""
+Unit tests for the adaptive gleaning policy (lightrag.operate).
+
+With entity_extract_gleaning_policy="adaptive" the gleaning pass only runs for
+chunks whose first extraction looks incomplete: truncated output, parse
+anomalies or an entity density below entity_extract_glean_min_density.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.operate import _gleaning_reason, extract_entities
+
+D = "<|#|>"
+DONE = "<|COMPLETE|>"
+
+
+def entity(name: str) -> str:
+    return f"entity{D}{name}{D}person{D}{name} is a person."
+
+
+class FakeLLM:
+    """Returns ``first`` for the extraction request and ``glean`` for gleaning."""
+
+    def __init__(self, first: str, glean: str):
+        self.first = first
+        self.glean = glean
+        self.glean_calls = 0
+
+    async def __call__(self, prompt, system_prompt=None, history_messages=None, **kw):
+        if history_messages:
+            self.glean_calls += 1
+            return self.glean
+        return self.first
+
+
+async def extract(llm, policy: str, tokens: int = 100, max_gleaning: int = 1):
+    status = {"history_messages": []}
+    results = await extract_entities(
+        {"chunk-1": {"content": "text", "tokens": tokens, "full_doc_id": "doc-1"}},
+        {
+            "llm_model_func": llm,
+            "entity_extract_max_gleaning": max_gleaning,
+            "entity_extract_gleaning_policy": policy,
+            "entity_extract_glean_min_density": 5.0,
+            "addon_params": {},
+        },
+        pipeline_status=status,
+        pipeline_status_lock=asyncio.Lock(),
+    )
+    nodes, _ = results[0]
+    return set(nodes), status
+
+
+@pytest.mark.parametrize(
+    "stats, tokens, entities, reason",
+    [
+        ({"truncated": True}, 100, 5, "truncated output"),
+        ({"format_error": True}, 100, 5, "parse anomalies"),
+        ({"unparsed_records": 2}, 100, 5, "parse anomalies"),
+        ({}, 1000, 2, "low entity density"),
+        ({}, 1000, 5, None),
+        ({}, 0, 0, None),
+    ],
+)
+def test_gleaning_reason(stats, tokens, entities, reason):
+    assert _gleaning_reason(stats, tokens, entities, 5.0) == reason
+
+
+class TestAdaptiveGleaning:
+    @pytest.mark.asyncio
+    async def test_complete_dense_output_skips_gleaning(self):
+        llm = FakeLLM(f"{entity('Alpha')}\n{DONE}", f"{entity('Beta')}\n{DONE}")
+
+        names, status = await extract(llm, "adaptive")
+
+        assert llm.glean_calls == 0
+        assert names == {"Alpha"}
+        assert status["gleaning_skipped"] == 1
+        assert status["gleaning_calls"] == 0
+
+    @pytest.mark.asyncio
+    async def test_truncated_output_is_gleaned(self):
+        llm = FakeLLM(entity("Alpha"), f"{entity('Beta')}\n{DONE}")
+
+        names, status = await extract(llm, "adaptive")
+
+        assert llm.glean_calls == 1
+        assert names == {"Alpha", "Beta"}
+        assert status["gleaning_calls"] == 1
+        assert status["gleaning_new_entities"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sparse_chunk_is_gleaned(self):
+        llm = FakeLLM(f"{entity('Alpha')}\n{DONE}", f"{entity('Beta')}\n{DONE}")
+
+        names, _ = await extract(llm, "adaptive", tokens=1000)
+
+        assert llm.glean_calls == 1
+        assert names == {"Alpha", "Beta"}
+
+    @pytest.mark.asyncio
+    async def test_always_policy_gleans_every_chunk(self):
+        llm = FakeLLM(f"{entity('Alpha')}\n{DONE}", f"{entity('Beta')}\n{DONE}")
+
+        await extract(llm, "always")
+
+        assert llm.glean_calls == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_gleaning_is_never_run(self):
+        llm = FakeLLM(entity("Alpha"), f"{entity('Beta')}\n{DONE}")
+
+        _, status = await extract(llm, "adaptive", max_gleaning=0)
+
+        assert llm.glean_calls == 0
+        assert "gleaning_calls" not in status
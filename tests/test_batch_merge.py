@@ -0,0 +1,219 @@
+"""
+Unit tests for the cross-document batch merge (lightrag.operate.merge_nodes_and_edges).
+
+With doc_chunk_results, an entity or relation mentioned by several documents of
+the batch is merged, upserted and embedded once, while full_entities and
+full_relations are still written per document.
+"""
+
+import asyncio
+from collections import Counter
+
+import pytest
+
+from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.kg.shared_storage import initialize_share_data
+from lightrag.operate import merge_nodes_and_edges
+
+GLOBAL_CONFIG = {
+    "workspace": "batch-merge-test",
+    "llm_model_max_async": 2,
+    "source_ids_limit_method": "FIFO",
+    "max_source_ids_per_entity": 100,
+    "max_source_ids_per_relation": 100,
+    "max_file_paths": 100,
+    "file_path_more_placeholder": "more",
+    "summary_mode": "full",
+    "force_llm_summary_on_merge": 8,
+}
+
+
+class FakeGraph:
+    def __init__(self):
+        self.nodes: dict[str, dict] = {}
+        self.edges: dict[tuple[str, str], dict] = {}
+        self.node_writes = Counter()
+
+    async def get_node(self, name):
+        node = self.nodes.get(name)
+        return dict(node) if node else None
+
+    async def has_node(self, name):
+        return name in self.nodes
+
+    async def upsert_node(self, name, node_data):
+        self.node_writes[name] += 1
+        self.nodes[name] = dict(node_data)
+
+    async def has_edge(self, src, tgt):
+        return tuple(sorted((src, tgt))) in self.edges
+
+    async def get_edge(self, src, tgt):
+        return dict(self.edges[tuple(sorted((src, tgt)))])
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[tuple(sorted((src, tgt)))] = dict(edge_data)
+
+
+class FakeVectorStorage:
+    def __init__(self):
+        self.records: dict[str, dict] = {}
+        self.upserted = Counter()
+
+    async def get_by_id(self, vdb_id):
+        return self.records.get(vdb_id)
+
+    async def upsert(self, data):
+        for vdb_id, payload in data.items():
+            self.upserted[vdb_id] += 1
+            self.records[vdb_id] = dict(payload)
+
+    async def delete(self, ids):
+        for vdb_id in ids:
+            self.records.pop(vdb_id, None)
+
+
+class FakeKVStorage:
+    def __init__(self):
+        self.data: dict[str, dict] = {}
+
+    async def get_by_id(self, key):
+        return self.data.get(key)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+
+def entity(name: str, chunk: str) -> dict:
+    return {
+        "entity_name": name,
+        "entity_type": "person",
+        "description": f"{name} appears in the documents.",
+        "source_id": chunk,
+        "file_path": f"{chunk}.txt",
+    }
+
+
+def relation(src: str, tgt: str, chunk: str) -> dict:
+    return {
+        "src_id": src,
+        "tgt_id": tgt,
+        "description": f"{src} works with {tgt}.",
+        "keywords": "collaboration",
+        "weight": 1.0,
+        "source_id": chunk,
+        "file_path": f"{chunk}.txt",
+    }
+
+
+def chunk_result(chunk: str, names: list[str], pairs: list[tuple[str, str]]):
+    return (
+        {name: [entity(name, chunk)] for name in names},
+        {pair: [relation(*pair, chunk)] for pair in pairs},
+    )
+
+
+DOC_CHUNK_RESULTS = {
+    "doc-1": [
+        chunk_result("chunk-1", ["Zorvath", "Quillon"], [("Zorvath", "Quillon")])
+    ],
+    "doc-2": [
+        chunk_result("chunk-2", ["Zorvath", "Quillon"], [("Zorvath", "Quillon")])
+    ],
+    "doc-3": [chunk_result("chunk-3", ["Marnick"], [])],
+}
+
+
+async def run_merge(graph, entity_vdb, relation_vdb, status, doc_chunk_results):
+    full_entities, full_relations = FakeKVStorage(), FakeKVStorage()
+    await merge_nodes_and_edges(
+        chunk_results=[],
+        knowledge_graph_inst=graph,
+        entity_vdb=entity_vdb,
+        relationships_vdb=relation_vdb,
+        global_config=GLOBAL_CONFIG,
+        full_entities_storage=full_entities,
+        full_relations_storage=full_relations,
+        pipeline_status=status,
+        pipeline_status_lock=asyncio.Lock(),
+        doc_chunk_results=doc_chunk_results,
+    )
+    return full_entities, full_relations
+
+
+@pytest.fixture
+def status():
+    initialize_share_data()
+    return {"history_messages": []}
+
+
+class TestBatchMerge:
+    @pytest.mark.asyncio
+    async def test_shared_entities_are_written_once_per_batch(self, status):
+        graph, entity_vdb, relation_vdb = (
+            FakeGraph(),
+            FakeVectorStorage(),
+            FakeVectorStorage(),
+        )
+
+        await run_merge(graph, entity_vdb, relation_vdb, status, DOC_CHUNK_RESULTS)
+
+        assert set(graph.node_writes.values()) == {1}
+        assert set(entity_vdb.upserted.values()) == {1}
+        assert set(relation_vdb.upserted.values()) == {1}
+        sources = graph.nodes["Zorvath"]["source_id"].split(GRAPH_FIELD_SEP)
+        assert sources == ["chunk-1", "chunk-2"]
+        edge_sources = graph.edges[("Quillon", "Zorvath")]["source_id"]
+        assert edge_sources.split(GRAPH_FIELD_SEP) == ["chunk-1", "chunk-2"]
+        # Zorvath, Quillon and their relation are each shared by two documents
+        assert status["batch_merge_vdb_upserts_saved"] == 3
+        assert status["batch_merge_summary_calls_saved"] == 0
+
+    @pytest.mark.asyncio
+    async def test_document_indexes_are_written_per_document(self, status):
+        full_entities, full_relations = await run_merge(
+            FakeGraph(),
+            FakeVectorStorage(),
+            FakeVectorStorage(),
+            status,
+            DOC_CHUNK_RESULTS,
+        )
+
+        entity_names = {
+            doc_id: sorted(record["entity_names"])
+            for doc_id, record in full_entities.data.items()
+        }
+        assert entity_names == {
+            "doc-1": ["Quillon", "Zorvath"],
+            "doc-2": ["Quillon", "Zorvath"],
+            "doc-3": ["Marnick"],
+        }
+        assert sorted(full_relations.data) == ["doc-1", "doc-2"]
+        assert full_relations.data["doc-2"]["relation_pairs"] == [
+            ["Quillon", "Zorvath"]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_batch_matches_sequential_merges(self, status):
+        batched = FakeGraph()
+        await run_merge(
+            batched, FakeVectorStorage(), FakeVectorStorage(), status, DOC_CHUNK_RESULTS
+        )
+        sequential = FakeGraph()
+        for doc_id, chunk_results in DOC_CHUNK_RESULTS.items():
+            await run_merge(
+                sequential,
+                FakeVectorStorage(),
+                FakeVectorStorage(),
+                status,
+                {doc_id: chunk_results},
+            )
+
+        def comparable(graph):
+            keep = ("entity_type", "source_id", "file_path", "description")
+            return {
+                name: {k: node[k] for k in keep} for name, node in graph.nodes.items()
+            }
+
+        assert comparable(batched) == comparable(sequential)
+        assert batched.edges.keys() == sequential.edges.keys()
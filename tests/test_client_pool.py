@@ -0,0 +1,68 @@
+"""
+Unit tests for the shared LLM/embedding client pool (lightrag.llm.client_pool).
+
+Clients are shared by every LightRAG instance on an event loop; finalizing one
+instance must not close clients another instance is still using.
+"""
+
+import pytest
+
+from lightrag.llm.client_pool import ClientPool
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class TestClientPool:
+    @pytest.mark.asyncio
+    async def test_same_settings_share_a_client(self):
+        pool = ClientPool()
+
+        first = pool.get("openai", FakeClient, base_url="http://a", api_key="k")
+        second = pool.get("openai", FakeClient, base_url="http://a", api_key="k")
+        other = pool.get("openai", FakeClient, base_url="http://b", api_key="k")
+
+        assert first is second
+        assert other is not first
+        assert pool.stats()["created"] == 2
+        await pool.aclose()
+
+    @pytest.mark.asyncio
+    async def test_clients_close_with_last_holder(self):
+        pool = ClientPool()
+        pool.hold()  # workspace A
+        pool.hold()  # workspace B
+        client = pool.get("openai", FakeClient, base_url="http://a")
+
+        await pool.release()  # A finalized while B keeps calling the LLM
+        assert not client.closed
+        assert pool.get("openai", FakeClient, base_url="http://a") is client
+
+        await pool.release()  # B finalized
+        assert client.closed
+        assert pool.stats()["clients"] == 0
+
+    @pytest.mark.asyncio
+    async def test_release_without_holders_closes(self):
+        pool = ClientPool()
+        client = pool.get("ollama", FakeClient, base_url="http://a")
+
+        await pool.release()
+
+        assert client.closed
+
+    @pytest.mark.asyncio
+    async def test_aclose_ignores_holders(self):
+        pool = ClientPool()
+        pool.hold()
+        client = pool.get("openai", FakeClient)
+
+        await pool.aclose()
+
+        assert client.closed
+        assert pool.stats()["holders"] == 0
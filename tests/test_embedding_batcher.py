@@ -0,0 +1,147 @@
+"""
+Unit tests for EmbeddingBatcher (lightrag.utils).
+
+Covers row scatter and deduplication across coalesced callers, urgent
+(``_priority``) flushing, splitting by item/token budget, error propagation
+and retention of in-flight batch tasks.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from lightrag.utils import EmbeddingBatcher
+
+
+def make_embed(calls: list, fail: Exception | None = None, delay: float = 0.0):
+    """Fake embedding function: each text maps to [len(text), ord(first char)]."""
+
+    async def embed(texts, **kwargs):
+        calls.append((list(texts), dict(kwargs)))
+        if delay:
+            await asyncio.sleep(delay)
+        if fail is not None:
+            raise fail
+        return np.array([[len(t), ord(t[0])] for t in texts], dtype=float)
+
+    return embed
+
+
+def expected(texts):
+    return np.array([[len(t), ord(t[0])] for t in texts], dtype=float)
+
+
+class TestEmbeddingBatcher:
+    @pytest.mark.asyncio
+    async def test_scatter_and_dedup(self):
+        """Concurrent callers share one request and each gets only its own rows."""
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls), max_batch_size=32, max_wait=0.05)
+
+        first = ["alpha", "beta", "gamma"]
+        second = ["beta", "delta", "alpha"]
+        r1, r2 = await asyncio.gather(batcher(first), batcher(second))
+
+        assert len(calls) == 1
+        assert calls[0][0] == ["alpha", "beta", "gamma", "delta"]
+        np.testing.assert_array_equal(r1, expected(first))
+        np.testing.assert_array_equal(r2, expected(second))
+        assert batcher.stats() == {
+            "calls": 1,
+            "texts_requested": 6,
+            "texts_embedded": 4,
+        }
+
+    @pytest.mark.asyncio
+    async def test_calls_with_different_kwargs_are_not_merged(self):
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls), max_wait=0.01)
+
+        await asyncio.gather(batcher(["a"], _priority=12), batcher(["b"], _priority=15))
+
+        assert sorted((c[0], c[1]["_priority"]) for c in calls) == [
+            (["a"], 12),
+            (["b"], 15),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_priority_call_skips_wait_window(self):
+        """Calls below urgent_below flush on the next loop iteration."""
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls), max_wait=30, urgent_below=10)
+
+        result = await asyncio.wait_for(batcher(["query"], _priority=5), timeout=1)
+
+        np.testing.assert_array_equal(result, expected(["query"]))
+        assert calls == [(["query"], {"_priority": 5})]
+
+    @pytest.mark.asyncio
+    async def test_background_call_waits_for_window(self):
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls), max_wait=30, urgent_below=10)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(batcher(["chunk"], _priority=12), timeout=0.05)
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_split_by_item_budget(self):
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls), max_batch_size=2, max_wait=0.01)
+
+        texts = ["t1", "t2", "t3", "t4", "t5"]
+        result = await batcher(texts)
+
+        assert [c[0] for c in calls] == [["t1", "t2"], ["t3", "t4"], ["t5"]]
+        np.testing.assert_array_equal(result, expected(texts))
+
+    @pytest.mark.asyncio
+    async def test_split_by_token_budget(self):
+        calls = []
+        batcher = EmbeddingBatcher(
+            make_embed(calls),
+            max_batch_size=32,
+            max_wait=0.01,
+            max_tokens=10,
+            token_counter=len,
+        )
+
+        texts = ["aaaa", "bbbb", "cccc", "dddddddddddd", "e"]
+        result = await batcher(texts)
+
+        # A single text over the budget still goes out on its own
+        assert [c[0] for c in calls] == [
+            ["aaaa", "bbbb"],
+            ["cccc"],
+            ["dddddddddddd"],
+            ["e"],
+        ]
+        np.testing.assert_array_equal(result, expected(texts))
+
+    @pytest.mark.asyncio
+    async def test_exception_reaches_every_caller(self):
+        calls = []
+        error = RuntimeError("provider down")
+        batcher = EmbeddingBatcher(make_embed(calls, fail=error), max_wait=0.01)
+
+        results = await asyncio.gather(
+            batcher(["a"]), batcher(["b", "c"]), return_exceptions=True
+        )
+
+        assert len(calls) == 1
+        assert all(r is error for r in results)
+
+    @pytest.mark.asyncio
+    async def test_running_batches_are_referenced(self):
+        """In-flight batch tasks are held by the batcher and released when done."""
+        calls = []
+        batcher = EmbeddingBatcher(make_embed(calls, delay=0.05), max_wait=0.001)
+
+        pending = asyncio.ensure_future(batcher(["a", "b"]))
+        await asyncio.sleep(0.02)
+        assert len(batcher._tasks) == 1
+
+        await pending
+        await asyncio.sleep(0)
+        assert not batcher._tasks
@@ -0,0 +1,156 @@
+"""
+Unit tests for resuming entity extraction from checkpoints (lightrag.operate).
+
+Every chunk's outcome is checkpointed per document as soon as it is known; a
+retry restores the chunks already done under the same extraction settings and
+only sends the missing ones to the LLM.
+"""
+
+import pytest
+
+from lightrag.operate import extract_entities, extraction_checkpoint_signature
+from lightrag.utils import make_extraction_checkpoint_key
+
+D = "<|#|>"
+DONE = "<|COMPLETE|>"
+
+CHUNKS = {
+    "chunk-a": {"content": "Zorvath", "tokens": 1, "full_doc_id": "doc-1"},
+    "chunk-b": {"content": "Quillon", "tokens": 1, "full_doc_id": "doc-1"},
+    "chunk-c": {"content": "Marnick", "tokens": 1, "full_doc_id": "doc-1"},
+}
+
+
+class FakeKVStorage:
+    def __init__(self):
+        self.data: dict[str, dict] = {}
+
+    async def get_by_ids(self, ids):
+        return [self.data.get(key) for key in ids]
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+    async def delete(self, ids):
+        for key in ids:
+            self.data.pop(key, None)
+
+
+class FakeLLM:
+    """Emits one entity named after the chunk text; fails for names in ``fail``."""
+
+    def __init__(self, fail: set[str] = frozenset()):
+        self.fail = fail
+        self.calls: list[str] = []
+
+    async def __call__(self, prompt, system_prompt=None, **kwargs):
+        text = f"{system_prompt or ''}\n{prompt}"
+        name = next(
+            chunk["content"] for chunk in CHUNKS.values() if chunk["content"] in text
+        )
+        self.calls.append(name)
+        if name in self.fail:
+            raise RuntimeError(f"LLM failed on {name}")
+        return f"entity{D}{name}{D}person{D}{name} is a person.\n{DONE}"
+
+
+def make_config(llm, **overrides) -> dict:
+    return {
+        "llm_model_func": llm,
+        "llm_model_name": "model-a",
+        "entity_extract_max_gleaning": 0,
+        "addon_params": {},
+        "llm_model_max_async": 1,
+        **overrides,
+    }
+
+
+def entity_names(chunk_results) -> set[str]:
+    return {name for nodes, _ in chunk_results for name in nodes}
+
+
+class TestExtractionCheckpoint:
+    @pytest.mark.asyncio
+    async def test_retry_extracts_only_missing_chunks(self):
+        storage = FakeKVStorage()
+        failing = FakeLLM(fail={"Marnick"})
+        with pytest.raises(RuntimeError):
+            await extract_entities(
+                CHUNKS, make_config(failing), checkpoint_storage=storage
+            )
+        checkpoint = storage.data[make_extraction_checkpoint_key("doc-1", "chunk-c")]
+        assert checkpoint["status"] == "failed"
+
+        retry = FakeLLM()
+        progress = []
+
+        async def on_progress(count):
+            progress.append(count)
+
+        results = await extract_entities(
+            CHUNKS,
+            make_config(retry),
+            checkpoint_storage=storage,
+            checkpoint_progress=on_progress,
+        )
+
+        assert retry.calls == ["Marnick"]
+        assert entity_names(results) == {"Zorvath", "Quillon", "Marnick"}
+        assert progress == [2, 3]
+
+    @pytest.mark.asyncio
+    async def test_changed_settings_extract_everything_again(self):
+        storage = FakeKVStorage()
+        await extract_entities(
+            CHUNKS, make_config(FakeLLM()), checkpoint_storage=storage
+        )
+
+        retry = FakeLLM()
+        await extract_entities(
+            CHUNKS,
+            make_config(retry, llm_model_name="model-b"),
+            checkpoint_storage=storage,
+        )
+
+        assert sorted(retry.calls) == ["Marnick", "Quillon", "Zorvath"]
+
+    @pytest.mark.asyncio
+    async def test_checkpoints_are_kept_per_document(self):
+        storage = FakeKVStorage()
+        shared = {"chunk-a": {**CHUNKS["chunk-a"], "full_doc_id": "doc-2"}}
+        await extract_entities(
+            CHUNKS, make_config(FakeLLM()), checkpoint_storage=storage
+        )
+        await extract_entities(
+            shared, make_config(FakeLLM()), checkpoint_storage=storage
+        )
+
+        # doc-1 finished and dropped its checkpoints; doc-2 still resumes
+        await storage.delete(
+            [make_extraction_checkpoint_key("doc-1", key) for key in CHUNKS]
+        )
+        retry = FakeLLM()
+        await extract_entities(shared, make_config(retry), checkpoint_storage=storage)
+
+        assert retry.calls == []
+
+
+@pytest.mark.parametrize(
+    "setting, value",
+    [
+        ("llm_model_name", "model-b"),
+        ("entity_extract_prompt_layout", "prefix_cache"),
+        ("entity_extract_pack_chunks", True),
+        ("entity_extract_pack_max_tokens", 600),
+        ("entity_extract_pack_max_chunks", 4),
+        ("entity_extract_max_gleaning", 1),
+        ("entity_extract_gleaning_policy", "always"),
+        ("entity_extract_glean_min_density", 0.5),
+    ],
+)
+def test_signature_covers_extraction_settings(setting, value):
+    config = make_config(None)
+
+    assert extraction_checkpoint_signature(config) != extraction_checkpoint_signature(
+        {**config, setting: value}
+    )
@@ -0,0 +1,165 @@
+"""
+Unit tests for incremental description summaries (lightrag.operate).
+
+In summary_mode="incremental" a merge folds the new descriptions into the
+stored LLM summary; the node keeps "<folds>:<summary hash>" in summary_state
+and a full summary is done again every summary_rebuild_interval folds.
+"""
+
+import asyncio
+
+import pytest
+
+from lightrag.operate import (
+    _merge_nodes_then_upsert,
+    _next_summary_state,
+    _stored_summary_folds,
+    _summary_state,
+)
+from lightrag.utils import Tokenizer
+
+
+class CharTokenizer:
+    def encode(self, content):
+        return [ord(c) for c in content]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class FakeGraph:
+    def __init__(self):
+        self.nodes: dict[str, dict] = {}
+
+    async def get_node(self, name):
+        node = self.nodes.get(name)
+        return dict(node) if node else None
+
+    async def upsert_node(self, name, node_data):
+        self.nodes[name] = dict(node_data)
+
+
+class FakeVectorStorage:
+    meta_fields = {"entity_name", "source_id", "content", "file_path"}
+
+    def __init__(self):
+        self.records: dict[str, dict] = {}
+
+    async def get_by_id(self, vdb_id):
+        return self.records.get(vdb_id)
+
+    async def upsert(self, data):
+        self.records.update(data)
+
+
+class SummaryLLM:
+    """Answers full summaries and folds with distinguishable, numbered texts."""
+
+    def __init__(self):
+        self.requests: list[str] = []
+
+    async def __call__(self, prompt, **kwargs):
+        kind = "fold" if "Existing Summary" in prompt else "full"
+        self.requests.append(kind)
+        return f"{kind} summary {len(self.requests)}"
+
+
+def make_config(llm, **overrides) -> dict:
+    return {
+        "llm_model_func": llm,
+        "tokenizer": Tokenizer("chars", CharTokenizer()),
+        "summary_context_size": 10000,
+        "summary_max_tokens": 5000,
+        "summary_length_recommended": 200,
+        "force_llm_summary_on_merge": 2,
+        "summary_mode": "incremental",
+        "summary_rebuild_interval": 2,
+        "addon_params": {},
+        "source_ids_limit_method": "FIFO",
+        "max_source_ids_per_entity": 100,
+        "max_file_paths": 100,
+        "file_path_more_placeholder": "more",
+        **overrides,
+    }
+
+
+def node(index: int) -> dict:
+    return {
+        "entity_type": "person",
+        "description": f"Fact number {index} about Zorvath.",
+        "source_id": f"chunk-{index}",
+        "file_path": "a.txt",
+    }
+
+
+class TestSummaryState:
+    def test_stored_folds_follow_the_summary_hash(self):
+        record = {"summary_state": _summary_state("summary text", 3)}
+
+        assert _stored_summary_folds(record, "summary text") == 3
+        # A rebuild rewrote the description: it is no longer that summary
+        assert _stored_summary_folds(record, "rewritten text") is None
+        assert _stored_summary_folds({"summary_state": "junk"}, "x") is None
+        assert _stored_summary_folds(None, "summary text") is None
+
+    @pytest.mark.parametrize(
+        "mode, folds, expected",
+        [
+            ("fold", 1, _summary_state("new", 2)),
+            ("full", 5, _summary_state("new", 0)),
+            (None, 1, "stored-state"),
+            (None, None, None),
+        ],
+    )
+    def test_next_summary_state(self, mode, folds, expected):
+        usage = {"mode": mode} if mode else {}
+        record = {"summary_state": "stored-state"}
+        config = {"summary_mode": "incremental"}
+
+        assert _next_summary_state(config, usage, "new", folds, record) == expected
+
+    def test_full_summary_mode_stores_no_state(self):
+        assert (
+            _next_summary_state(
+                {"summary_mode": "full"}, {"mode": "full"}, "s", 0, None
+            )
+            is None
+        )
+
+
+class TestIncrementalMerge:
+    @pytest.mark.asyncio
+    async def test_folds_until_rebuild_interval(self):
+        llm, graph, vdb = SummaryLLM(), FakeGraph(), FakeVectorStorage()
+        config = make_config(llm)
+        status, lock = {"history_messages": []}, asyncio.Lock()
+
+        states = []
+        for index in range(1, 6):
+            await _merge_nodes_then_upsert(
+                "Zorvath", [node(index)], graph, vdb, config, status, lock
+            )
+            stored = graph.nodes["Zorvath"]
+            states.append(
+                _stored_summary_folds(stored, stored["description"])
+                if "summary_state" in stored
+                else None
+            )
+
+        # 1 description: joined; 2: full summary; then two folds; then a rebuild
+        assert llm.requests == ["full", "fold", "fold", "full"]
+        assert states == [None, 0, 1, 2, 0]
+        assert graph.nodes["Zorvath"]["description"] == "full summary 4"
+        assert status["summary_folds"] == 2
+        assert status["summary_llm_calls"] == 4
+
+    @pytest.mark.asyncio
+    async def test_full_mode_summarizes_whole_list(self):
+        llm, graph, vdb = SummaryLLM(), FakeGraph(), FakeVectorStorage()
+        config = make_config(llm, summary_mode="full")
+
+        for index in range(1, 4):
+            await _merge_nodes_then_upsert("Zorvath", [node(index)], graph, vdb, config)
+
+        assert llm.requests == ["full", "full"]
+        assert "summary_state" not in graph.nodes["Zorvath"]
@@ -0,0 +1,175 @@
+"""
+Unit tests for splitting packed extraction output back into chunks (lightrag.operate).
+
+Several small chunks share one extraction request; the LLM emits a header before
+each chunk's records and _split_packed_extraction_result attributes every record
+to its chunk, falling back to entity-name matching.
+"""
+
+import pytest
+
+import lightrag.operate as operate
+from lightrag.operate import _attribute_packed_record, _split_packed_extraction_result
+
+D = "<|#|>"
+DONE = "<|COMPLETE|>"
+
+PACK = [
+    ("chunk-a", {"content": "Alice Zhang joined Acme Corp as a data engineer."}),
+    ("chunk-b", {"content": "Bob Li studied at Tsinghua University and uses Python."}),
+    ("chunk-c", {"content": "Acme Corp and Globex signed a partnership."}),
+]
+
+
+def entity(name: str) -> str:
+    return f"entity{D}{name}{D}person{D}{name} is mentioned."
+
+
+def relation(src: str, tgt: str) -> str:
+    return f"relation{D}{src}{D}{tgt}{D}works at{D}{src} works at {tgt}."
+
+
+def names_by_chunk(sections: dict[str, str]) -> dict[str, list[str]]:
+    """Second field of every record in each section (entity name or relation source)."""
+    return {
+        key: [line.split(D)[1] for line in text.split("\n") if line and line != DONE]
+        for key, text in sections.items()
+    }
+
+
+@pytest.fixture
+def warnings(monkeypatch):
+    messages = []
+    monkeypatch.setattr(operate.logger, "warning", messages.append)
+    return messages
+
+
+SPLIT_CASES = [
+    pytest.param(
+        [
+            f"chunk{D}1",
+            entity("Alice Zhang"),
+            relation("Alice Zhang", "Acme Corp"),
+            f"chunk{D}2",
+            entity("Bob Li"),
+            f"chunk{D}3",
+            entity("Globex"),
+            DONE,
+        ],
+        {
+            "chunk-a": ["Alice Zhang", "Alice Zhang"],
+            "chunk-b": ["Bob Li"],
+            "chunk-c": ["Globex"],
+        },
+        0,
+        id="well-formed",
+    ),
+    pytest.param(
+        ["(chunk 2)", entity("Bob Li"), "chunk: 3", entity("Globex")],
+        {"chunk-a": [], "chunk-b": ["Bob Li"], "chunk-c": ["Globex"]},
+        0,
+        id="paren-and-colon-headers",
+    ),
+    pytest.param(
+        [
+            "<Chunk 1>",
+            entity("Alice Zhang"),
+            "</Chunk 1>",
+            "<Chunk 2>",
+            entity("Bob Li"),
+            "</Chunk 2>",
+        ],
+        {"chunk-a": ["Alice Zhang"], "chunk-b": ["Bob Li"], "chunk-c": []},
+        0,
+        id="echoed-tags",
+    ),
+    pytest.param(
+        [
+            f"**chunk{D}1**",
+            entity("Alice Zhang"),
+            "## Chunk 2",
+            entity("Bob Li"),
+            f"chunk{D}3{D}",
+            entity("Globex"),
+        ],
+        {"chunk-a": ["Alice Zhang"], "chunk-b": ["Bob Li"], "chunk-c": ["Globex"]},
+        0,
+        id="decorated-headers",
+    ),
+    pytest.param(
+        [f"chunk{D}1", entity("Alice Zhang"), f"chunk{D}7", entity("Bob Li")],
+        {"chunk-a": ["Alice Zhang"], "chunk-b": ["Bob Li"], "chunk-c": []},
+        1,
+        id="out-of-range-header",
+    ),
+    pytest.param(
+        [entity("Bob Li"), entity("Globex"), f"chunk{D}1", entity("Alice Zhang")],
+        {"chunk-a": ["Alice Zhang"], "chunk-b": ["Bob Li"], "chunk-c": ["Globex"]},
+        2,
+        id="records-before-any-header",
+    ),
+    pytest.param(
+        [entity("Unknown Person")],
+        {"chunk-a": ["Unknown Person"], "chunk-b": [], "chunk-c": []},
+        1,
+        id="unmatched-name-without-header",
+    ),
+    pytest.param(
+        [
+            f"chunk{D}3",
+            entity("Acme Corp"),
+            relation("Acme Corp", "Globex"),
+            f"chunk{D}1",
+            entity("Acme Corp"),
+        ],
+        {
+            "chunk-a": ["Acme Corp"],
+            "chunk-b": [],
+            "chunk-c": ["Acme Corp", "Acme Corp"],
+        },
+        0,
+        id="name-in-two-chunks-follows-header",
+    ),
+    pytest.param(
+        [f"chunk{D}2", entity("Globex")],
+        {"chunk-a": [], "chunk-b": [], "chunk-c": ["Globex"]},
+        1,
+        id="name-only-in-other-chunk",
+    ),
+]
+
+
+@pytest.mark.parametrize("lines, expected, moved", SPLIT_CASES)
+def test_split_packed_extraction_result(lines, expected, moved, warnings):
+    sections = _split_packed_extraction_result(
+        "\n".join(lines), PACK, tuple_delimiter=D, completion_delimiter=DONE
+    )
+
+    assert names_by_chunk(sections) == expected
+    # Each section parses like a single-chunk result
+    assert all(text.endswith(DONE) for text in sections.values())
+    if moved:
+        assert len(warnings) == 1 and warnings[0].split(": ")[1].startswith(str(moved))
+    else:
+        assert warnings == []
+
+
+ATTRIBUTE_CASES = [
+    pytest.param(entity("Bob Li"), "chunk-b", "chunk-b", id="header-contains-name"),
+    pytest.param(entity("Bob Li"), None, "chunk-b", id="no-header"),
+    pytest.param(entity("Acme Corp"), None, "chunk-a", id="shared-name-first-chunk"),
+    pytest.param(entity("Acme Corp"), "chunk-c", "chunk-c", id="shared-name-header"),
+    pytest.param(
+        relation("Acme Corp", "Globex"), None, "chunk-c", id="relation-both-names"
+    ),
+    pytest.param(
+        relation("Bob Li", "Globex"), None, "chunk-b", id="relation-split-names"
+    ),
+    pytest.param(entity("Nobody"), "chunk-b", "chunk-b", id="unknown-keeps-header"),
+    pytest.param(f"entity{D}{D}person", None, "chunk-a", id="empty-name"),
+]
+
+
+@pytest.mark.parametrize("record, current, expected", ATTRIBUTE_CASES)
+def test_attribute_packed_record(record, current, expected):
+    assert _attribute_packed_record(record, PACK, D, current) == expected
@@ -0,0 +1,97 @@
+"""
+Unit tests for LightRAG.aquery_batch embedding sharing and deduplication.
+
+The query pipeline is replaced by a stub that embeds one keyword string per
+query, so the tests only count the calls reaching embedding_func.
+"""
+
+import asyncio
+import math
+
+import numpy as np
+import pytest
+
+from lightrag import LightRAG
+from lightrag.utils import batch_scope_aware
+
+
+class CountingEmbedding:
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    async def __call__(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.ones((len(texts), 4))
+
+    def calls_with(self, prefix: str) -> list[list[str]]:
+        return [c for c in self.calls if any(t.startswith(prefix) for t in c)]
+
+
+def make_rag(embedding: CountingEmbedding, batch_num: int, fail: dict | None = None):
+    rag = LightRAG.__new__(LightRAG)
+    rag.embedding_func = batch_scope_aware(embedding)
+    rag.embedding_batch_num = batch_num
+    rag.embedding_micro_batch_wait_ms = 0
+    rag.llm_model_max_async = 4
+    rag.llm_calls = []
+
+    async def aquery_llm(query, param, system_prompt=None):
+        rag.llm_calls.append(query)
+        # Query embedding (prefetched), then keyword embedding after a
+        # staggered keyword-extraction delay, as the vdbs do
+        await rag.embedding_func([query], _priority=5)
+        await asyncio.sleep(0.0005 * (len(rag.llm_calls) % 8))
+        await rag.embedding_func([f"kw:{query}"], _priority=5)
+        if fail and query in fail:
+            raise fail[query]
+        return {"llm_response": {"content": f"answer to {query}"}}
+
+    rag.aquery_llm = aquery_llm
+    return rag
+
+
+async def collect(rag, queries, **kwargs):
+    return [outcome async for outcome in rag.aquery_batch(queries, **kwargs)]
+
+
+class TestQueryBatch:
+    @pytest.mark.asyncio
+    async def test_embeddings_are_batched_and_duplicates_shared(self):
+        embedding = CountingEmbedding()
+        rag = make_rag(embedding, batch_num=4)
+        distinct = [f"question {i}" for i in range(10)]
+        queries = distinct + ["  question 3 ", "question 7"]
+        stats = {}
+
+        outcomes = await collect(rag, queries, max_concurrency=20, stats=stats)
+
+        expected_calls = math.ceil(len(distinct) / 4)
+        assert len(embedding.calls_with("question")) <= expected_calls
+        assert len(embedding.calls_with("kw:")) <= expected_calls
+        assert sorted(rag.llm_calls) == sorted(distinct)
+        by_index = {o["index"]: o for o in outcomes}
+        assert sorted(by_index) == list(range(len(queries)))
+        assert by_index[10]["query"] == "  question 3 "
+        assert by_index[10]["response"] == by_index[3]["response"]
+        assert by_index[11]["response"] == "answer to question 7"
+        assert stats["unique_queries"] == 10
+        assert stats["embedding_calls"] == len(embedding.calls)
+
+    @pytest.mark.asyncio
+    async def test_failed_query_is_reported_per_position(self):
+        embedding = CountingEmbedding()
+        rag = make_rag(embedding, batch_num=8, fail={"bad": ValueError("boom")})
+
+        outcomes = await collect(rag, ["good", "bad", "bad"])
+
+        failures = sorted(o["index"] for o in outcomes if o["status"] == "failure")
+        assert failures == [1, 2]
+        assert all(o["error"] == "boom" for o in outcomes if o["index"] in failures)
+
+    @pytest.mark.asyncio
+    async def test_cancellation_is_not_reported_as_failure(self):
+        embedding = CountingEmbedding()
+        rag = make_rag(embedding, batch_num=8, fail={"q": asyncio.CancelledError()})
+
+        with pytest.raises(asyncio.CancelledError):
+            await collect(rag, ["q"])
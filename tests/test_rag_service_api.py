@@ -0,0 +1,494 @@
+"""
+Unit tests for the standalone service components in rag_service_api.py.
+
+The module is imported without starting the app: no LightRAG instance,
+watcher or background writer is created. Module globals are swapped per test
+with monkeypatch.
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("CHAT_API_KEY", "test-key")
+os.environ.setdefault("QDRANT_URL", "http://localhost:6333")
+pytest.importorskip("raganything")
+
+import rag_service_api as api  # noqa: E402
+from lightrag.base import DocStatus  # noqa: E402
+
+
+class FakeLightRAG:
+    """Only the doc_status lookup used by the service."""
+
+    def __init__(self, statuses: dict):
+        self.statuses = statuses
+
+    async def aget_docs_by_ids(self, ids):
+        return {
+            doc_id: {"status": self.statuses[doc_id]}
+            for doc_id in ids
+            if doc_id in self.statuses
+        }
+
+
+@pytest.fixture
+def rag(monkeypatch):
+    fake = FakeLightRAG({})
+    monkeypatch.setattr(api, "lightrag_instance", fake)
+    return fake
+
+
+@pytest.fixture
+def hash_index(tmp_path, monkeypatch):
+    index = api.ContentHashIndex(
+        str(tmp_path / "ingest_hash_index.json"), doc_statuses=api._doc_statuses
+    )
+    monkeypatch.setattr(api, "_hash_index", index)
+    return index
+
+
+def fake_ingest(doc_ids: dict):
+    async def _ingest_files(paths, output_dir, error_message, on_progress=None):
+        return list(paths), [], {p: {} for p in paths}, {p: doc_ids[p] for p in paths}
+
+    return _ingest_files
+
+
+class TestContentHashIndex:
+    @pytest.mark.asyncio
+    async def test_only_processed_documents_are_recorded(
+        self, rag, hash_index, monkeypatch
+    ):
+        rag.statuses = {"doc-ok": DocStatus.PROCESSED, "doc-bad": DocStatus.FAILED}
+        monkeypatch.setattr(
+            api, "_ingest_files", fake_ingest({"a.pdf": "doc-ok", "b.pdf": "doc-bad"})
+        )
+        assert hash_index.claim("h1") and hash_index.claim("h2")
+
+        await api._ingest_claimed([("a.pdf", "h1"), ("b.pdf", "h2")], "out", "failed")
+
+        assert (await hash_index.lookup("h1"))["doc_id"] == "doc-ok"
+        assert await hash_index.lookup("h2") is None
+        # Claims are released either way, so the failed content can be retried
+        assert hash_index.claim("h2")
+
+    @pytest.mark.asyncio
+    async def test_lookup_drops_failed_or_deleted_documents(self, rag, hash_index):
+        await hash_index.record(
+            {
+                "h1": {"path": "a.pdf", "doc_id": "doc-a"},
+                "h2": {"path": "b.pdf", "doc_id": "doc-b"},
+                "h3": {"path": "c.pdf", "doc_id": "doc-c"},
+            }
+        )
+        rag.statuses = {"doc-a": DocStatus.PROCESSED, "doc-b": DocStatus.FAILED}
+
+        assert await hash_index.lookup("h1") is not None
+        assert await hash_index.lookup("h2") is None  # failed on a later retry
+        assert await hash_index.lookup("h3") is None  # deleted from LightRAG
+        assert await api._claim_digest("h3", "c.pdf") is None
+
+        reloaded = api.ContentHashIndex(hash_index.path)
+        assert set(reloaded._load()) == {"h1"}
+
+    @pytest.mark.asyncio
+    async def test_lookup_trusts_entries_without_lightrag(
+        self, hash_index, monkeypatch
+    ):
+        monkeypatch.setattr(api, "lightrag_instance", None)
+        await hash_index.record({"h1": {"path": "a.pdf", "doc_id": "doc-a"}})
+
+        skip = await api._claim_digest("h1", "copy.pdf")
+
+        assert skip["reason"] == "already_ingested"
+        assert skip["existing_path"] == "a.pdf"
+
+    @pytest.mark.asyncio
+    async def test_in_flight_content_is_skipped(self, rag, hash_index):
+        assert await api._claim_digest("h1", "a.pdf") is None
+
+        skip = await api._claim_digest("h1", "a-copy.pdf")
+
+        assert skip["reason"] == "in_progress"
+
+    @pytest.mark.asyncio
+    async def test_clear_forgets_recorded_hashes(self, rag, hash_index):
+        await hash_index.record({"h1": {"path": "a.pdf", "doc_id": "doc-a"}})
+
+        assert await hash_index.clear() == 1
+        assert await hash_index.lookup("h1") is None
+        assert api.ContentHashIndex(hash_index.path)._load() == {}
+
+
+class TestWatchPipeline:
+    @pytest.mark.asyncio
+    async def test_failed_document_is_picked_up_again(
+        self, rag, hash_index, tmp_path, monkeypatch
+    ):
+        path = str(tmp_path / "resume.pdf")
+        with open(path, "wb") as f:
+            f.write(b"%PDF resume")
+        monkeypatch.setattr(api, "rag_anything", object())
+        monkeypatch.setattr(api, "_ingest_files", fake_ingest({path: "doc-1"}))
+        pipeline = api.WatchPipeline(debounce=0.05, batch_max=10, queue_size=4)
+
+        async def drop_and_ingest():
+            await pipeline._enqueue([path])
+            if pipeline._queue.empty():
+                return False
+            batch = pipeline._queue.get_nowait()
+            await pipeline._ingest_batch(batch)
+            return True
+
+        rag.statuses = {"doc-1": DocStatus.FAILED}
+        assert await drop_and_ingest()
+        # Same bytes dropped again after the failure: ingested again, not skipped
+        rag.statuses = {"doc-1": DocStatus.PROCESSED}
+        assert await drop_and_ingest()
+        # Now processed: a further copy is a duplicate
+        assert not await drop_and_ingest()
+        assert pipeline.stats["duplicates"] == 1
+
+
+def test_unique_upload_path_suffixes_same_names(tmp_path):
+    directory = str(tmp_path)
+    taken = set()
+    for _ in range(3):
+        taken.add(api._unique_upload_path(directory, "report.pdf", taken))
+
+    assert sorted(os.path.basename(p) for p in taken) == [
+        "report.pdf",
+        "report_1.pdf",
+        "report_2.pdf",
+    ]
+
+
+class RecordingTransport:
+    """httpx transport answering each POST with the next queued status code."""
+
+    def __init__(self, *statuses: int):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        status = self.statuses.pop(0) if self.statuses else 200
+        return api.httpx.Response(status)
+
+
+async def started_dispatcher(transport, **kwargs):
+    dispatcher = api.CallbackDispatcher(workers=1, retry_base=0.01, **kwargs)
+    await dispatcher.start()
+    await dispatcher._client.aclose()
+    dispatcher._client = api.httpx.AsyncClient(
+        transport=api.httpx.MockTransport(transport)
+    )
+    return dispatcher
+
+
+@pytest.mark.skipif(not api.HTTPX_AVAILABLE, reason="httpx not installed")
+class TestCallbackDispatcher:
+    @pytest.mark.asyncio
+    async def test_server_errors_are_retried_until_delivered(self):
+        transport = RecordingTransport(503, 429, 200)
+        dispatcher = await started_dispatcher(transport, max_retries=5)
+
+        assert await dispatcher.submit("http://cb.example/hook", {"ok": True})
+        await dispatcher.stop()  # drains queued and scheduled retries
+
+        assert len(transport.requests) == 3
+        stats = dispatcher.stats
+        assert (stats["delivered"], stats["retried"], stats["failed"]) == (1, 2, 0)
+        assert stats["hosts"]["cb.example"]["delivered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_client_errors_and_exhausted_retries_fail(self):
+        transport = RecordingTransport(404, 500, 500)
+        dispatcher = await started_dispatcher(transport, max_retries=1)
+
+        await dispatcher.submit("http://cb.example/missing", {})
+        await dispatcher.submit("http://cb.example/broken", {})
+        await dispatcher.stop()
+
+        stats = dispatcher.stats
+        assert (stats["delivered"], stats["retried"], stats["failed"]) == (0, 1, 2)
+        assert stats["last_error"] == "HTTP 500 from cb.example"
+
+
+@pytest.mark.asyncio
+async def test_callback_dropped_with_warning_without_httpx(monkeypatch, capsys):
+    monkeypatch.setattr(api, "HTTPX_AVAILABLE", False)
+    dispatcher = api.CallbackDispatcher()
+    await dispatcher.start()
+
+    assert not await dispatcher.submit("http://cb.example/hook", {})
+
+    assert "未安装 httpx" in capsys.readouterr().out
+    assert dispatcher.stats["dropped"] == 1
+
+
+def test_read_lines_reversed_across_block_boundaries(tmp_path):
+    lines = ["a", "", "bb" * 10, "ccc", "d" * 40, "ü-utf8"]
+    path = tmp_path / "history.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    for block_size in (1, 3, 7, 64, 4096):
+        read = list(api._read_lines_reversed(str(path), block_size=block_size))
+        # The trailing newline yields one empty line first
+        assert read == [""] + lines[::-1], block_size
+
+
+class TestHistoryWriter:
+    def make_writer(self, tmp_path, **kwargs):
+        return api.HistoryWriter(
+            str(tmp_path / "query_history.jsonl"), fsync=False, **kwargs
+        )
+
+    def test_rotation_keeps_backup_count_files(self, tmp_path):
+        # Every line reaches max_bytes, so each write rotates the live file
+        writer = self.make_writer(tmp_path, max_bytes=50, backup_count=2)
+        for i in range(5):
+            writer.append({"type": "query", "i": i, "pad": "x" * 40})
+
+        files = writer.files_oldest_first()
+        assert [os.path.basename(p) for p in files] == [
+            "query_history.jsonl.2",
+            "query_history.jsonl.1",
+        ]
+        kept = [json.loads(open(p, encoding="utf-8").read())["i"] for p in files]
+        assert kept == [3, 4]
+
+    def test_newest_first_paging_spans_rotated_files(self, tmp_path):
+        writer = self.make_writer(tmp_path, max_bytes=120, backup_count=10)
+        for i in range(12):
+            writer.append({"type": "query" if i % 3 else "ingest", "i": i})
+        assert len(writer.files_oldest_first()) > 2
+
+        seen, offset = [], 0
+        while offset is not None:
+            page = writer.read_page(offset=offset, limit=5)
+            seen += [entry["i"] for entry in page["items"]]
+            offset = page["next_offset"]
+        assert seen == list(range(11, -1, -1))
+
+        ingest = writer.read_page(limit=10, event_type="ingest")
+        assert [e["i"] for e in ingest["items"]] == [9, 6, 3, 0]
+        oldest = writer.read_page(limit=3, newest_first=False)
+        assert [e["i"] for e in oldest["items"]] == [0, 1, 2]
+        assert oldest["has_more"]
+
+    @pytest.mark.asyncio
+    async def test_background_writer_flushes_on_stop(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(
+            api, "LEGACY_HISTORY_FILE", str(tmp_path / "missing_legacy.json")
+        )
+        writer = self.make_writer(tmp_path, batch_size=4, flush_interval=10)
+        await writer.start()
+        for i in range(10):
+            writer.append({"type": "query", "i": i})
+        await writer.stop()
+
+        page = writer.read_page(limit=20, newest_first=False)
+        assert [e["i"] for e in page["items"]] == list(range(10))
+
+
+class TestAnswerCache:
+    def test_key_normalizes_question_and_includes_params_and_version(self):
+        cache = api.AnswerCache(ttl=60, max_entries=10)
+        params = {"mode": "hybrid", "top_k": 5}
+        base = cache.key("Who founded  Acme?", params, 0)
+
+        assert cache.key("  who FOUNDED acme? ", dict(params), 0) == base
+        assert cache.key("Who founded Acme?", {**params, "mode": "local"}, 0) != base
+        assert cache.key("Who founded Acme?", params, 1) != base
+        assert cache.key("Who owns Acme?", params, 0) != base
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_after_ttl(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(api.time, "monotonic", lambda: now[0])
+        cache = api.AnswerCache(ttl=30, max_entries=10)
+        await cache.set("k", {"answer": "a"})
+
+        now[0] += 29
+        assert await cache.get("k") == {"answer": "a"}
+        now[0] += 2
+        assert await cache.get("k") is None
+        assert "k" not in cache._entries
+        assert (cache.stats["hits"], cache.stats["misses"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_entry_is_evicted(self):
+        cache = api.AnswerCache(ttl=60, max_entries=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        assert await cache.get("a") == 1
+
+        await cache.set("c", 3)
+
+        assert await cache.get("b") is None
+        assert (await cache.get("a"), await cache.get("c")) == (1, 3)
+        assert cache.stats["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_bumps_version_so_old_keys_miss(self):
+        cache = api.AnswerCache(ttl=60, max_entries=10)
+        params = {"mode": "hybrid"}
+        old_key = cache.key("q", params, await cache.data_version())
+        await cache.set(old_key, "old answer")
+
+        await cache.invalidate()
+
+        assert await cache.data_version() == 1
+        new_key = cache.key("q", params, await cache.data_version())
+        assert new_key != old_key
+        assert await cache.get(new_key) is None
+        # A query that started before the bump stored under the old version
+        await cache.set(old_key, "stale answer")
+        assert await cache.get(new_key) is None
+        assert cache.stats["invalidations"] == 1
+
+
+class TestResolveEmbedDim:
+    @pytest.fixture
+    def embed_env(self, tmp_path, monkeypatch):
+        """Autodetect on, fingerprint in tmp_path, stubbed probe and collections."""
+        env = {"probe": 1024, "probes": 0, "collections": {}}
+
+        async def probe():
+            env["probes"] += 1
+            return env["probe"]
+
+        monkeypatch.setattr(api, "EMBED_DIM", 1536)
+        monkeypatch.setattr(api, "EMBED_DIM_AUTODETECT", True)
+        monkeypatch.setattr(api, "EMBED_MODEL", "embed-a")
+        monkeypatch.setattr(api, "EMBED_BASE_URL", "http://embed.local/v1/")
+        monkeypatch.setattr(
+            api, "EMBED_FINGERPRINT_FILE", str(tmp_path / "embed_fingerprint.json")
+        )
+        monkeypatch.setattr(api, "_probe_embed_dim", probe)
+        monkeypatch.setattr(
+            api, "_qdrant_collection_dims", lambda: dict(env["collections"])
+        )
+        return env
+
+    @pytest.mark.asyncio
+    async def test_fingerprint_is_reused_without_probe(self, embed_env):
+        assert await api._resolve_embed_dim() == 1024
+        assert embed_env["probes"] == 1
+        assert api._load_embed_fingerprint()["dim"] == 1024
+
+        embed_env["probe"] = 768
+        assert await api._resolve_embed_dim() == 1024
+        assert embed_env["probes"] == 1
+
+    @pytest.mark.parametrize(
+        "setting, value",
+        [("EMBED_MODEL", "embed-b"), ("EMBED_BASE_URL", "http://other.local/v1")],
+    )
+    @pytest.mark.asyncio
+    async def test_changed_endpoint_reprobes(
+        self, embed_env, monkeypatch, setting, value
+    ):
+        await api._resolve_embed_dim()
+        monkeypatch.setattr(api, setting, value)
+        embed_env["probe"] = 768
+
+        assert await api._resolve_embed_dim() == 768
+        assert embed_env["probes"] == 2
+        fingerprint = api._load_embed_fingerprint()
+        assert fingerprint["dim"] == 768
+        assert fingerprint["model"] == api.EMBED_MODEL
+
+    @pytest.mark.asyncio
+    async def test_collection_mismatch_reprobes_once(self, embed_env, capsys):
+        await api._resolve_embed_dim()
+        # The provider changed the model's size behind the same name
+        embed_env["probe"] = 768
+        embed_env["collections"] = {"lightrag_vdb_chunks": 768}
+
+        assert await api._resolve_embed_dim() == 768
+        assert embed_env["probes"] == 2
+        assert api._load_embed_fingerprint()["dim"] == 768
+        assert "警告" not in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_persistent_mismatch_warns(self, embed_env, capsys):
+        await api._resolve_embed_dim()
+        embed_env["collections"] = {"lightrag_vdb_chunks": 768}
+
+        assert await api._resolve_embed_dim() == 1024
+        assert embed_env["probes"] == 2
+        out = capsys.readouterr().out
+        assert "[EmbedDim] 警告" in out
+        assert "lightrag_vdb_chunks" in out
+
+    @pytest.mark.asyncio
+    async def test_without_autodetect_keeps_configured_dim(
+        self, embed_env, monkeypatch, capsys
+    ):
+        monkeypatch.setattr(api, "EMBED_DIM_AUTODETECT", False)
+        embed_env["collections"] = {"lightrag_vdb_chunks": 1024}
+
+        assert await api._resolve_embed_dim() == 1536
+        assert embed_env["probes"] == 0
+        assert "[EmbedDim] 警告" in capsys.readouterr().out
+
+
+class TestIngestJobManager:
+    @pytest.mark.asyncio
+    async def test_progress_events_reach_subscribers(self):
+        jobs = api.IngestJobManager()
+        job = jobs.create("upload", ["a.pdf", "b.pdf"])
+        events = jobs.subscribe(job["job_id"])
+        on_progress = jobs.progress_callback(job["job_id"])
+
+        async def work():
+            on_progress("a.pdf", "done", {"doc_id": "doc-a"})
+            on_progress("b.pdf", "failed", {})
+            return {"status": "partial"}
+
+        await jobs.run(job, work())
+
+        received = []
+        while (item := events.get_nowait()) is not None:
+            received.append(item)
+        assert [event for event, _ in received] == ["status", "file", "file", "done"]
+        assert received[1][1]["doc_id"] == "doc-a"
+        assert received[-1][1]["status"] == "completed"
+        assert (job["completed_files"], job["failed_files"]) == (1, 1)
+        assert job["files"]["a.pdf"] == {"status": "done", "doc_id": "doc-a"}
+
+    @pytest.mark.asyncio
+    async def test_failed_and_cancelled_jobs(self):
+        jobs = api.IngestJobManager()
+        failed = jobs.create("scan", [])
+
+        async def boom():
+            raise RuntimeError("disk full")
+
+        with pytest.raises(RuntimeError):
+            await jobs.run(failed, boom())
+        assert (failed["status"], failed["error"]) == ("failed", "disk full")
+
+        cancelled = jobs.create("scan", [])
+        jobs.spawn(cancelled, asyncio.sleep(60, result={}))
+        await asyncio.sleep(0)
+        await jobs.shutdown()
+        assert cancelled["status"] == "cancelled"
+        assert jobs._tasks == {}
+
+    @pytest.mark.asyncio
+    async def test_only_history_limit_finished_jobs_are_kept(self):
+        jobs = api.IngestJobManager(history_limit=2)
+        finished = []
+        for _ in range(4):
+            job = jobs.create("scan", [])
+            await jobs.run(job, asyncio.sleep(0, result={"status": "success"}))
+            finished.append(job["job_id"])
+        running = jobs.create("scan", [])
+
+        assert set(jobs.jobs) == {*finished[-2:], running["job_id"]}
@@ -0,0 +1,157 @@
+"""
+Unit tests for provider rate limiting (lightrag.utils).
+
+TokenBucket takes the clock as an argument; RateLimiter reads time.monotonic()
+and sleeps with asyncio.sleep, both replaced here by a fake clock so every wait
+is deterministic.
+"""
+
+import pytest
+
+import lightrag.utils as utils
+from lightrag.utils import RateLimiter, TokenBucket, get_rate_limiter
+
+
+class FakeClock:
+    """Stands in for time.monotonic; sleeping advances it instantly."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.sleeps: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(utils.time, "monotonic", fake.monotonic)
+    monkeypatch.setattr(utils.asyncio, "sleep", fake.sleep)
+    return fake
+
+
+class TestTokenBucket:
+    def test_rpm_refill(self, clock):
+        bucket = TokenBucket(60)  # one request per second
+
+        assert [bucket.reserve(1, clock.now) for _ in range(60)] == [0.0] * 60
+        assert bucket.reserve(1, clock.now) == pytest.approx(1.0)
+
+        # Ten seconds later the debt is paid and nine requests are available again
+        clock.now += 10
+        assert [bucket.reserve(1, clock.now) for _ in range(9)] == [0.0] * 9
+        assert bucket.reserve(1, clock.now) == pytest.approx(1.0)
+
+    def test_refill_caps_at_capacity(self, clock):
+        bucket = TokenBucket(60)
+
+        clock.now += 3600
+        assert [bucket.reserve(1, clock.now) for _ in range(60)] == [0.0] * 60
+        assert bucket.reserve(1, clock.now) > 0
+
+    def test_request_larger_than_capacity_does_not_wait_forever(self, clock):
+        bucket = TokenBucket(1000)
+
+        # Charged at most one full budget: runs at once from a full bucket ...
+        assert bucket.reserve(50_000, clock.now) == 0.0
+        # ... and from an empty one waits at most one minute
+        assert bucket.reserve(50_000, clock.now) == pytest.approx(60.0)
+
+    def test_adjust_refunds_and_charges(self, clock):
+        bucket = TokenBucket(600)  # 10 tokens per second
+        bucket.reserve(600, clock.now)
+
+        bucket.adjust(-300)  # call used 300 tokens less than reserved
+        assert bucket.reserve(300, clock.now) == 0.0
+
+        bucket.adjust(100)  # call used 100 tokens more than reserved
+        assert bucket.reserve(0, clock.now) == pytest.approx(10.0)
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_rpm_waits_then_refills(self, clock):
+        limiter = RateLimiter("rpm", rpm=2)
+
+        assert await limiter.acquire() == 0.0
+        assert await limiter.acquire() == 0.0
+        assert await limiter.acquire() == pytest.approx(30.0)
+        assert clock.sleeps == [pytest.approx(30.0)]
+
+        clock.now += 60
+        assert await limiter.acquire() == 0.0
+        assert limiter.snapshot()["throttled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_tpm_waits_for_tokens(self, clock):
+        limiter = RateLimiter("tpm", tpm=1200)  # 20 tokens per second
+
+        assert await limiter.acquire(1000) == 0.0
+        # 200 left, 600 requested: 400 tokens of debt
+        assert await limiter.acquire(600) == pytest.approx(20.0)
+
+    @pytest.mark.asyncio
+    async def test_reconcile_returns_unused_tokens(self, clock):
+        limiter = RateLimiter("reconcile", tpm=1200)
+
+        await limiter.acquire(1200)
+        limiter.reconcile(estimated=1200, actual=400)
+
+        assert await limiter.acquire(800) == 0.0
+        assert limiter.snapshot()["tokens_reconciled"] == -800
+
+    @pytest.mark.asyncio
+    async def test_oversized_request_is_bounded(self, clock):
+        limiter = RateLimiter("oversized", tpm=100)
+
+        assert await limiter.acquire(10_000) == 0.0
+        assert await limiter.acquire(10_000) == pytest.approx(60.0)
+
+    @pytest.mark.asyncio
+    async def test_rpm_and_tpm_wait_for_the_slower_bucket(self, clock):
+        limiter = RateLimiter("both", rpm=60, tpm=600)  # 1 req/s, 10 tokens/s
+
+        await limiter.acquire(600)
+        assert await limiter.acquire(100) == pytest.approx(10.0)
+
+    @pytest.mark.asyncio
+    async def test_zero_limits_disable(self, clock):
+        limiter = RateLimiter("off")
+
+        assert not limiter.enabled
+        assert await limiter.acquire(10**9) == 0.0
+        assert clock.sleeps == []
+
+
+class TestGetRateLimiter:
+    @pytest.fixture(autouse=True)
+    def isolated_registry(self, monkeypatch):
+        monkeypatch.setattr(utils, "_rate_limiters", {})
+
+    def test_same_key_shares_limiter(self):
+        first = get_rate_limiter("gpt-4o-mini", rpm=100, tpm=10_000)
+        second = get_rate_limiter("gpt-4o-mini", rpm=100, tpm=10_000)
+        other = get_rate_limiter("embedding", rpm=100)
+
+        assert first is second
+        assert other is not first
+
+    @pytest.mark.asyncio
+    async def test_shared_limiter_shares_budget(self, clock):
+        a = get_rate_limiter("shared", rpm=1)
+        b = get_rate_limiter("shared", rpm=1)
+
+        assert await a.acquire() == 0.0
+        assert await b.acquire() == pytest.approx(60.0)
+
+    def test_changed_limits_reconfigure_shared_limiter(self):
+        first = get_rate_limiter("model", rpm=100)
+        second = get_rate_limiter("model", rpm=50, tpm=1000)
+
+        assert second is first
+        assert (first.rpm, first.tpm) == (50, 1000)
@@ -0,0 +1,163 @@
+"""
+Unit tests for the staged document pipeline (LightRAG.apipeline_process_enqueue_documents).
+
+Documents flow through chunking -> extraction -> merging queues. A failure in
+any stage marks only that document FAILED through fail_document, and the None
+sentinels still shut every stage down so the pipeline returns.
+
+The default file-based storages run in a temporary working_dir; the LLM and
+embedding functions are stubs.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import lightrag.lightrag as lightrag_module
+from lightrag import LightRAG
+from lightrag.base import DocStatus
+from lightrag.kg.shared_storage import (
+    get_namespace_data,
+    initialize_pipeline_status,
+)
+from lightrag.utils import EmbeddingFunc, Tokenizer
+
+D = "<|#|>"
+DONE = "<|COMPLETE|>"
+NAMES = ("Zorvath", "Quillon", "Marnick")
+
+
+class CharTokenizer:
+    def encode(self, content):
+        return [ord(c) for c in content]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class FakeLLM:
+    """Emits the known names found in the chunk; while unavailable, fails on BROKEN chunks."""
+
+    def __init__(self):
+        self.available = True
+
+    async def __call__(self, prompt, system_prompt=None, **kwargs):
+        text = f"{system_prompt or ''}\n{prompt}"
+        if "BROKEN" in text and not self.available:
+            raise RuntimeError("LLM unavailable")
+        records = [
+            f"entity{D}{n}{D}person{D}{n} is a person." for n in NAMES if n in text
+        ]
+        return "\n".join(records + [DONE])
+
+
+async def fake_embedding(texts, **kwargs):
+    return np.ones((len(texts), 8))
+
+
+async def make_rag(tmp_path, llm: FakeLLM | None = None, **kwargs) -> LightRAG:
+    # Storages share in-process namespace data per workspace, so every test
+    # gets its own
+    rag = LightRAG(
+        working_dir=str(tmp_path),
+        workspace=tmp_path.name,
+        llm_model_func=llm or FakeLLM(),
+        embedding_func=EmbeddingFunc(embedding_dim=8, func=fake_embedding),
+        tokenizer=Tokenizer("chars", CharTokenizer()),
+        entity_extract_max_gleaning=0,
+        **kwargs,
+    )
+    await rag.initialize_storages()
+    await initialize_pipeline_status()
+    return rag
+
+
+async def statuses(rag: LightRAG, doc_ids: list[str]) -> dict:
+    docs = await rag.aget_docs_by_ids(doc_ids)
+    return {doc_id: docs[doc_id]["status"] for doc_id in doc_ids}
+
+
+class TestStagedPipeline:
+    @pytest.mark.asyncio
+    async def test_extraction_failure_fails_only_that_document(self, tmp_path):
+        llm = FakeLLM()
+        llm.available = False
+        rag = await make_rag(tmp_path, llm)
+        try:
+            await rag.ainsert(
+                ["Zorvath lives here.", "BROKEN text", "Quillon lives here."],
+                ids=["doc-1", "doc-2", "doc-3"],
+            )
+
+            assert await statuses(rag, ["doc-1", "doc-2", "doc-3"]) == {
+                "doc-1": DocStatus.PROCESSED,
+                "doc-2": DocStatus.FAILED,
+                "doc-3": DocStatus.PROCESSED,
+            }
+            failed = (await rag.aget_docs_by_ids(["doc-2"]))["doc-2"]
+            assert "LLM unavailable" in failed["error_msg"]
+            labels = await rag.chunk_entity_relation_graph.get_all_labels()
+            assert set(labels) == {"Zorvath", "Quillon"}
+
+            pipeline_status = await get_namespace_data("pipeline_status")
+            assert pipeline_status["busy"] is False
+            stages = pipeline_status["stages"]
+            assert stages["chunking"]["completed"] == 3
+            assert stages["extraction"]["failed"] == 1
+            assert stages["merging"]["completed"] == 2
+            assert all(s["queued"] == s["in_flight"] == 0 for s in stages.values())
+        finally:
+            await rag.finalize_storages()
+
+    @pytest.mark.asyncio
+    async def test_merge_failure_is_recorded_as_merge_stage(
+        self, tmp_path, monkeypatch
+    ):
+        rag = await make_rag(tmp_path)
+        merge = lightrag_module.merge_nodes_and_edges
+
+        async def failing_merge(**kwargs):
+            if kwargs["doc_id"] == "doc-2":
+                raise RuntimeError("graph write failed")
+            return await merge(**kwargs)
+
+        monkeypatch.setattr(lightrag_module, "merge_nodes_and_edges", failing_merge)
+        try:
+            await rag.ainsert(
+                ["Zorvath lives here.", "Quillon lives here."], ids=["doc-1", "doc-2"]
+            )
+
+            assert await statuses(rag, ["doc-1", "doc-2"]) == {
+                "doc-1": DocStatus.PROCESSED,
+                "doc-2": DocStatus.FAILED,
+            }
+            failed = (await rag.aget_docs_by_ids(["doc-2"]))["doc-2"]
+            assert failed["error_msg"] == "graph write failed"
+            # Extraction finished, so the chunk list is kept for the retry
+            assert failed["chunks_count"] == 1
+            pipeline_status = await get_namespace_data("pipeline_status")
+            assert any(
+                "Merging stage failed" in message
+                for message in pipeline_status["history_messages"]
+            )
+        finally:
+            await rag.finalize_storages()
+
+    @pytest.mark.asyncio
+    async def test_failed_document_is_processed_on_retry(self, tmp_path):
+        llm = FakeLLM()
+        llm.available = False
+        rag = await make_rag(tmp_path, llm)
+        try:
+            await rag.ainsert(["BROKEN Marnick"], ids=["doc-1"])
+            assert await statuses(rag, ["doc-1"]) == {"doc-1": DocStatus.FAILED}
+
+            llm.available = True
+            await asyncio.wait_for(rag.apipeline_process_enqueue_documents(), 30)
+
+            assert await statuses(rag, ["doc-1"]) == {"doc-1": DocStatus.PROCESSED}
+            labels = await rag.chunk_entity_relation_graph.get_all_labels()
+            assert labels == ["Marnick"]
+        finally:
+            await rag.finalize_storages()
@@ -0,0 +1,141 @@
+"""
+Unit tests for caching streamed query answers (lightrag.operate).
+
+A streamed answer from kg_query or naive_query is saved to the LLM cache with
+its joined text once the stream completes; a stream that fails is not cached.
+A later streaming query hit replays the cached text through
+replay_cached_stream in stream_cache_replay_chunk_size pieces.
+"""
+
+import pytest
+
+import lightrag.operate as operate
+from lightrag.base import QueryContextResult, QueryParam
+from lightrag.utils import Tokenizer
+
+ANSWER = "Zorvath founded Acme in 1999."
+
+
+class CharTokenizer:
+    def encode(self, content):
+        return [ord(c) for c in content]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class FakeCache:
+    def __init__(self):
+        self.global_config = {"enable_llm_cache": True}
+        self.data: dict[str, dict] = {}
+
+    async def get_by_id(self, key):
+        return self.data.get(key)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+    def answers(self) -> list[str]:
+        return [entry["return"] for entry in self.data.values()]
+
+
+class StreamingLLM:
+    """Streams ANSWER in 5-character pieces, optionally failing after ``fail_after``."""
+
+    def __init__(self, fail_after: int | None = None):
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def __call__(self, prompt, stream=False, **kwargs):
+        self.calls += 1
+        if not stream:
+            return ANSWER
+
+        async def pieces():
+            for index, start in enumerate(range(0, len(ANSWER), 5)):
+                if index == self.fail_after:
+                    raise ConnectionError("stream interrupted")
+                yield ANSWER[start : start + 5]
+
+        return pieces()
+
+
+class FakeChunksVDB:
+    cosine_better_than_threshold = 0.2
+
+    async def query(self, query, top_k, query_embedding=None):
+        return [{"id": "chunk-1", "content": ANSWER, "file_path": "a.txt"}]
+
+
+def make_config(llm) -> dict:
+    return {
+        "llm_model_func": llm,
+        "tokenizer": Tokenizer("chars", CharTokenizer()),
+        "stream_cache_replay_chunk_size": 4,
+        "max_total_tokens": 30000,
+    }
+
+
+@pytest.fixture
+def stub_kg_context(monkeypatch):
+    async def keywords(*args, **kwargs):
+        return ["founding"], ["Zorvath"]
+
+    async def context(*args, **kwargs):
+        return QueryContextResult(context=ANSWER, raw_data={})
+
+    monkeypatch.setattr(operate, "get_keywords_from_query", keywords)
+    monkeypatch.setattr(operate, "_build_query_context", context)
+
+
+async def run_query(kind: str, llm, cache, stream: bool = True):
+    param = QueryParam(mode="naive" if kind == "naive" else "local", stream=stream)
+    if kind == "naive":
+        return await operate.naive_query(
+            "Who founded Acme?", FakeChunksVDB(), param, make_config(llm), cache
+        )
+    return await operate.kg_query(
+        "Who founded Acme?", None, None, None, None, param, make_config(llm), cache
+    )
+
+
+async def consume(result) -> list[str]:
+    return [piece async for piece in result.response_iterator]
+
+
+@pytest.mark.parametrize("kind", ["kg", "naive"])
+class TestStreamCache:
+    @pytest.mark.asyncio
+    async def test_completed_stream_is_cached(self, kind, stub_kg_context):
+        cache = FakeCache()
+
+        pieces = await consume(await run_query(kind, StreamingLLM(), cache))
+
+        assert "".join(pieces) == ANSWER
+        assert cache.answers() == [ANSWER]
+
+    @pytest.mark.asyncio
+    async def test_failed_stream_is_not_cached(self, kind, stub_kg_context):
+        cache = FakeCache()
+        result = await run_query(kind, StreamingLLM(fail_after=2), cache)
+
+        with pytest.raises(ConnectionError):
+            await consume(result)
+
+        assert cache.answers() == []
+
+    @pytest.mark.asyncio
+    async def test_cached_answer_is_replayed_in_chunks(self, kind, stub_kg_context):
+        cache = FakeCache()
+        await consume(await run_query(kind, StreamingLLM(), cache))
+
+        llm = StreamingLLM()
+        result = await run_query(kind, llm, cache)
+        pieces = await consume(result)
+
+        assert llm.calls == 0
+        assert result.is_streaming
+        assert pieces == [ANSWER[i : i + 4] for i in range(0, len(ANSWER), 4)]
+        # Non-streaming queries get the cached text as is
+        plain = await run_query(kind, llm, cache, stream=False)
+        assert plain.content == ANSWER
@@ -0,0 +1,127 @@
+"""
+Unit tests for memoized description summaries (lightrag.operate).
+
+LLM summaries are stored in the LLM cache under cache_type "summary_memo",
+keyed by the sorted description set and the summary settings, so merging the
+same descriptions again returns the stored summary without an LLM call.
+"""
+
+import pytest
+
+from lightrag.operate import _handle_entity_relation_summary
+from lightrag.utils import Tokenizer
+
+
+class CharTokenizer:
+    def encode(self, content):
+        return [ord(c) for c in content]
+
+    def decode(self, tokens):
+        return "".join(chr(t) for t in tokens)
+
+
+class FakeCache:
+    def __init__(self, enabled: bool = True):
+        self.global_config = {"enable_llm_cache_for_entity_extract": enabled}
+        self.data: dict[str, dict] = {}
+
+    async def get_by_id(self, key):
+        return self.data.get(key)
+
+    async def upsert(self, data):
+        self.data.update(data)
+
+    def memo_keys(self) -> list[str]:
+        return [key for key in self.data if ":summary_memo:" in key]
+
+
+class CountingLLM:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, prompt, **kwargs):
+        self.calls += 1
+        return f"summary #{self.calls}"
+
+
+def make_config(llm, **overrides) -> dict:
+    return {
+        "llm_model_func": llm,
+        "llm_model_name": "model-a",
+        "tokenizer": Tokenizer("chars", CharTokenizer()),
+        "summary_context_size": 10000,
+        "summary_max_tokens": 5000,
+        "summary_length_recommended": 200,
+        "force_llm_summary_on_merge": 3,
+        "addon_params": {},
+        **overrides,
+    }
+
+
+DESCRIPTIONS = [
+    "Alpha builds engines.",
+    "Alpha is based in Oslo.",
+    "Alpha has 50 staff.",
+]
+
+
+async def summarize(config, cache, descriptions=DESCRIPTIONS):
+    usage = {}
+    summary, llm_used = await _handle_entity_relation_summary(
+        "Entity", "Alpha", descriptions, "<SEP>", config, cache, usage=usage
+    )
+    return summary, llm_used, usage
+
+
+class TestSummaryMemo:
+    @pytest.mark.asyncio
+    async def test_same_description_set_hits_memo(self):
+        llm, cache = CountingLLM(), FakeCache()
+        config = make_config(llm)
+        first, used, usage = await summarize(config, cache)
+        assert (first, used, usage["llm_calls"]) == ("summary #1", True, 1)
+        assert len(cache.memo_keys()) == 1
+
+        # Same set in another order: no LLM call and no token accounting
+        again, used, usage = await summarize(config, cache, DESCRIPTIONS[::-1])
+
+        assert llm.calls == 1
+        assert (again, used) == (first, True)
+        assert usage == {"mode": "full"}
+
+    @pytest.mark.asyncio
+    async def test_changed_descriptions_or_settings_miss_memo(self):
+        llm, cache = CountingLLM(), FakeCache()
+        await summarize(make_config(llm), cache)
+
+        misses = [
+            await summarize(make_config(llm), cache, DESCRIPTIONS + ["Alpha is new."]),
+            await summarize(make_config(llm, summary_length_recommended=100), cache),
+            await summarize(make_config(llm, llm_model_name="model-b"), cache),
+        ]
+
+        # Each one runs the summary path again; the model change keeps the same
+        # prompt, so its LLM request is answered by the prompt-level LLM cache
+        assert all(usage.get("llm_calls") == 1 for _, _, usage in misses)
+        assert llm.calls == 3
+        assert len(cache.memo_keys()) == 4
+
+    @pytest.mark.asyncio
+    async def test_joined_descriptions_are_not_memoized(self):
+        llm, cache = CountingLLM(), FakeCache()
+
+        summary, used, _ = await summarize(make_config(llm), cache, DESCRIPTIONS[:2])
+
+        assert (summary, used, llm.calls) == ("<SEP>".join(DESCRIPTIONS[:2]), False, 0)
+        assert cache.memo_keys() == []
+
+    @pytest.mark.asyncio
+    async def test_memo_follows_extraction_cache_switch(self):
+        llm, cache = CountingLLM(), FakeCache(enabled=False)
+        config = make_config(llm)
+
+        await summarize(config, cache)
+        await summarize(config, cache)
+
+        assert llm.calls == 2
+        assert cache.memo_keys() == []
@@ -0,0 +1,182 @@
+"""
+Unit tests for skipping unchanged entity/relation vector upserts (lightrag.operate).
+
+A merge that leaves both the embedded text and the stored metadata unchanged
+skips the upsert; a merge that only adds a source chunk or file path must still
+rewrite the vector record.
+"""
+
+import pytest
+
+from lightrag.constants import GRAPH_FIELD_SEP
+from lightrag.operate import (
+    _merge_edges_then_upsert,
+    _merge_nodes_then_upsert,
+    _vdb_payload_unchanged,
+)
+from lightrag.utils import compute_mdhash_id
+
+GLOBAL_CONFIG = {
+    "source_ids_limit_method": "FIFO",
+    "max_source_ids_per_entity": 100,
+    "max_source_ids_per_relation": 100,
+    "max_file_paths": 100,
+    "file_path_more_placeholder": "more",
+    "summary_mode": "full",
+}
+
+
+class FakeGraph:
+    def __init__(self):
+        self.nodes: dict[str, dict] = {}
+        self.edges: dict[tuple[str, str], dict] = {}
+
+    async def get_node(self, name):
+        node = self.nodes.get(name)
+        return dict(node) if node else None
+
+    async def upsert_node(self, name, node_data):
+        self.nodes[name] = dict(node_data)
+
+    async def has_edge(self, src, tgt):
+        return (src, tgt) in self.edges
+
+    async def get_edge(self, src, tgt):
+        return dict(self.edges[(src, tgt)])
+
+    async def upsert_edge(self, src, tgt, edge_data):
+        self.edges[(src, tgt)] = dict(edge_data)
+
+
+class FakeVectorStorage:
+    """Keeps only ``meta_fields`` of each payload, like the real backends."""
+
+    def __init__(self, meta_fields: set[str]):
+        self.meta_fields = meta_fields
+        self.records: dict[str, dict] = {}
+        self.upserts = 0
+
+    async def get_by_id(self, vdb_id):
+        return self.records.get(vdb_id)
+
+    async def upsert(self, data):
+        self.upserts += 1
+        for vdb_id, payload in data.items():
+            self.records[vdb_id] = {
+                k: v for k, v in payload.items() if k in self.meta_fields
+            }
+
+    async def delete(self, ids):
+        for vdb_id in ids:
+            self.records.pop(vdb_id, None)
+
+
+def entity_vdb():
+    return FakeVectorStorage({"entity_name", "source_id", "content", "file_path"})
+
+
+def relation_vdb():
+    return FakeVectorStorage({"src_id", "tgt_id", "source_id", "content", "file_path"})
+
+
+def node(chunk: str, file_path: str = "a.txt", description: str = "An engineer."):
+    return {
+        "entity_type": "person",
+        "description": description,
+        "source_id": chunk,
+        "file_path": file_path,
+    }
+
+
+def edge(chunk: str, file_path: str = "a.txt"):
+    return {
+        "description": "Alice works at Acme.",
+        "keywords": "employment",
+        "weight": 1.0,
+        "source_id": chunk,
+        "file_path": file_path,
+    }
+
+
+async def merge_node(graph, vdb, nodes, status=None):
+    return await _merge_nodes_then_upsert(
+        "Alice", nodes, graph, vdb, GLOBAL_CONFIG, pipeline_status=status
+    )
+
+
+class TestEntityUpsertSkip:
+    @pytest.mark.asyncio
+    async def test_identical_merge_is_skipped(self):
+        graph, vdb = FakeGraph(), entity_vdb()
+        await merge_node(graph, vdb, [node("chunk-1")])
+
+        await merge_node(graph, vdb, [node("chunk-1")])
+
+        assert vdb.upserts == 1
+
+    @pytest.mark.asyncio
+    async def test_new_source_id_still_updates_payload(self):
+        graph, vdb = FakeGraph(), entity_vdb()
+        await merge_node(graph, vdb, [node("chunk-1")])
+
+        # Same description text from another chunk: content is unchanged
+        await merge_node(graph, vdb, [node("chunk-2")])
+
+        record = vdb.records[compute_mdhash_id("Alice", prefix="ent-")]
+        assert vdb.upserts == 2
+        assert record["content"] == "Alice\nAn engineer."
+        assert record["source_id"].split(GRAPH_FIELD_SEP) == ["chunk-1", "chunk-2"]
+
+    @pytest.mark.asyncio
+    async def test_new_file_path_still_updates_payload(self):
+        graph, vdb = FakeGraph(), entity_vdb()
+        await merge_node(graph, vdb, [node("chunk-1", "a.txt")])
+
+        await merge_node(graph, vdb, [node("chunk-1", "b.txt")])
+
+        record = vdb.records[compute_mdhash_id("Alice", prefix="ent-")]
+        assert record["file_path"].split(GRAPH_FIELD_SEP) == ["a.txt", "b.txt"]
+
+
+class TestRelationUpsertSkip:
+    @pytest.mark.asyncio
+    async def test_new_source_id_updates_relation_payload(self):
+        graph, rel_vdb = FakeGraph(), relation_vdb()
+
+        async def merge(chunk):
+            return await _merge_edges_then_upsert(
+                "Alice",
+                "Acme",
+                [edge(chunk)],
+                graph,
+                rel_vdb,
+                None,
+                GLOBAL_CONFIG,
+                added_entities=[],
+            )
+
+        await merge("chunk-1")
+        await merge("chunk-1")
+        assert rel_vdb.upserts == 1
+
+        await merge("chunk-2")
+        record = rel_vdb.records[compute_mdhash_id("AcmeAlice", prefix="rel-")]
+        assert rel_vdb.upserts == 2
+        assert record["source_id"].split(GRAPH_FIELD_SEP) == ["chunk-1", "chunk-2"]
+
+
+class TestVdbPayloadUnchanged:
+    @pytest.mark.asyncio
+    async def test_only_persisted_fields_are_compared(self):
+        vdb = entity_vdb()
+        payload = {"entity_name": "Alice", "content": "Alice\nx", "source_id": "c1"}
+        await vdb.upsert({"ent-1": {**payload, "entity_type": "person"}})
+
+        # entity_type is not stored by the backend, so it cannot go stale
+        assert await _vdb_payload_unchanged(
+            vdb, "ent-1", {**payload, "entity_type": "org"}
+        )
+        assert not await _vdb_payload_unchanged(
+            vdb, "ent-1", {**payload, "source_id": "c1<SEP>c2"}
+        )
+        assert not await _vdb_payload_unchanged(vdb, "ent-missing", payload)